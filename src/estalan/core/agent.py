@@ -2,7 +2,9 @@ import json
 import os
 import re
 import time
-from typing import Any, Type
+import uuid
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional, Type
 
 from dotenv import load_dotenv
 from google.oauth2 import service_account
@@ -19,7 +21,6 @@ from langchain_google_vertexai import ChatVertexAI
 from langchain_openai import AzureChatOpenAI
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
-from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from langgraph.graph.state import CompiledStateGraph
 from pydantic import BaseModel, Field
 
@@ -31,9 +32,11 @@ from alan.core.prompt import (
     SuggestPrompt,
     VanillaChatPrompt,
 )
+from alan.core.router import IntentRouter
 from alan.logging_config import get_logger
 from alan.tools.base import AsyncTool
 from alan.tools.mixins import ChromeExtensionMixin, MessageMixin
+from alan.tools.prefetch import PREFETCH_CACHE_KEY, PrefetchCache
 from alan.tools.utils import add_graph_components
 
 load_dotenv()
@@ -49,6 +52,9 @@ default_config = {
     "recursion_limit": 200,
 }  # TODO: recursion_limit에 도달했을 때의 error 처리가 되어 있어야 할 듯.
 
+# restream 시 fork할 checkpoint를 찾기 위해 탐색하는 최대 checkpoint 수.
+RESTREAM_HISTORY_LIMIT = 50
+
 suggest_llm = AzureChatOpenAI(
     azure_endpoint=os.getenv("AZURE_ENDPOINT"),
     openai_api_type=os.getenv("AZURE_OPENAI_API_TYPE"),
@@ -66,6 +72,9 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
     llm: BaseLanguageModel | RunnableBinding
     graph: CompiledStateGraph
     config: dict = default_config
+    # 턴마다 새 PrefetchCache를 만드는 함수. (None이면 prefetch 사용 안 함)
+    prefetch_factory: Optional[Callable[[], PrefetchCache]] = None
+    continue_llm: Optional[DeepSeekR1_Continue] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -79,6 +88,8 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
         tools: list[AsyncTool],
         init_data: dict[str, Any] | None = None,
         max_tool_calls: int = 2,
+        prefetch_top_k: int = 0,
+        intent_router: Optional[IntentRouter] = None,
     ):
         logger.info(f"Creating AlanAgent with LLM type: {llm_type}")
         logger.debug(f"Tools: {[tool.name for tool in tools]}")
@@ -87,6 +98,8 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
             logger.debug("Agent initialized with existing data")
 
         try:
+            prefetch_factory = cls._create_prefetch_factory(tools, prefetch_top_k)
+
             # Build Graph
             graph = cls._create_graph(
                 llm=llm,
@@ -96,11 +109,13 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
                 init_data=init_data,
                 config=default_config,
                 max_tool_calls=max_tool_calls,
+                intent_router=intent_router,
             )
 
             agent = AlanAgent(
                 llm=llm,
                 graph=graph,
+                prefetch_factory=prefetch_factory,
             )
 
             logger.info("AlanAgent created successfully")
@@ -110,6 +125,26 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
             logger.error(f"Failed to create AlanAgent: {str(e)}")
             raise
 
+    @staticmethod
+    def _create_prefetch_factory(
+        tools: list[AsyncTool], prefetch_top_k: int
+    ) -> Optional[Callable[[], PrefetchCache]]:
+        if prefetch_top_k <= 0:
+            return None
+
+        # search_web 결과를 summarize_references가 읽어가므로, 해당 tool의 fetch 로직으로 미리 받아둔다.
+        ref_tool = next(
+            (tool for tool in tools if tool.name == "summarize_references"), None
+        )
+        if ref_tool is None:
+            logger.warning("summarize_references tool not found, prefetch disabled")
+            return None
+
+        logger.debug(f"Prefetch enabled with top_k: {prefetch_top_k}")
+        return partial(
+            PrefetchCache, loader=ref_tool._afetch_and_clean, max_size=prefetch_top_k
+        )
+
     @staticmethod
     def _create_graph(
         llm: BaseLanguageModel | RunnableBinding,
@@ -119,6 +154,7 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
         init_data: dict[str, Any] | None,
         config: dict,
         max_tool_calls: int,
+        intent_router: Optional[IntentRouter] = None,
     ) -> CompiledStateGraph:
         logger.debug("Creating agent graph")
 
@@ -143,9 +179,17 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
                     tools,
                     guardrail_llm=guardrail_llm,
                     max_tool_calls=max_tool_calls,
+                    latency_callback=(
+                        (lambda s: intent_router.record_latency("tools", s))
+                        if intent_router
+                        else None
+                    ),
                 ),
             ),
-            ("tool_calling", ToolCalling(tools, filter_llm=filter_llm)),
+            (
+                "tool_calling",
+                ToolCalling(tools, filter_llm=filter_llm),
+            ),
         ]
         edges = [
             (START, "query_analysis"),
@@ -159,6 +203,47 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
             )
         ]
 
+        if intent_router:
+            # tool이 필요 없는 턴(인사, 재요청 등)은 tool schema 없이 가벼운 chat 경로로 보냄.
+            def route_intent(state: AlanState) -> str:
+                last_message = state.messages[-1]
+                if (
+                    isinstance(last_message, HumanMessage)
+                    and intent_router.route(last_message.content) == "chat"
+                ):
+                    logger.debug("Routing to vanilla_chat")
+                    return "vanilla_chat"
+                return "query_analysis"
+
+            nodes.append(
+                (
+                    "vanilla_chat",
+                    QueryAnalysis(
+                        llm=llm,
+                        prompt=VanillaChatPrompt(),
+                        tools=[],
+                        name="vanilla_chat",
+                        latency_callback=lambda s: intent_router.record_latency(
+                            "chat", s
+                        ),
+                    ),
+                )
+            )
+            edges = [
+                ("tool_calling", "query_analysis"),
+                ("vanilla_chat", END),
+            ]
+            edges_with_conditions.append(
+                (
+                    START,
+                    route_intent,
+                    {
+                        "vanilla_chat": "vanilla_chat",
+                        "query_analysis": "query_analysis",
+                    },
+                )
+            )
+
         graph_builder = add_graph_components(
             StateGraph(AlanState), nodes, edges, edges_with_conditions
         )
@@ -186,11 +271,15 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
     ):
         logger.info(f"Starting stream events for user input: {user_input[:100]}...")
         try:
-            return self.graph.astream_events(
-                input={"messages": [HumanMessage(content=user_input)]},
-                config=self.config,
-                stream_mode=stream_mode,
-                version=version,
+            config, prefetch_cache = self._turn_config(self.config)
+            return self._with_turn_cleanup(
+                self.graph.astream_events(
+                    input={"messages": [HumanMessage(content=user_input)]},
+                    config=config,
+                    stream_mode=stream_mode,
+                    version=version,
+                ),
+                prefetch_cache,
             )
         except Exception as e:
             logger.error(f"Error in astream_events: {str(e)}")
@@ -198,6 +287,7 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
 
     async def astream_continue_events(self, stream_mode: str = "values", version="v2"):
         logger.info("Starting continue stream events")
+        turn_config, prefetch_cache = self._turn_config(self.config)
 
         async def _continue_generator():
             try:
@@ -205,22 +295,24 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
                     logger.debug("Using DeepSeek-R1 continue mode")
 
                     # Get current state messages
-                    current_state_values = self.graph.get_state(
-                        config=self.config
-                    ).values
-                    messages = current_state_values.get("messages", [])
+                    current_state = await self.graph.aget_state(config=self.config)
+                    messages = current_state.values.get("messages", [])
 
                     if not messages:
                         raise ValueError(
                             "No messages found in current state for continue"
                         )
 
+                    # continue가 이어질 때 client와 렌더링된 이전 메시지를 재사용하도록 인스턴스를 유지.
+                    if self.continue_llm is None:
+                        self.continue_llm = DeepSeekR1_Continue(
+                            model=os.environ["DEEPSEEK_MODEL_NAME"],
+                            base_url=os.environ["DEEPSEEK_ENDPOINT"],
+                            fireworks_api_key=os.environ["DEEPSEEK_API_KEY"],
+                        )
+
                     response = None
-                    async for chunk in DeepSeekR1_Continue(
-                        model=os.environ["DEEPSEEK_MODEL_NAME"],
-                        base_url=os.environ["DEEPSEEK_ENDPOINT"],
-                        fireworks_api_key=os.environ["DEEPSEEK_API_KEY"],
-                    ).astream(messages):
+                    async for chunk in self.continue_llm.astream(messages):
                         # 해당 chunk는 graph에서 stream되는 구조와 다르기 때문에, 임의로 event schema를 맞춰주도록 구현함.
                         event = {
                             "event": "on_chat_model_stream",
@@ -234,65 +326,45 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
                         else:
                             response = chunk
 
-                    # Update the last AI message in state with the continued response
-                    # Find the last AI message and replace it with the continued response
-                    updated_messages = messages.copy()
-                    for i in reversed(range(len(updated_messages))):
-                        if isinstance(updated_messages[i], (AIMessage, AIMessageChunk)):
-                            # Replace the last AI message with the continued response
-                            updated_messages[i] = AIMessage(
-                                content=updated_messages[i].content + response
-                            )
-                            break
-                    else:
-                        # If no AI message found, append the response
-                        updated_messages.append(AIMessage(content=response))
+                    continued_text = response.content if response else ""
 
-                    # Update state with the continued response
-                    updated_state = current_state_values.copy()
-                    updated_state["messages"] = updated_messages
+                    # 마지막 AI 메시지를 같은 id로 덮어써서, 전체 메시지를 다시 쓰지 않고 해당 메시지만 갱신.
+                    last_ai_message = self.get_last_message(messages, AIMessage)
+                    if last_ai_message is not None:
+                        continued_message = AIMessage(
+                            id=last_ai_message.id,
+                            content=last_ai_message.content + continued_text,
+                            response_metadata=last_ai_message.response_metadata,
+                        )
+                    else:
+                        continued_message = AIMessage(content=continued_text)
 
                     await self.graph.aupdate_state(
                         config=self.config,
-                        values=updated_state,
+                        values={"messages": [continued_message]},
                     )
 
                     logger.debug("DeepSeek-R1 continue completed")
                 else:
                     logger.debug("Using standard continue mode")
 
+                    # id를 지정해두고, stream이 끝나면 해당 메시지만 제거.
+                    continue_message = SystemMessage(
+                        content=CONTINUE_PROMPT, id=str(uuid.uuid4())
+                    )
+
                     # Stream with continue prompt
                     async for chunk in self.graph.astream_events(
-                        input={"messages": [SystemMessage(content=CONTINUE_PROMPT)]},
-                        config=self.config,
+                        input={"messages": [continue_message]},
+                        config=turn_config,
                         stream_mode=stream_mode,
                         version=version,
                     ):
                         yield chunk
 
-                    # Remove the CONTINUE_PROMPT system message from state after streaming
-                    current_state = self.graph.get_state(config=self.config)
-                    current_values = current_state.values
-                    messages = current_values.get("messages", [])
-
-                    # Find and remove the CONTINUE_PROMPT system message
-                    # It should be the second-to-last message (before the AI response)
-                    updated_messages = []
-                    for msg in messages:
-                        if not (
-                            isinstance(msg, SystemMessage)
-                            and msg.content == CONTINUE_PROMPT
-                        ):
-                            updated_messages.append(msg)
-
-                    updated_values = current_values.copy()
-                    updated_values["messages"] = [
-                        RemoveMessage(id=REMOVE_ALL_MESSAGES)
-                    ] + updated_messages
-
                     await self.graph.aupdate_state(
                         config=self.config,
-                        values=updated_values,
+                        values={"messages": [RemoveMessage(id=continue_message.id)]},
                     )
                     logger.debug("Removed CONTINUE_PROMPT from state after streaming")
 
@@ -300,7 +372,7 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
                 logger.error(f"Error in astream_continue_events: {str(e)}")
                 raise
 
-        return _continue_generator()
+        return self._with_turn_cleanup(_continue_generator(), prefetch_cache)
 
     async def arestream_events(
         self, user_input: str = None, stream_mode: str = "values", version: str = "v2"
@@ -309,8 +381,8 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
 
         try:
             # Get current state
-            current_state = self.graph.get_state(config=self.config).values
-            messages = current_state.get("messages", [])
+            current_state = await self.graph.aget_state(config=self.config)
+            messages = current_state.values.get("messages", [])
 
             if not messages:
                 raise ValueError("No messages found in current state for restream")
@@ -321,21 +393,6 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
             if not last_human_message:
                 raise ValueError("No Human message found for restream")
 
-            # Find the index of the last Human message
-            last_human_index = -1
-            for i in reversed(range(len(messages))):
-                if messages[i] is last_human_message:
-                    last_human_index = i
-                    break
-
-            # Keep all messages before the last Human message
-            updated_messages = messages[:last_human_index]
-
-            logger.debug(f"Found last Human message at index {last_human_index}")
-            logger.debug(
-                f"Keeping {len(updated_messages)} messages before last Human message"
-            )
-
             # Determine the message to use for restreaming
             if user_input:
                 message = HumanMessage(content=user_input)
@@ -344,29 +401,98 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
                 message = last_human_message
                 logger.debug("Using last Human message for restream")
 
-            # Update the graph state with messages excluding everything after last Human message
-            reset_state = current_state.copy()
-            reset_state["messages"] = [
-                RemoveMessage(id=REMOVE_ALL_MESSAGES)
-            ] + updated_messages
-
-            await self.graph.aupdate_state(
-                config=self.config,
-                values=reset_state,
-            )
-
-            # Stream events from the reverted state
-            return self.graph.astream_events(
-                input={"messages": [message]},
-                config=self.config,
-                stream_mode=stream_mode,
-                version=version,
+            # 마지막 Human 메시지가 입력되기 직전의 checkpoint에서 fork하여, 기존 history를 다시 쓰지 않음.
+            fork_config = await self._aget_checkpoint_before(last_human_message)
+
+            if fork_config is None:
+                # init_data로 복원된 thread처럼 입력 checkpoint가 없는 경우,
+                # 마지막 Human 메시지 이후의 메시지만 id로 제거.
+                logger.debug("No input checkpoint found, removing trailing messages")
+                last_human_index = next(
+                    i
+                    for i in reversed(range(len(messages)))
+                    if messages[i] is last_human_message
+                )
+                await self.graph.aupdate_state(
+                    config=self.config,
+                    values={
+                        "messages": [
+                            RemoveMessage(id=m.id) for m in messages[last_human_index:]
+                        ]
+                    },
+                )
+                fork_config = self.config
+
+            # Stream events from the forked checkpoint
+            fork_config, prefetch_cache = self._turn_config(fork_config)
+            return self._with_turn_cleanup(
+                self.graph.astream_events(
+                    input={"messages": [message]},
+                    config=fork_config,
+                    stream_mode=stream_mode,
+                    version=version,
+                ),
+                prefetch_cache,
             )
 
         except Exception as e:
             logger.error(f"Error in arestream_events: {str(e)}")
             raise
 
+    async def _aget_checkpoint_before(self, message: BaseMessage) -> dict | None:
+        """`message`가 입력되기 직전의 checkpoint config를 반환."""
+        # 최근 checkpoint부터 탐색. 입력 checkpoint에는 입력이 적용되기 전의 state가 저장되어 있고,
+        # 바로 다음 checkpoint에서 입력 메시지가 state의 마지막 메시지가 됨.
+        child = None
+        async for snapshot in self.graph.aget_state_history(
+            config=self.config, limit=RESTREAM_HISTORY_LIMIT
+        ):
+            child_messages = child.values.get("messages", []) if child else []
+            if (
+                snapshot.metadata.get("source") == "input"
+                and child_messages
+                and child_messages[-1].id == message.id
+            ):
+                logger.debug(
+                    f"Forking from checkpoint: {snapshot.config['configurable'].get('checkpoint_id')}"
+                )
+                return {
+                    **self.config,
+                    "configurable": {
+                        **self.config["configurable"],
+                        **snapshot.config["configurable"],
+                    },
+                }
+
+            child = snapshot
+
+        return None
+
+    def _turn_config(self, config: dict) -> tuple[dict, Optional[PrefetchCache]]:
+        """이번 턴에서만 쓰는 PrefetchCache를 만들어 config로 전달."""
+        if self.prefetch_factory is None:
+            return config, None
+
+        prefetch_cache = self.prefetch_factory()
+        return {
+            **config,
+            "configurable": {
+                **config.get("configurable", {}),
+                PREFETCH_CACHE_KEY: prefetch_cache,
+            },
+        }, prefetch_cache
+
+    async def _with_turn_cleanup(
+        self, events: AsyncIterator, prefetch_cache: Optional[PrefetchCache]
+    ) -> AsyncIterator:
+        try:
+            async for event in events:
+                yield event
+        finally:
+            # 턴이 끝나면 이번 턴에서 사용되지 않은 prefetch만 취소.
+            if prefetch_cache is not None:
+                prefetch_cache.cancel()
+
     def dump(self):
         logger.debug("Dumping agent state")
         try:
@@ -618,7 +744,9 @@ class AlanAgent(BaseModel, ChromeExtensionMixin, MessageMixin):
                     description="Four new questions based on the answers. Those questions must be in Korean.",
                 )
 
-            messages = self.graph.get_state(config=self.config).values["messages"]
+            messages = (await self.graph.aget_state(config=self.config)).values[
+                "messages"
+            ]
             if message_type == AIMessage:
                 answer = self.get_last_message(messages, AIMessage)
             elif (
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import threading
+import weakref
 from operator import itemgetter
 from typing import (
     Any,
@@ -74,11 +77,74 @@ from langchain_core.utils.function_calling import (
 )
 from langchain_core.utils.pydantic import is_basemodel_subclass
 from langchain_core.utils.utils import _build_model_kwargs, from_env, secret_from_env
-from pydantic import BaseModel, ConfigDict, Field, SecretStr, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SecretStr,
+    model_validator,
+)
 from typing_extensions import Self
 
 logger = logging.getLogger(__name__)
 
+# 동일한 설정의 Fireworks client는 인스턴스 간에 재사용 (connection pool 공유).
+# async client의 connection pool은 처음 사용한 event loop에 묶이므로 loop별로 따로 만든다.
+_client_pool_lock = threading.Lock()
+_client_pool: Dict[Tuple[Any, ...], Any] = {}
+_async_client_pool: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, Dict[Tuple[Any, ...], Any]
+] = weakref.WeakKeyDictionary()
+
+
+def _client_key(client_params: Dict[str, Any], max_retries: Optional[int]) -> Tuple:
+    return (
+        client_params["api_key"],
+        client_params["base_url"],
+        repr(client_params["timeout"]),
+        max_retries,
+    )
+
+
+def _get_pooled_client(
+    client_params: Dict[str, Any], max_retries: Optional[int]
+) -> Any:
+    """client 설정별로 completions client를 한 번만 생성해 반환합니다."""
+    key = _client_key(client_params, max_retries)
+    with _client_pool_lock:
+        if key not in _client_pool:
+            logger.debug(
+                f"Creating pooled Fireworks client for: {client_params['base_url']}"
+            )
+            client = Fireworks(**client_params).completions
+            if max_retries:
+                client._max_retries = max_retries
+            _client_pool[key] = client
+        return _client_pool[key]
+
+
+def _get_pooled_async_client(
+    client_params: Dict[str, Any], max_retries: Optional[int]
+) -> Any:
+    """현재 event loop와 client 설정별로 async completions client를 한 번만 생성해 반환합니다.
+
+    loop가 닫혀 참조가 사라지면 해당 loop의 client도 pool에서 제거됩니다.
+    """
+    loop = asyncio.get_running_loop()
+    key = _client_key(client_params, max_retries)
+    with _client_pool_lock:
+        pool = _async_client_pool.setdefault(loop, {})
+        if key not in pool:
+            logger.debug(
+                f"Creating pooled async Fireworks client for: {client_params['base_url']}"
+            )
+            async_client = AsyncFireworks(**client_params).completions
+            if max_retries:
+                async_client._max_retries = max_retries
+            pool[key] = async_client
+        return pool[key]
+
 
 def _convert_dict_to_message(_dict: Mapping[str, Any]) -> BaseMessage:
     """Convert a dictionary to a LangChain message.
@@ -379,6 +445,11 @@ class DeepSeekR1_Continue(BaseChatModel):
         populate_by_name=True,
     )
 
+    # 마지막 메시지를 제외한 이전 메시지들(복사본)과 렌더링된 텍스트.
+    # continue로 메시지가 뒤에 추가될 때는 새 메시지만 변환하고, 앞의 메시지가 수정/삭제되면 다시 변환합니다.
+    _rendered_messages: List[BaseMessage] = PrivateAttr(default_factory=list)
+    _rendered_text: str = PrivateAttr(default="")
+
     @model_validator(mode="before")
     @classmethod
     def build_extra(cls, values: Dict[str, Any]) -> Any:
@@ -395,7 +466,14 @@ class DeepSeekR1_Continue(BaseChatModel):
         if self.n > 1 and self.streaming:
             raise ValueError("n must be 1 when streaming.")
 
-        client_params = {
+        if not self.client:
+            self.client = _get_pooled_client(self._client_params, self.max_retries)
+        # async client는 호출 시점의 event loop에 맞춰 `_aclient`에서 가져옴.
+        return self
+
+    @property
+    def _client_params(self) -> Dict[str, Any]:
+        return {
             "api_key": (
                 self.fireworks_api_key.get_secret_value()
                 if self.fireworks_api_key
@@ -405,14 +483,11 @@ class DeepSeekR1_Continue(BaseChatModel):
             "timeout": self.request_timeout,
         }
 
-        if not self.client:
-            self.client = Fireworks(**client_params).completions
-        if not self.async_client:
-            self.async_client = AsyncFireworks(**client_params).completions
-        if self.max_retries:
-            self.client._max_retries = self.max_retries
-            self.async_client._max_retries = self.max_retries
-        return self
+    def _aclient(self) -> Any:
+        """직접 지정한 `async_client`가 없으면 현재 event loop의 pooled client를 사용."""
+        if self.async_client is not None:
+            return self.async_client
+        return _get_pooled_async_client(self._client_params, self.max_retries)
 
     @property
     def _default_params(self) -> Dict[str, Any]:
@@ -530,9 +605,39 @@ class DeepSeekR1_Continue(BaseChatModel):
         params = self._default_params
         if stop is not None:
             params["stop"] = stop
-        message_text = "\n\n".join([_convert_message_to_text(m) for m in messages])
+        message_text = self._render_messages(messages)
         return message_text, params
 
+    def _render_messages(self, messages: List[BaseMessage]) -> str:
+        """메시지를 텍스트로 변환. 이전 호출과 겹치는 앞부분은 캐시된 텍스트를 재사용합니다."""
+        if not messages:
+            return ""
+
+        *history, last = messages
+        # id가 같아도 regenerate 등으로 내용이 바뀔 수 있으므로 메시지 전체를 비교.
+        cached = len(self._rendered_messages)
+        if cached and history[:cached] == self._rendered_messages:
+            new_texts = [_convert_message_to_text(m) for m in history[cached:]]
+            history_text = "\n\n".join([self._rendered_text, *new_texts])
+            rendered = self._rendered_messages
+        else:
+            cached = 0
+            history_text = "\n\n".join([_convert_message_to_text(m) for m in history])
+            rendered = []
+
+        logger.debug(
+            f"Rendered {len(history) - cached} new messages, reused {cached} cached"
+        )
+        # 호출한 쪽이 메시지를 그대로 수정해도 비교할 수 있도록 복사본을 저장.
+        self._rendered_messages = [
+            *rendered,
+            *(m.model_copy() for m in history[cached:]),
+        ]
+        self._rendered_text = history_text
+
+        last_text = _convert_message_to_text(last)
+        return f"{history_text}\n\n{last_text}" if history else last_text
+
     def _create_message_dicts(
         self, messages: List[BaseMessage], stop: Optional[List[str]]
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
@@ -581,7 +686,7 @@ class DeepSeekR1_Continue(BaseChatModel):
         params = {**params, **kwargs, "stream": True}
 
         default_chunk_class: type[BaseMessageChunk] = AIMessageChunk
-        async for chunk in self.async_client.acreate(prompt=message_text, **params):
+        async for chunk in self._aclient().acreate(prompt=message_text, **params):
             if not isinstance(chunk, dict):
                 chunk = chunk.model_dump()
             if len(chunk["choices"]) == 0:
@@ -627,7 +732,7 @@ class DeepSeekR1_Continue(BaseChatModel):
             **({"stream": stream} if stream is not None else {}),
             **kwargs,
         }
-        response = await self.async_client.acreate(prompt=message_text, **params)
+        response = await self._aclient().acreate(prompt=message_text, **params)
         return self._create_chat_result(response)
 
     @property
@@ -1,24 +1,52 @@
 import asyncio
 import json
-import os
 import random
 import re
+import time
+import uuid
 from collections import defaultdict
-from typing import Annotated, Any, Callable, Literal, Optional, Sequence, Union
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterator,
+    Literal,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from dotenv import load_dotenv
 from langchain.schema import BaseMessage, SystemMessage, get_buffer_string
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
 from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.language_models.chat_models import (
+    BaseChatModel,
+    agenerate_from_stream,
+    generate_from_stream,
+)
 from langchain_core.messages import (
     AIMessage,
+    AIMessageChunk,
     HumanMessage,
     MessageLikeRepresentation,
     ToolMessage,
 )
-from langchain_core.runnables import RunnableBinding, RunnableConfig, RunnableSequence
+from langchain_core.messages.tool import tool_call_chunk as create_tool_call_chunk
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import (
+    Runnable,
+    RunnableBinding,
+    RunnableConfig,
+    RunnableSequence,
+)
 from langchain_core.tools import BaseTool
-from langchain_openai import AzureChatOpenAI
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from langgraph.store.base import BaseStore
@@ -26,11 +54,21 @@ from langgraph.types import Command
 from langgraph.utils.runnable import RunnableCallable
 from pydantic import BaseModel, Field
 
-from alan.core.prompt import BasePrompt, ContentFilteringPrompt
+from alan.core.parser import JsonToolCallStreamParser
+from alan.core.prompt import (
+    JSON_TOOL_CALLING_PROMPT,
+    BasePrompt,
+    ContentFilteringPrompt,
+)
 from alan.deepsearch.prompt import GuardrailPrompt
 from alan.logging_config import get_logger
 from alan.model_config import get_max_context_size_from_llm, supports_tool_calling
 from alan.tools.base import AsyncTool
+from alan.tools.prefetch import (
+    PREFETCH_CACHE_KEY,
+    PrefetchCache,
+    current_prefetch_cache,
+)
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -93,17 +131,175 @@ class AsyncRunnableCallable(RunnableCallable):
         raise NotImplementedError
 
 
-tool_call_llm = AzureChatOpenAI(
-    azure_endpoint=os.getenv("AZURE_ENDPOINT"),
-    openai_api_type=os.getenv("AZURE_OPENAI_API_TYPE"),
-    openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    model_name=os.getenv("AZURE_OPENAI_MODEL_NAME"),
-    deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-    temperature=0.1,
-    max_tokens=1024,
-    request_timeout=(10, 200),
-)
+class JsonToolCallingLLM(BaseChatModel):
+    """Native tool calling을 지원하지 않는 모델을 위한 prompt 기반 JSON tool calling wrapper.
+
+    tool schema를 system prompt에 주입하고, 모델 출력 stream을 `JsonToolCallStreamParser`로 분기하여
+    일반 답변은 그대로 stream하고, tool call 블록은 `tool_calls`로 변환한다.
+    한 번의 호출로 답변과 tool calling을 모두 처리하므로 별도의 tool calling 모델이 필요 없다.
+    """
+
+    llm: Runnable
+    tools: list[BaseTool]
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "json-tool-calling"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return generate_from_stream(
+            self._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return await agenerate_from_stream(
+            self._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        parser = JsonToolCallStreamParser()
+
+        # 내부 모델의 stream event가 answer로 중복 노출되지 않도록 callback을 비움.
+        for chunk in self.llm.stream(
+            self._inject_tool_prompt(messages),
+            config={"callbacks": []},
+            stop=stop,
+            **kwargs,
+        ):
+            if text := parser.feed(self._chunk_text(chunk)):
+                generation = self._text_chunk(text)
+                if run_manager:
+                    run_manager.on_llm_new_token(text, chunk=generation)
+                yield generation
+
+        for generation in self._final_chunks(parser):
+            if run_manager and generation.text:
+                run_manager.on_llm_new_token(generation.text, chunk=generation)
+            yield generation
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        parser = JsonToolCallStreamParser()
+
+        # 내부 모델의 stream event가 answer로 중복 노출되지 않도록 callback을 비움.
+        async for chunk in self.llm.astream(
+            self._inject_tool_prompt(messages),
+            config={"callbacks": []},
+            stop=stop,
+            **kwargs,
+        ):
+            if text := parser.feed(self._chunk_text(chunk)):
+                generation = self._text_chunk(text)
+                if run_manager:
+                    await run_manager.on_llm_new_token(text, chunk=generation)
+                yield generation
+
+        for generation in self._final_chunks(parser):
+            if run_manager and generation.text:
+                await run_manager.on_llm_new_token(generation.text, chunk=generation)
+            yield generation
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        content = getattr(chunk, "content", chunk)
+        if isinstance(content, str):
+            return content
+        # content block list로 stream하는 모델은 `AIMessage.text()`와 같이 text block만 합침.
+        return "".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content or []
+            if isinstance(block, str)
+            or (isinstance(block, dict) and block.get("type") == "text")
+        )
+
+    @staticmethod
+    def _text_chunk(text: str) -> ChatGenerationChunk:
+        return ChatGenerationChunk(message=AIMessageChunk(content=text))
+
+    def _final_chunks(
+        self, parser: JsonToolCallStreamParser
+    ) -> list[ChatGenerationChunk]:
+        """stream 종료 후 남은 답변 텍스트와 tool call chunk."""
+        tool_calls, text = parser.finalize()
+
+        tool_names = {tool.name for tool in self.tools}
+        rejected = [
+            call["name"] for call in tool_calls if call["name"] not in tool_names
+        ]
+        if rejected:
+            logger.warning(f"Ignoring JSON tool calls for unknown tools: {rejected}")
+        tool_calls = [call for call in tool_calls if call["name"] in tool_names]
+        if rejected and not tool_calls:
+            # 유효한 tool call이 하나도 없으면 빈 답변이 되지 않도록 모델 출력을 그대로 답변으로 보냄.
+            text = parser.buffer
+
+        chunks = [self._text_chunk(text)] if text else []
+        tool_call_chunks = [
+            create_tool_call_chunk(
+                name=call["name"],
+                args=json.dumps(call["args"], ensure_ascii=False),
+                id=f"call_{uuid.uuid4().hex}",
+                index=idx,
+            )
+            for idx, call in enumerate(tool_calls)
+        ]
+        if tool_call_chunks:
+            logger.debug(f"Parsed {len(tool_call_chunks)} JSON tool calls")
+            chunks.append(
+                ChatGenerationChunk(
+                    message=AIMessageChunk(
+                        content="", tool_call_chunks=tool_call_chunks
+                    )
+                )
+            )
+        return chunks
+
+    def _inject_tool_prompt(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """tool 설명을 기존 system prompt 뒤에 합침. system prompt가 없으면 새로 추가."""
+        if not self.tools:
+            return messages
+
+        tool_schemas = "\n".join(
+            json.dumps(convert_to_openai_tool(tool)["function"], ensure_ascii=False)
+            for tool in self.tools
+        )
+        tool_prompt = JSON_TOOL_CALLING_PROMPT.format(tool_schemas=tool_schemas)
+
+        if not messages or not isinstance(messages[0], SystemMessage):
+            return [SystemMessage(content=tool_prompt), *messages]
+
+        system = messages[0]
+        if isinstance(system.content, str):
+            content = f"{system.content}\n{tool_prompt}"
+        else:
+            content = [*system.content, {"type": "text", "text": tool_prompt}]
+        return [system.model_copy(update={"content": content}), *messages[1:]]
 
 
 class QueryAnalysis(AsyncRunnableCallable):
@@ -118,6 +314,7 @@ class QueryAnalysis(AsyncRunnableCallable):
         tags: Optional[list[str]] = None,
         answer_llm_tags: list[str] = ["answer"],
         max_tool_calls: int = 2,
+        latency_callback: Optional[Callable[[float], None]] = None,
     ) -> None:
         super().__init__(self._func, self._afunc, name=name, tags=tags, trace=False)
 
@@ -140,6 +337,7 @@ class QueryAnalysis(AsyncRunnableCallable):
             llm
         )  # TODO: MODEL_CONFIG에 있는 Tool calling 키를 사용하지 못하는 이유는 llm_type을 QueryAnalysis에서 받지 않기 때문. 생각해보기.
         self.max_tool_calls = max_tool_calls
+        self.latency_callback = latency_callback
         self.tool_call_count = 0
 
         logger.debug(f"Tool calling enabled: {self.tool_call_enabled}")
@@ -149,12 +347,13 @@ class QueryAnalysis(AsyncRunnableCallable):
                 tags=answer_llm_tags
             )
         else:
-            self.llm_with_tools = tool_call_llm.bind_tools(
-                tools
-            )  # 해당 llm의 답변은 stream되어서는 안되므로 tag를 제거함.
+            self.llm_with_tools = JsonToolCallingLLM(llm=llm, tools=tools).with_config(
+                tags=answer_llm_tags
+            )
 
     async def _afunc(self, state: AlanState):
         logger.debug(f"Starting {self.name} node")
+        started_at = time.perf_counter()
 
         if await self._is_context_exceeded(state.messages):
             logger.warning("Context exceeded, ending conversation.")
@@ -220,14 +419,6 @@ class QueryAnalysis(AsyncRunnableCallable):
         response = await task
         self.tool_call_count += bool(response.tool_calls)
 
-        if (
-            not self.tool_call_enabled
-            and isinstance(llm.bound, AzureChatOpenAI)
-            and not response.tool_calls
-        ):
-            logger.debug("Using fallback LLM for non-tool response")
-            response = await self.llm.ainvoke(inputs)
-
         response = await self._merge_tool_calls(response)
 
         def convert_tool_calls_to_text(message: AIMessage):
@@ -245,6 +436,10 @@ class QueryAnalysis(AsyncRunnableCallable):
 
             return AIMessage(content="\n".join(text_parts))
 
+        # 턴의 첫 호출(사용자 질문 직후)에 대해서만 latency를 기록.
+        if self.latency_callback and isinstance(state.messages[-1], HumanMessage):
+            self.latency_callback(time.perf_counter() - started_at)
+
         logger.debug("Query analysis completed")
         return {
             "messages": [response],
@@ -453,10 +648,18 @@ class ToolCalling(ToolNode):
         )
 
         logger.debug("Executing tool calls")
-        outputs = await asyncio.gather(
-            *(self._arun_one(call, input_type, config) for call in tool_calls)
+        # search_web 결과의 상위 URL을 미리 받아두어, 이후 summarize_references 호출 시 재사용.
+        prefetch_cache = config.get("configurable", {}).get(PREFETCH_CACHE_KEY)
+        token = current_prefetch_cache.set(prefetch_cache)
+        try:
+            outputs = await asyncio.gather(
+                *(self._arun_one(call, input_type, config) for call in tool_calls)
+            )
+        finally:
+            current_prefetch_cache.reset(token)
+        outputs = await self.postprocess_tool_results(
+            input, outputs, prefetch_cache=prefetch_cache
         )
-        outputs = await self.postprocess_tool_results(input, outputs)
 
         logger.debug("Tool calling completed")
         return outputs
@@ -486,7 +689,10 @@ class ToolCalling(ToolNode):
         return normalized_calls
 
     async def postprocess_tool_results(
-        self, state: AlanState, tool_call_results: list[ToolMessage]
+        self,
+        state: AlanState,
+        tool_call_results: list[ToolMessage],
+        prefetch_cache: Optional[PrefetchCache] = None,
     ):
         logger.debug(f"Post-processing {len(tool_call_results)} tool results")
 
@@ -513,6 +719,9 @@ class ToolCalling(ToolNode):
                 self._split_results_by_type(observation)
             )
 
+            if name == "search_web":
+                self._schedule_prefetch(prefetch_cache, text_observation)
+
             logger.debug("Filtering content relevance")
             image_observation = await self._filter_unrelative_contents(
                 state.messages[-2], image_observation
@@ -539,6 +748,22 @@ class ToolCalling(ToolNode):
             "video_info": video_info if video_info else state.video_info,
         }
 
+    def _schedule_prefetch(
+        self, prefetch_cache: Optional[PrefetchCache], observation: list[dict]
+    ):
+        if prefetch_cache is None:
+            return
+
+        urls = [
+            source
+            for it in observation
+            if (source := it["metadata"].get("source"))
+            and not self.blocked_url_pattern.search(source)
+        ][: prefetch_cache.max_size]
+
+        logger.debug(f"Prefetching {len(urls)} search result pages")
+        prefetch_cache.schedule(urls)
+
     def _split_results_by_type(self, observation: list[dict]):
         text_results = []
         image_results = []
@@ -0,0 +1,82 @@
+import json
+import re
+from typing import Optional
+
+TOOL_CALL_FENCE = "```tool_calls"
+# 이 prefix 뒤에 `{"tool_calls"`가 이어질 때만 tool call로 판단. (일반 JSON 답변은 바로 stream)
+JSON_PREFIXES = ("```json", "")
+TOOL_CALL_KEY = '{"tool_calls"'
+
+
+class JsonToolCallStreamParser:
+    """Native tool calling을 지원하지 않는 모델의 출력 stream을 tool call 블록과 일반 답변으로 구분하는 파서.
+
+    - 응답이 ```tool_calls, 또는 (```json fence 안의) `{"tool_calls"`로 시작하면 끝까지 버퍼링한 뒤
+      `finalize`에서 파싱.
+    - 그 외에는 일반 답변으로 판단하고, 이후 chunk는 그대로 흘려보냄.
+      `{`나 ```json으로 시작하는 답변도 `tool_calls` key가 아니라고 판단되는 즉시 stream된다.
+    """
+
+    def __init__(self):
+        self.patterns = (TOOL_CALL_FENCE, *(p + TOOL_CALL_KEY for p in JSON_PREFIXES))
+        self.buffer = ""
+        self.mode: Optional[str] = None  # None(판단 전) | "answer" | "tool_call"
+
+    def feed(self, text: str) -> str:
+        """chunk를 입력받아, 사용자에게 바로 보낼 수 있는 답변 텍스트를 반환."""
+        if self.mode == "answer":
+            return text
+
+        self.buffer += text
+        if self.mode == "tool_call":
+            return ""
+
+        # fence와 JSON 사이의 공백/줄바꿈은 무시하고 비교.
+        head = re.sub(r"\s+", "", self.buffer)
+        if not head:
+            return ""
+
+        if any(head.startswith(p) for p in self.patterns):
+            self.mode = "tool_call"
+            return ""
+
+        # 아직 tool call 블록의 앞부분일 수 있는 경우, 판단을 보류.
+        if any(p.startswith(head) for p in self.patterns):
+            return ""
+
+        self.mode = "answer"
+        text, self.buffer = self.buffer, ""
+        return text
+
+    def finalize(self) -> tuple[list[dict], str]:
+        """stream 종료 후 (tool_calls, 아직 내보내지 않은 답변 텍스트)를 반환."""
+        if self.mode != "tool_call":
+            text, self.buffer = self.buffer, ""
+            return [], text
+
+        data = self._loads(self.buffer)
+        calls = data.get("tool_calls") if isinstance(data, dict) else None
+        if not isinstance(calls, list):
+            # tool call 형식이 아니면 일반 답변으로 취급.
+            return [], self.buffer
+
+        tool_calls = [
+            {"name": call["name"], "args": call.get("args") or {}}
+            for call in calls
+            if isinstance(call, dict) and isinstance(call.get("name"), str)
+        ]
+        if not tool_calls:
+            return [], self.buffer
+
+        return tool_calls, ""
+
+    @staticmethod
+    def _loads(text: str) -> Optional[dict]:
+        payload = text.strip()
+        payload = re.sub(r"^```[\w-]*\s*", "", payload)
+        payload = re.sub(r"\s*```$", "", payload)
+
+        try:
+            return json.loads(payload)
+        except json.JSONDecodeError:
+            return None
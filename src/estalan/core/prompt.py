@@ -228,6 +228,18 @@ Continue speaking from the end of what you said.
 Do not repeat what has been said before.
 """
 
+JSON_TOOL_CALLING_PROMPT = """
+You have access to the following tools. Each tool is described as a JSON schema.
+
+{tool_schemas}
+
+If you need to use tools, respond ONLY with a single block in the following format, without any other text:
+```tool_calls
+{{"tool_calls": [{{"name": "<tool name>", "args": {{<arguments matching the tool schema>}}}}]}}
+```
+If no tool is needed, answer the user directly without the block.
+"""
+
 CONTENT_FILTERING_PROMPT = """
 Given the search query "{user_query}", evaluate the relevance of the following search results.
 Evaluation criteria:
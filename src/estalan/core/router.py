@@ -0,0 +1,152 @@
+import json
+import re
+from collections import defaultdict, deque
+from typing import Literal, Optional
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+Route = Literal["chat", "tools"]
+
+# tool 사용이 필요할 가능성이 높은 표현. 하나라도 포함되면 항상 tool 경로로 보냄.
+TOOL_PATTERN = re.compile(
+    r"https?://|www\.|\.com|\.kr|"
+    r"검색|찾아|알려|뉴스|기사|날씨|기온|최신|최근|오늘|어제|내일|현재|지금|요즘|"
+    r"주가|환율|가격|시세|일정|요약|정리해|출처|링크|영상|이미지|사진|\d{4}년|"
+    r"search|news|weather|latest|today|price|summar",
+    re.IGNORECASE,
+)
+
+# 인사, 감사, 맞장구, 재요청 등 tool 없이 답변 가능한 표현. 메시지 전체가 일치해야 함.
+CHAT_PATTERN = re.compile(
+    r"\s*("
+    r"안녕(하세요|하십니까)?|하이|반가워요?|반갑습니다|좋은 ?(아침|하루|밤)(이에요|입니다)?|"
+    r"고마워요?|고맙습니다|감사(합니다|해요)?|땡큐|"
+    r"ㅋ+|ㅎ+|ㅠ+|ㅜ+|네+|넵|응+|오케이|좋아요?|알겠(어|어요|습니다)|그렇구나|"
+    r"(다시|더 ?(쉽게|짧게|자세히)|쉽게|짧게) ?(말해|설명해)(줘|주세요|줄래)?|"
+    r"hi|hello|hey|thanks|thank you|ok|okay|good (morning|night)|bye"
+    r")[\s!.?~^ㅋㅎㅠ]*",
+    re.IGNORECASE,
+)
+
+
+class IntentRouter:
+    """QueryAnalysis 이전에 동작하는 로컬(CPU) intent router.
+
+    규칙/키워드 기반으로 tool 없이 답변 가능한 턴(인사, 감사, 재요청 등)을 골라 lean chat 경로로 보낸다.
+    로그로 학습한 hashing 기반 분류기(scikit-learn, optional)를 함께 사용할 수 있다.
+    애매한 경우에는 항상 tool 경로로 보낸다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_chat_chars: int = 40,
+        latency_window: int = 1000,
+    ):
+        self.threshold = threshold
+        self.max_chat_chars = max_chat_chars
+        self.vectorizer = None
+        self.classifier = None
+        # 경로별 최근 `latency_window`개 턴의 latency만 유지.
+        self._latencies: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=latency_window)
+        )
+
+    def route(self, text: str) -> Route:
+        text = text.strip()
+
+        if not text or TOOL_PATTERN.search(text):
+            return "tools"
+
+        if len(text) <= self.max_chat_chars and CHAT_PATTERN.fullmatch(text):
+            return "chat"
+
+        if self.classifier is not None and "chat" in self.classifier.classes_:
+            prob_chat = self.classifier.predict_proba(
+                self.vectorizer.transform([text])
+            )[0][list(self.classifier.classes_).index("chat")]
+            if prob_chat >= self.threshold:
+                return "chat"
+
+        return "tools"
+
+    def fit(self, texts: list[str], labels: list[Route]) -> "IntentRouter":
+        """로그로 분류기를 학습. 한 가지 경로의 턴만 있으면 학습하지 않고 규칙만 사용."""
+        if len(set(labels)) < 2:
+            logger.warning(
+                f"Intent classifier needs both routes, got {sorted(set(labels))}; "
+                "using rules only"
+            )
+            self.vectorizer = self.classifier = None
+            return self
+
+        try:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            from sklearn.linear_model import LogisticRegression
+        except ImportError as e:
+            raise ImportError(
+                "scikit-learn is required to train the intent classifier. "
+                "Install it with `pip install est-alan[router]`."
+            ) from e
+
+        logger.info(f"Training intent classifier with {len(texts)} samples")
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb", ngram_range=(1, 3), n_features=2**18
+        )
+        self.classifier = LogisticRegression(max_iter=1000, class_weight="balanced")
+        self.classifier.fit(self.vectorizer.transform(texts), labels)
+        return self
+
+    def evaluate(self, texts: list[str], labels: list[Route]) -> dict[str, float]:
+        """held-out set에 대해 "chat" 경로의 precision/recall을 계산."""
+        predictions = [self.route(text) for text in texts]
+        tp = sum(p == l == "chat" for p, l in zip(predictions, labels))
+        fp = sum(p == "chat" and l == "tools" for p, l in zip(predictions, labels))
+        fn = sum(p == "tools" and l == "chat" for p, l in zip(predictions, labels))
+
+        return {
+            "precision": tp / (tp + fp) if tp + fp else 0.0,
+            "recall": tp / (tp + fn) if tp + fn else 0.0,
+            "routed_ratio": (
+                predictions.count("chat") / len(predictions) if predictions else 0.0
+            ),
+            "support": len(labels),
+        }
+
+    def record_latency(self, route: Route, seconds: float) -> None:
+        self._latencies[route].append(seconds)
+
+    def latency_report(self) -> dict[str, Optional[float]]:
+        """경로별 평균 latency와 routing된 턴당 절약된 latency."""
+        averages = {
+            route: sum(values) / len(values)
+            for route, values in self._latencies.items()
+            if values
+        }
+        saved = (
+            averages["tools"] - averages["chat"]
+            if "tools" in averages and "chat" in averages
+            else None
+        )
+        return {
+            "chat": averages.get("chat"),
+            "tools": averages.get("tools"),
+            "saved_per_routed_turn": saved,
+        }
+
+
+def load_logged_turns(path: str) -> tuple[list[str], list[Route]]:
+    """로그(JSONL, {"text": ..., "used_tools": [...]})에서 학습 데이터를 읽음."""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            turn = json.loads(line)
+            texts.append(turn["text"])
+            labels.append("tools" if turn.get("used_tools") else "chat")
+
+    logger.debug(f"Loaded {len(texts)} logged turns from {path}")
+    return texts, labels
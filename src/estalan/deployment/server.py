@@ -30,6 +30,10 @@ from starlette.routing import Mount
 from starlette.types import Receive, Scope, Send
 
 import estalan.deployment.config as config
+from estalan.tools.http_client import http_client_lifespan
+from estalan.tools.readability_sidecar import readability_sidecar
+from estalan.tools.singleflight import singleflight
+from estalan.tools.workers import cpu_pool
 from langgraph_api.api import meta_routes, routes, user_router
 from langgraph_api.api.openapi import set_custom_spec
 from langgraph_api.errors import (
@@ -96,6 +100,26 @@ middleware.extend(
         Middleware(RequestIdMiddleware, mount_prefix=config.MOUNT_PREFIX),
     ]
 )
+
+
+@asynccontextmanager
+async def server_lifespan(app):
+    """
+    기본 lifespan에 tool에서 공유하는 HTTP client, CPU worker pool, readability worker의 종료를 더한 lifespan
+
+    Args:
+        app: 애플리케이션 인스턴스
+    """
+    async with lifespan(app):
+        async with http_client_lifespan(app):
+            try:
+                yield
+            finally:
+                cpu_pool.shutdown()
+                await readability_sidecar.aclose()
+                await singleflight.aclose()
+
+
 exception_handlers = {
     ValueError: value_error_handler,
     InvalidUpdateError: value_error_handler,
@@ -178,7 +202,7 @@ if user_router:
         Yields:
             None: 컨텍스트 매니저가 활성화된 상태
         """
-        async with lifespan(app):
+        async with server_lifespan(app):
             if original_lifespan:
                 async with original_lifespan(app):
                     yield
@@ -203,7 +227,7 @@ else:
     # It's a regular starlette app
     app = Starlette(
         routes=routes,
-        lifespan=lifespan,
+        lifespan=server_lifespan,
         middleware=middleware,
         exception_handlers=exception_handlers,
     )
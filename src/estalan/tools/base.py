@@ -1,14 +1,19 @@
-from typing import Optional
+import asyncio
+import os
+from typing import Any, Optional
 
 from langchain.callbacks.manager import AsyncCallbackManagerForToolRun
 from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.tools import BaseTool
 
 from estalan.logging_config import get_logger
-from estalan.tools.utils import noop
+from estalan.tools.utils import canonicalize_url, noop
 
 logger = get_logger(__name__)
 
+# 하위 tool 하나를 기다리는 최대 시간. 넘으면 해당 tool 결과 없이 반환.
+CONCAT_TOOL_DEADLINE = float(os.getenv("CONCAT_TOOL_DEADLINE", 10))
+
 
 class AsyncTool(BaseTool):
     def _run(
@@ -20,10 +25,25 @@ class AsyncTool(BaseTool):
 
 
 class ConcatTool(AsyncTool):
+    """여러 tool을 하나의 tool처럼 실행하고 결과를 합친다.
+
+    하위 tool은 동시에 실행되며 각자 `deadlines`(tool 이름별, 기본 `default_deadline`) 안에
+    끝나지 않거나 실패하면 나머지 결과만 반환한다. 같은 출처 URL의 결과는 `priority`(tool 이름 순서,
+    기본은 `tools` 순서)가 높은 tool의 것만 남긴다.
+    """
+
     tools: list[AsyncTool]
+    deadlines: dict[str, float] = {}
+    default_deadline: float = CONCAT_TOOL_DEADLINE
+    priority: list[str] = []
 
     @classmethod
-    def from_tools(cls, tools: list[AsyncTool]):
+    def from_tools(
+        cls,
+        tools: list[AsyncTool],
+        deadlines: Optional[dict[str, float]] = None,
+        priority: Optional[list[str]] = None,
+    ):
         logger.debug(f"Creating ConcatTool from tools: {[tool.name for tool in tools]}")
         main_tool = tools[0]
         tool_attributes = {
@@ -32,7 +52,12 @@ class ConcatTool(AsyncTool):
             "args_schema": main_tool.args_schema,
         }
 
-        concat_tool = cls(**tool_attributes, tools=tools)
+        concat_tool = cls(
+            **tool_attributes,
+            tools=tools,
+            deadlines=deadlines or {},
+            priority=priority or [],
+        )
         logger.info(
             f"ConcatTool created: {main_tool.name} with tools: {[tool.name for tool in tools]}"
         )
@@ -49,19 +74,46 @@ class ConcatTool(AsyncTool):
         )
         dispatcher = adispatch_custom_event if verbose else noop
 
+        async def invoke(index: int, tool: AsyncTool):
+            args = tool.args_schema.model_validate(
+                {**kwargs, "verbose": verbose}
+            ).model_dump()
+            return index, await asyncio.wait_for(
+                tool.ainvoke(args, run_manager=run_manager),
+                timeout=self.deadlines.get(tool.name, self.default_deadline),
+            )
+
         try:
-            results = sum(
-                [
-                    await tool.ainvoke(
-                        tool.args_schema.model_validate(
-                            {**kwargs, "verbose": verbose}
-                        ).model_dump(),
-                        run_manager=run_manager,
+            ranks = {
+                index: self._rank(tool, index) for index, tool in enumerate(self.tools)
+            }
+            merged: dict[Any, tuple[tuple[int, int], dict]] = {}
+            errors = []
+            for future in asyncio.as_completed(
+                [invoke(index, tool) for index, tool in enumerate(self.tools)]
+            ):
+                try:
+                    index, tool_results = await future
+                except Exception as e:
+                    errors.append(e)
+                    logger.warning(
+                        f"Sub-tool of {self.name} failed or timed out: {type(e).__name__} {str(e)}"
                     )
-                    for tool in self.tools
-                ],
-                start=[],
-            )
+                    continue
+
+                # 도착하는 대로 합치되, 같은 출처는 우선순위가 높은 결과만 남김.
+                for position, result in enumerate(tool_results or []):
+                    order = (ranks[index], position)
+                    key = self._source_key(result) or (index, position)
+                    if key not in merged or order < merged[key][0]:
+                        merged[key] = (order, result)
+
+            if errors and len(errors) == len(self.tools):
+                raise errors[0]
+
+            results = [
+                result for _, result in sorted(merged.values(), key=lambda x: x[0])
+            ]
 
             if self.name == "search_news" and results:
                 await dispatcher(
@@ -76,3 +128,17 @@ class ConcatTool(AsyncTool):
         except Exception as e:
             logger.error(f"Error executing ConcatTool: {str(e)}")
             raise
+
+    def _rank(self, tool: AsyncTool, index: int) -> int:
+        if tool.name in self.priority:
+            return self.priority.index(tool.name)
+        return len(self.priority) + index
+
+    @staticmethod
+    def _source_key(result: Any) -> Optional[str]:
+        if not isinstance(result, dict):
+            return None
+
+        metadata = result.get("metadata") or {}
+        source = metadata.get("source") or metadata.get("link") or result.get("url")
+        return canonicalize_url(source) if isinstance(source, str) and source else None
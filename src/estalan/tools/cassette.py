@@ -0,0 +1,350 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from estalan.logging_config import get_logger
+from estalan.tools.http_client import HTTPClientRegistry, http_clients
+
+logger = get_logger(__name__)
+
+RECORD, REPLAY = "record", "replay"
+CASSETTE_VERSION = 1
+
+# replay 시 기본 응답 지연. (recorded, none, fixed:<초>, lognormal:<중앙값>,<sigma>)
+HTTP_CASSETTE_LATENCY = os.getenv("HTTP_CASSETTE_LATENCY", "recorded")
+
+# API key 등은 cassette에 남기지 않음. (요청 header는 key 계산에 쓰는 것 외에는 저장하지 않음)
+REDACTED_QUERY_PARAMS = {"key", "api_key", "apikey", "token", "access_token"}
+# 같은 URL이라도 응답이 달라지는 요청 header. (image probe의 Range 요청 등)
+KEY_HEADERS = ("range",)
+# 응답 header 중 tool 동작에 영향을 주는 것만 저장. 본문은 디코딩된 상태로 저장하므로 encoding 관련 header는 제외.
+RESPONSE_HEADERS = {
+    "content-type",
+    "content-range",
+    "content-disposition",
+    "cache-control",
+    "etag",
+    "last-modified",
+    "expires",
+    "location",
+    "retry-after",
+    "access-control-allow-origin",
+}
+
+
+class CassetteMissError(httpx.TransportError):
+    """replay 중 cassette에 기록되지 않은 요청."""
+
+
+def _canonical_url(url: httpx.URL) -> str:
+    parts = urlsplit(str(url))
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in REDACTED_QUERY_PARAMS
+    )
+    return urlunsplit(
+        (parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), "")
+    )
+
+
+@dataclass(slots=True)
+class Interaction:
+    """기록된 요청 하나의 응답. 요청 실패는 `error`에 httpx 예외 이름으로 남긴다."""
+
+    method: str
+    url: str
+    status: int = 0
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "method": self.method,
+            "url": self.url,
+            "elapsed": round(self.elapsed, 4),
+        }
+        if self.error is not None:
+            data["error"] = self.error
+            return data
+
+        data["status"] = self.status
+        data["headers"] = self.headers
+        try:
+            data["text"] = self.body.decode("utf-8")
+        except UnicodeDecodeError:
+            data["base64"] = base64.b64encode(self.body).decode("ascii")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Interaction":
+        if "base64" in data:
+            body = base64.b64decode(data["base64"])
+        else:
+            body = data.get("text", "").encode("utf-8")
+        return cls(
+            method=data["method"],
+            url=data["url"],
+            status=data.get("status", 0),
+            headers=data.get("headers", {}),
+            body=body,
+            elapsed=data.get("elapsed", 0.0),
+            error=data.get("error"),
+        )
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        if self.error is not None:
+            error_class = getattr(httpx, self.error, httpx.TransportError)
+            if not (
+                isinstance(error_class, type)
+                and issubclass(error_class, httpx.TransportError)
+            ):
+                error_class = httpx.TransportError
+            raise error_class(f"Recorded {self.error}: {self.url}", request=request)
+
+        return httpx.Response(self.status, headers=self.headers, content=self.body)
+
+
+class Cassette:
+    """요청 key별로 기록한 응답 모음. gzip으로 압축한 JSON 파일 하나에 저장한다.
+
+    key는 method, API key를 제외하고 정렬한 URL, 요청 본문의 hash, `KEY_HEADERS`로 만든다.
+    같은 key로 여러 번 기록된 응답은 기록된 순서대로 재생하고, 다 쓰면 마지막 응답을 반복한다.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        interactions: Optional[dict[str, list[Interaction]]] = None,
+    ):
+        self.path = path
+        self.interactions = interactions or {}
+        self._positions: dict[str, int] = {}
+        self.stats = {"recorded": 0, "played": 0, "misses": 0}
+
+    @staticmethod
+    def request_key(request: httpx.Request) -> str:
+        parts = [request.method, _canonical_url(request.url)]
+        if request.content:
+            parts.append(hashlib.sha256(request.content).hexdigest()[:16])
+        parts.extend(
+            f"{name}={request.headers[name]}"
+            for name in KEY_HEADERS
+            if name in request.headers
+        )
+        return " ".join(parts)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+
+        interactions = {
+            key: [Interaction.from_dict(entry) for entry in entries]
+            for key, entries in data["interactions"].items()
+        }
+        logger.info(f"Loaded cassette {path}: {len(interactions)} requests")
+        return cls(path, interactions)
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if path is None:
+            raise ValueError("Cassette path is not set")
+
+        data = {
+            "version": CASSETTE_VERSION,
+            "interactions": {
+                key: [entry.to_dict() for entry in entries]
+                for key, entries in self.interactions.items()
+            },
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        logger.info(f"Saved cassette {path}: {len(self.interactions)} requests")
+
+    def record(self, request: httpx.Request, interaction: Interaction) -> None:
+        self.interactions.setdefault(self.request_key(request), []).append(interaction)
+        self.stats["recorded"] += 1
+
+    def play(self, request: httpx.Request) -> Optional[Interaction]:
+        key = self.request_key(request)
+        entries = self.interactions.get(key)
+        if not entries:
+            self.stats["misses"] += 1
+            return None
+
+        position = self._positions.get(key, 0)
+        self._positions[key] = position + 1
+        self.stats["played"] += 1
+        return entries[min(position, len(entries) - 1)]
+
+    def rewind(self) -> None:
+        """처음 기록된 응답부터 다시 재생. (benchmark 반복 실행 시)"""
+        self._positions.clear()
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+
+@dataclass(slots=True)
+class LatencyModel:
+    """replay 시 응답 전에 기다릴 시간.
+
+    - recorded: 기록할 때 걸린 시간 × `scale`
+    - none: 기다리지 않음
+    - fixed: 항상 `value`초
+    - lognormal: 중앙값 `value`초, 표준편차 `sigma`(log scale)인 log-normal 분포 (긴 꼬리를 가진 실제 API 지연과 유사)
+    """
+
+    kind: str = "recorded"
+    value: float = 0.0
+    sigma: float = 0.0
+    scale: float = 1.0
+    seed: Optional[int] = None
+    _rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.kind not in ("recorded", "none", "fixed", "lognormal"):
+            raise ValueError(f"Unknown latency model: {self.kind}")
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def from_spec(cls, spec: str, seed: Optional[int] = None) -> "LatencyModel":
+        """`recorded`, `recorded:0.5`, `none`, `fixed:0.2`, `lognormal:0.3,0.6` 형식의 설정을 해석."""
+        kind, _, args = spec.partition(":")
+        values = [float(value) for value in args.split(",") if value]
+        if kind == "recorded":
+            return cls(kind, scale=values[0] if values else 1.0, seed=seed)
+        if kind == "fixed":
+            return cls(kind, value=values[0], seed=seed)
+        if kind == "lognormal":
+            return cls(kind, value=values[0], sigma=values[1], seed=seed)
+        return cls(kind, seed=seed)
+
+    def delay(self, recorded: float) -> float:
+        if self.kind == "recorded":
+            return recorded * self.scale
+        if self.kind == "fixed":
+            return self.value
+        if self.kind == "lognormal":
+            return self._rng.lognormvariate(math.log(self.value), self.sigma)
+        return 0.0
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """record 모드에서는 `transport`로 요청을 보내고 응답을 기록하며,
+    replay 모드에서는 network 없이 기록된 응답을 `latency`만큼 기다린 뒤 반환한다."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        mode: str = REPLAY,
+        latency: Optional[LatencyModel] = None,
+    ):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == RECORD and transport is None:
+            raise ValueError("Record mode requires a transport")
+
+        self.cassette = cassette
+        self._transport = transport
+        self.mode = mode
+        self.latency = latency or LatencyModel()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        if self.mode == REPLAY:
+            return await self._replay(request)
+        return await self._record(request)
+
+    async def _replay(self, request: httpx.Request) -> httpx.Response:
+        interaction = self.cassette.play(request)
+        if interaction is None:
+            raise CassetteMissError(
+                f"Request not in cassette: {self.cassette.request_key(request)}",
+                request=request,
+            )
+
+        delay = self.latency.delay(interaction.elapsed)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return interaction.to_response(request)
+
+    async def _record(self, request: httpx.Request) -> httpx.Response:
+        interaction = Interaction(
+            method=request.method, url=_canonical_url(request.url)
+        )
+        started_at = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+            try:
+                body = await response.aread()
+            finally:
+                await response.aclose()
+        except httpx.TransportError as e:
+            interaction.elapsed = time.perf_counter() - started_at
+            interaction.error = type(e).__name__
+            self.cassette.record(request, interaction)
+            raise
+
+        interaction.elapsed = time.perf_counter() - started_at
+        interaction.status = response.status_code
+        interaction.headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() in RESPONSE_HEADERS
+        }
+        interaction.body = body
+        self.cassette.record(request, interaction)
+        return interaction.to_response(request)
+
+    async def aclose(self) -> None:
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+@contextmanager
+def use_cassette(
+    path: str,
+    mode: str = REPLAY,
+    latency: str | LatencyModel = HTTP_CASSETTE_LATENCY,
+    registry: HTTPClientRegistry = http_clients,
+    seed: Optional[int] = None,
+) -> Iterator[Cassette]:
+    """공유 HTTP client의 모든 요청(Serper, RapidAPI, 페이지 fetch)을 cassette로 기록하거나 재생.
+
+    record 모드는 새 cassette에 기록하고 종료 시 `path`에 저장한다.
+    host별 동시 요청 제한과 domain scheduler는 cassette 위에서 그대로 동작한다.
+    """
+    cassette = Cassette.load(path) if mode == REPLAY else Cassette(path)
+    if isinstance(latency, str):
+        latency = LatencyModel.from_spec(latency, seed=seed)
+
+    registry.set_transport_wrapper(
+        lambda transport: CassetteTransport(cassette, transport, mode, latency)
+    )
+    try:
+        yield cassette
+    finally:
+        registry.set_transport_wrapper(None)
+        if mode == RECORD:
+            cassette.save()
+        logger.info(f"Cassette {path} ({mode}): {cassette.stats}")
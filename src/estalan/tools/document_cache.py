@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from estalan.logging_config import get_logger
+from estalan.tools.utils import canonicalize_url
+
+logger = get_logger(__name__)
+
+DOCUMENT_CACHE_PATH = os.getenv("DOCUMENT_CACHE_PATH")
+DOCUMENT_CACHE_TTL = float(os.getenv("DOCUMENT_CACHE_TTL", 3600))
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", 512))
+
+
+@dataclass(slots=True)
+class CleanedDocument:
+    markdown: str
+    title: Optional[str]
+    metadata: dict[str, Any] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class CleanedDocumentCache:
+    """정제된 markdown 문서 캐시. 같은 URL의 같은 내용은 tool/사용자와 관계없이 한 번만 정제한다.
+
+    - 키는 정규화한 URL + 원본 HTML의 hash이므로, 페이지 내용이 바뀌면 자연히 새 항목이 된다.
+    - 메모리 LRU(`max_entries`)를 먼저 보고, `path`가 있으면 디스크(SQLite) 캐시를 함께 사용.
+    - 항목은 `ttl`초(저장 시 지정하면 그 값) 후 만료된다.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DOCUMENT_CACHE_TTL,
+        max_entries: int = DOCUMENT_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, CleanedDocument] = OrderedDict()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+        }
+
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    key TEXT PRIMARY KEY,
+                    markdown TEXT NOT NULL,
+                    title TEXT,
+                    metadata TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """)
+            self._conn.commit()
+        logger.debug(f"CleanedDocumentCache initialized (disk: {path})")
+
+    @staticmethod
+    def cache_key(url: Optional[str], html_text: str, pipeline: str = "") -> str:
+        """`pipeline`은 정제 방식 이름. 방식을 바꾸면 이전 방식의 결과를 재사용하지 않음."""
+        content_hash = hashlib.sha256(
+            html_text.encode("utf-8", errors="surrogatepass")
+        ).hexdigest()
+        raw = f"{canonicalize_url(url) if url else ''}\n{content_hash}"
+        if pipeline:
+            raw += f"\n{pipeline}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CleanedDocument]:
+        entry = self._get_from_memory(key)
+        if entry is None:
+            entry = self._remember_disk_hit(key, self._get_from_disk(key))
+        return entry
+
+    def put(
+        self,
+        key: str,
+        markdown: str,
+        title: Optional[str],
+        metadata: Optional[dict[str, Any]] = None,
+        ttl: Optional[float] = None,
+    ) -> CleanedDocument:
+        entry = self._put_to_memory(key, markdown, title, metadata, ttl)
+        self._put_to_disk(key, entry)
+        return entry
+
+    async def aget(self, key: str) -> Optional[CleanedDocument]:
+        # 메모리 LRU는 event loop에서만 다루고, 디스크 I/O만 thread로 넘김.
+        entry = self._get_from_memory(key)
+        if entry is None:
+            disk_entry = (
+                await asyncio.to_thread(self._get_from_disk, key)
+                if self._conn is not None
+                else None
+            )
+            entry = self._remember_disk_hit(key, disk_entry)
+        return entry
+
+    async def aput(
+        self,
+        key: str,
+        markdown: str,
+        title: Optional[str],
+        metadata: Optional[dict[str, Any]] = None,
+        ttl: Optional[float] = None,
+    ) -> CleanedDocument:
+        entry = self._put_to_memory(key, markdown, title, metadata, ttl)
+        if self._conn is not None:
+            await asyncio.to_thread(self._put_to_disk, key, entry)
+        return entry
+
+    def _get_from_memory(self, key: str) -> Optional[CleanedDocument]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if not entry.is_fresh:
+            del self._memory[key]
+            return None
+
+        self._memory.move_to_end(key)
+        self.stats["memory_hits"] += 1
+        return entry
+
+    def _remember_disk_hit(
+        self, key: str, entry: Optional[CleanedDocument]
+    ) -> Optional[CleanedDocument]:
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["disk_hits"] += 1
+        self._remember(key, entry)
+        return entry
+
+    def _put_to_memory(
+        self,
+        key: str,
+        markdown: str,
+        title: Optional[str],
+        metadata: Optional[dict[str, Any]],
+        ttl: Optional[float] = None,
+    ) -> CleanedDocument:
+        entry = CleanedDocument(
+            markdown=markdown,
+            title=title,
+            metadata=dict(metadata or {}),
+            expires_at=time.time() + (self.ttl if ttl is None else ttl),
+        )
+        self._remember(key, entry)
+        self.stats["stores"] += 1
+        return entry
+
+    def _remember(self, key: str, entry: CleanedDocument) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_from_disk(self, key: str) -> Optional[CleanedDocument]:
+        if self._conn is None:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT markdown, title, metadata, expires_at FROM documents WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        markdown, title, metadata, expires_at = row
+        entry = CleanedDocument(
+            markdown=markdown,
+            title=title,
+            metadata=json.loads(metadata),
+            expires_at=expires_at,
+        )
+        return entry if entry.is_fresh else None
+
+    def _put_to_disk(self, key: str, entry: CleanedDocument) -> None:
+        if self._conn is None:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.markdown,
+                    entry.title,
+                    json.dumps(entry.metadata, ensure_ascii=False, default=str),
+                    entry.expires_at,
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM documents WHERE expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+
+    def metrics(self) -> dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+document_cache = CleanedDocumentCache(DOCUMENT_CACHE_PATH)
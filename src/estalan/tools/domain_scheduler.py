@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DOMAIN_MIN_INTERVAL = float(os.getenv("DOMAIN_MIN_INTERVAL", 0.1))
+DOMAIN_FAILURE_THRESHOLD = int(os.getenv("DOMAIN_FAILURE_THRESHOLD", 5))
+DOMAIN_RECOVERY_TIMEOUT = float(os.getenv("DOMAIN_RECOVERY_TIMEOUT", 30))
+DOMAIN_NEGATIVE_TTL = float(os.getenv("DOMAIN_NEGATIVE_TTL", 60))
+NEGATIVE_CACHE_MAX_ENTRIES = 1024
+# 상태를 유지할 최대 domain 수. 넘으면 오래 사용하지 않은 정상(closed) domain부터 제거.
+DOMAIN_STATE_MAX_ENTRIES = 1024
+
+# 특정 URL이 아니라 domain 전체의 상태를 나타내는 응답 코드 (차단, rate limit, 서버 오류).
+DOMAIN_FAILURE_STATUSES = {403, 429}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class DomainUnavailableError(httpx.TransportError):
+    """circuit breaker가 열렸거나 최근 실패한 URL이라 요청을 보내지 않은 경우."""
+
+
+@dataclass(slots=True)
+class DomainPolicy:
+    min_interval: float = DOMAIN_MIN_INTERVAL
+    failure_threshold: int = DOMAIN_FAILURE_THRESHOLD
+    recovery_timeout: float = DOMAIN_RECOVERY_TIMEOUT
+    negative_ttl: float = DOMAIN_NEGATIVE_TTL
+
+
+@dataclass(slots=True)
+class DomainState:
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    next_request_at: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    rejected: int = 0
+
+
+class DomainScheduler:
+    """domain별 요청 간격, circuit breaker, 실패 URL의 negative cache를 관리.
+
+    - 같은 domain에는 `min_interval` 간격으로 요청을 보낸다. (동시 요청 수는 transport의 host별 제한을 따름)
+    - timeout/연결 오류, 5xx, 403/429가 `failure_threshold`번 연속되면 breaker를 열고,
+      `recovery_timeout` 동안 해당 domain 요청을 바로 실패시킨다. 이후 한 번의 시험 요청으로 회복 여부를 판단.
+    - 실패한 GET URL은 `negative_ttl` 동안 다시 요청하지 않는다.
+
+    event loop에 묶이는 객체를 가지지 않으므로 모든 client가 하나의 인스턴스를 공유한다.
+    """
+
+    def __init__(self, default_policy: Optional[DomainPolicy] = None):
+        self.default_policy = default_policy or DomainPolicy()
+        self._policies: dict[str, DomainPolicy] = {}
+        self._domains: OrderedDict[str, DomainState] = OrderedDict()
+        self._negative: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def set_policy(self, host: str, policy: DomainPolicy) -> None:
+        self._policies[host] = policy
+
+    def policy(self, host: str) -> DomainPolicy:
+        return self._policies.get(host, self.default_policy)
+
+    def _state(self, host: str) -> DomainState:
+        state = self._domains.get(host)
+        if state is None:
+            state = self._domains[host] = DomainState()
+            self._evict_idle()
+        self._domains.move_to_end(host)
+        return state
+
+    def _evict_idle(self) -> None:
+        """LRU 순으로 정상 상태이고 대기 중인 요청이 없는 domain을 제거.
+
+        breaker가 열렸거나 실패가 누적 중인 domain은 상태를 잃지 않도록 남겨 둔다.
+        """
+        excess = len(self._domains) - DOMAIN_STATE_MAX_ENTRIES
+        if excess <= 0:
+            return
+
+        now = time.monotonic()
+        idle = []
+        for host, state in self._domains.items():
+            if len(idle) >= excess:
+                break
+            if (
+                state.state == CLOSED
+                and state.consecutive_failures == 0
+                and state.next_request_at <= now
+            ):
+                idle.append(host)
+        for host in idle:
+            del self._domains[host]
+
+    async def acquire(self, request: httpx.Request) -> None:
+        """요청을 보내도 되는지 확인하고, 필요하면 최소 간격만큼 기다림."""
+        host = request.url.host
+        policy = self.policy(host)
+        state = self._state(host)
+        now = time.monotonic()
+
+        if request.method == "GET":
+            negative = self._negative.get(str(request.url))
+            if negative is not None and negative[0] > now:
+                state.rejected += 1
+                raise DomainUnavailableError(
+                    f"Recently failed, skipping: {request.url} ({negative[1]})"
+                )
+
+        if state.state == HALF_OPEN:
+            # 시험 요청의 결과가 나올 때까지는 다른 요청을 보내지 않음.
+            state.rejected += 1
+            raise DomainUnavailableError(f"Circuit half-open for {host}")
+        if state.state == OPEN:
+            if now - state.opened_at < policy.recovery_timeout:
+                state.rejected += 1
+                raise DomainUnavailableError(f"Circuit open for {host}")
+            logger.info(f"Circuit half-open for {host}, sending probe request")
+            state.state = HALF_OPEN
+
+        # 다음 요청 시각을 먼저 예약해서 동시에 들어온 요청도 간격을 두고 나가게 함.
+        start_at = max(now, state.next_request_at)
+        state.next_request_at = start_at + policy.min_interval
+        state.requests += 1
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    def record_response(self, request: httpx.Request, response: httpx.Response) -> None:
+        status = response.status_code
+        if status >= 500 or status in DOMAIN_FAILURE_STATUSES:
+            self._record_failure(request, f"HTTP {status}", domain_failure=True)
+        elif status >= 400:
+            # 404 등은 해당 URL만의 문제이고 domain은 응답하고 있으므로 breaker에는 성공으로 반영.
+            self._record_failure(request, f"HTTP {status}", domain_failure=False)
+            self._record_success(request.url.host)
+        else:
+            self._record_success(request.url.host)
+
+    def record_error(self, request: httpx.Request, error: BaseException) -> None:
+        if isinstance(
+            error,
+            (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError),
+        ):
+            self._record_failure(request, type(error).__name__, domain_failure=True)
+            return
+
+        state = self._state(request.url.host)
+        if state.state == HALF_OPEN:
+            # 시험 요청이 취소되는 등 결과를 알 수 없으면 다음 요청이 바로 다시 시험하도록 함.
+            state.state = OPEN
+            state.opened_at = 0.0
+
+    def _record_success(self, host: str) -> None:
+        state = self._state(host)
+        if state.state != CLOSED:
+            logger.info(f"Circuit closed for {host}")
+        state.state = CLOSED
+        state.consecutive_failures = 0
+
+    def _record_failure(
+        self, request: httpx.Request, reason: str, domain_failure: bool
+    ) -> None:
+        host = request.url.host
+        policy = self.policy(host)
+        state = self._state(host)
+        state.failures += 1
+
+        if request.method == "GET" and policy.negative_ttl > 0:
+            self._negative[str(request.url)] = (
+                time.monotonic() + policy.negative_ttl,
+                reason,
+            )
+            self._negative.move_to_end(str(request.url))
+            while len(self._negative) > NEGATIVE_CACHE_MAX_ENTRIES:
+                self._negative.popitem(last=False)
+
+        if not domain_failure:
+            return
+
+        state.consecutive_failures += 1
+        if (
+            state.state == HALF_OPEN
+            or state.consecutive_failures >= policy.failure_threshold
+        ):
+            if state.state != OPEN:
+                logger.warning(
+                    f"Circuit opened for {host} after {state.consecutive_failures} failures ({reason})"
+                )
+            state.state = OPEN
+            state.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """모니터링용 domain별 breaker 상태."""
+        now = time.monotonic()
+        report = {}
+        for host, state in self._domains.items():
+            retry_in = 0.0
+            if state.state == OPEN:
+                retry_in = max(
+                    self.policy(host).recovery_timeout - (now - state.opened_at), 0.0
+                )
+            report[host] = {
+                "state": state.state,
+                "consecutive_failures": state.consecutive_failures,
+                "retry_in_seconds": retry_in,
+                "requests": state.requests,
+                "failures": state.failures,
+                "rejected": state.rejected,
+            }
+        return report
+
+    def reset(self) -> None:
+        self._domains.clear()
+        self._negative.clear()
+
+
+domain_scheduler = DomainScheduler()
@@ -0,0 +1,398 @@
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import lxml.html
+from lxml import etree
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# HTML 정제 방식.
+# - lxml(기본값): 이 module의 clean_html (lxml tree 하나로 전체 처리)
+# - legacy: readability-lxml로 본문 추출 -> markdownify (`est-alan[html-legacy]` 필요).
+#   특정 페이지에서 lxml 방식의 결과에 문제가 있을 때 되돌리기 위한 fallback.
+# 정제 로직을 바꾸면 script/compare_html_pipelines.py로 대표 페이지에서 legacy와 결과를 비교한다.
+HTML_PIPELINE = os.getenv("HTML_PIPELINE", "lxml")
+
+# 본문과 무관해서 parse 직후 제거하는 요소.
+STRIP_XPATH = (
+    "//style|//script|//noscript|//template|//iframe|//svg"
+    "|//link[contains(translate(@rel, 'STYLESHEET', 'stylesheet'), 'stylesheet')]"
+)
+
+UNLIKELY_PATTERN = re.compile(
+    r"banner|breadcrumb|combx|comment|community|cookie|disqus|footer|gdpr|header"
+    r"|menu|modal|nav|popup|related|remark|rss|share|shoutbox|sidebar|social"
+    r"|sponsor|ad-break|agegate|pagination|pager|subscribe",
+    re.IGNORECASE,
+)
+MAYBE_PATTERN = re.compile(
+    r"and|article|body|column|content|main|shadow", re.IGNORECASE
+)
+POSITIVE_PATTERN = re.compile(
+    r"article|body|content|entry|hentry|main|page|post|text|blog|story",
+    re.IGNORECASE,
+)
+NEGATIVE_PATTERN = re.compile(
+    r"combx|comment|contact|foot|footer|footnote|masthead|media|meta|promo|related"
+    r"|scroll|shoutbox|sidebar|sponsor|shopping|tags|tool|widget",
+    re.IGNORECASE,
+)
+
+PARAGRAPH_TAGS = ("p", "pre", "td", "blockquote")
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tbody",
+    "td", "tfoot", "th", "thead", "tr", "ul",
+}  # fmt: skip
+TAG_SCORES = {
+    "div": 5,
+    "article": 5,
+    "main": 5,
+    "section": 3,
+    "pre": 3,
+    "td": 3,
+    "blockquote": 3,
+    "form": -3,
+    "ol": -3,
+    "ul": -3,
+    "li": -3,
+    "h1": -5,
+    "h2": -5,
+    "h3": -5,
+    "h4": -5,
+    "h5": -5,
+    "h6": -5,
+    "th": -5,
+}
+MIN_PARAGRAPH_LENGTH = 25
+WHITESPACE_PATTERN = re.compile(r"\s+")
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+@dataclass(slots=True)
+class CleanedPage:
+    title: Optional[str]
+    markdown: str
+
+
+def parse_html(html_text: str) -> lxml.html.HtmlElement:
+    """HTML을 한 번만 parse해서 이후 단계가 공유할 tree를 만든다."""
+    # encoding 선언이 있는 str은 lxml이 거부하므로 bytes로 넘김.
+    return lxml.html.document_fromstring(
+        html_text.encode("utf-8"),
+        parser=lxml.html.HTMLParser(encoding="utf-8", remove_comments=True),
+    )
+
+
+def strip_stylesheets(tree: lxml.html.HtmlElement) -> None:
+    """stylesheet, script 등 본문이 아닌 요소를 tree에서 직접 제거."""
+    for node in tree.xpath(STRIP_XPATH):
+        node.drop_tree()
+
+
+def extract_title(tree: lxml.html.HtmlElement) -> Optional[str]:
+    title = tree.findtext(".//title")
+    if title is None:
+        return None
+
+    return WHITESPACE_PATTERN.sub(" ", title).strip() or None
+
+
+def extract_main_content(tree: lxml.html.HtmlElement) -> lxml.html.HtmlElement:
+    """readability와 같은 방식(문단 점수를 부모에 누적하고 link 밀도로 보정)으로 본문 요소를 선택.
+
+    tree를 복사하지 않고 본문이 아닌 요소를 제거한 뒤, 본문 후보 요소를 반환한다.
+    """
+    body = tree.find("body")
+    if body is None:
+        body = tree
+
+    _remove_unlikely_candidates(body)
+
+    scores: dict[lxml.html.HtmlElement, float] = {}
+    for paragraph in body.iter(*PARAGRAPH_TAGS):
+        text = paragraph.text_content().strip()
+        if len(text) < MIN_PARAGRAPH_LENGTH:
+            continue
+
+        score = 1 + text.count(",") + text.count("，") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        for ancestor, weight in ((parent, 1), (_parent(parent), 0.5)):
+            if ancestor is None or not isinstance(ancestor.tag, str):
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = _initial_score(ancestor)
+            scores[ancestor] += score * weight
+
+    if not scores:
+        logger.debug("No content candidates found, using whole body")
+        return body
+
+    best, best_score = max(
+        ((node, score * (1 - _link_density(node))) for node, score in scores.items()),
+        key=lambda item: item[1],
+    )
+    logger.debug(f"Selected <{best.tag}> as main content (score={best_score:.1f})")
+
+    # 점수가 충분히 높은 형제 요소(같은 본문이 여러 블록으로 나뉜 경우)도 포함.
+    parent = best.getparent()
+    if parent is None:
+        return best
+
+    threshold = max(10, best_score * 0.2)
+    siblings = [
+        node
+        for node in parent
+        if node is best
+        or (node in scores and scores[node] * (1 - _link_density(node)) >= threshold)
+    ]
+    if len(siblings) == 1:
+        return best
+
+    article = lxml.html.Element("div")
+    article.extend(siblings)
+    return article
+
+
+def _parent(node: Optional[lxml.html.HtmlElement]):
+    return node.getparent() if node is not None else None
+
+
+def _remove_unlikely_candidates(body: lxml.html.HtmlElement) -> None:
+    for node in list(body.iter()):
+        if not isinstance(node.tag, str) or node.tag in (
+            "html",
+            "body",
+            "article",
+            "main",
+        ):
+            continue
+        if node.getparent() is None:
+            continue
+
+        hint = f"{node.get('class', '')} {node.get('id', '')}"
+        if (
+            node.tag in ("nav", "aside", "footer")
+            or node.get("hidden") is not None
+            or (UNLIKELY_PATTERN.search(hint) and not MAYBE_PATTERN.search(hint))
+        ):
+            node.drop_tree()
+
+
+def _initial_score(node: lxml.html.HtmlElement) -> float:
+    score = TAG_SCORES.get(node.tag, 0)
+    hint = f"{node.get('class', '')} {node.get('id', '')}"
+    if NEGATIVE_PATTERN.search(hint):
+        score -= 25
+    if POSITIVE_PATTERN.search(hint):
+        score += 25
+    return score
+
+
+def _link_density(node: lxml.html.HtmlElement) -> float:
+    text_length = len(node.text_content())
+    if not text_length:
+        return 0.0
+
+    link_length = sum(len(link.text_content()) for link in node.iter("a"))
+    return link_length / text_length
+
+
+class MarkdownRenderer:
+    """lxml tree를 직접 순회하며 markdown으로 변환 (ATX heading, link/image는 text만 남김)."""
+
+    def render(self, node: lxml.html.HtmlElement) -> str:
+        markdown = self._render_children(node)
+        markdown = re.sub(r"[ \t]+\n", "\n", markdown)
+        return re.sub(r"\n{3,}", "\n\n", markdown).strip()
+
+    def _render_children(self, node: lxml.html.HtmlElement) -> str:
+        parts = [self._inline_text(node.text)]
+        for child in node:
+            if isinstance(child.tag, str):
+                parts.append(self._render(child))
+            parts.append(self._inline_text(child.tail))
+        return "".join(parts)
+
+    def _render(self, node: lxml.html.HtmlElement) -> str:
+        tag = node.tag
+
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = self._render_children(node).strip()
+            return f"\n\n{'#' * int(tag[1])} {text}\n\n" if text else ""
+        if tag == "pre":
+            return f"\n\n```\n{node.text_content().strip(chr(10))}\n```\n\n"
+        if tag == "code":
+            text = node.text_content()
+            return f"`{text}`" if text else ""
+        if tag == "br":
+            return "\n"
+        if tag == "hr":
+            return "\n\n---\n\n"
+        if tag == "img":
+            return ""
+        if tag in ("strong", "b"):
+            return self._wrap(node, "**")
+        if tag in ("em", "i"):
+            return self._wrap(node, "*")
+        if tag in ("ul", "ol"):
+            return self._render_list(node)
+        if tag == "blockquote":
+            text = self._render_children(node).strip()
+            quoted = "\n".join(
+                f"> {line}" if line else ">" for line in text.split("\n")
+            )
+            return f"\n\n{quoted}\n\n"
+        if tag == "table":
+            return self._render_table(node)
+
+        text = self._render_children(node)
+        if tag in BLOCK_TAGS:
+            return f"\n\n{text.strip()}\n\n"
+        return text
+
+    def _wrap(self, node: lxml.html.HtmlElement, marker: str) -> str:
+        text = self._render_children(node)
+        if not text.strip():
+            return text
+        # 공백은 강조 표시 밖으로 빼야 markdown으로 인식됨.
+        stripped = text.strip()
+        prefix = text[: len(text) - len(text.lstrip())]
+        suffix = text[len(text.rstrip()) :]
+        return f"{prefix}{marker}{stripped}{marker}{suffix}"
+
+    def _render_list(self, node: lxml.html.HtmlElement) -> str:
+        lines = []
+        for index, item in enumerate(node.iterchildren("li"), start=1):
+            bullet = f"{index}." if node.tag == "ol" else "-"
+            text = self._render_children(item).strip()
+            text = re.sub(r"\n{2,}", "\n", text).replace("\n", "\n  ")
+            lines.append(f"{bullet} {text}")
+        return "\n\n" + "\n".join(lines) + "\n\n" if lines else ""
+
+    def _render_table(self, node: lxml.html.HtmlElement) -> str:
+        rows = []
+        for row in node.iter("tr"):
+            cells = [self._table_cell(cell) for cell in row if cell.tag in ("td", "th")]
+            if cells:
+                rows.append(cells)
+        if not rows:
+            return ""
+
+        # 열 수는 셀 요소 개수로 정하고, 셀이 모자란 행은 빈 셀로 채움.
+        columns = max(len(cells) for cells in rows)
+        lines = [
+            "| " + " | ".join(cells + [""] * (columns - len(cells))) + " |"
+            for cells in rows
+        ]
+        separator = "|" + " --- |" * columns
+        return "\n\n" + "\n".join([lines[0], separator, *lines[1:]]) + "\n\n"
+
+    @staticmethod
+    def _table_cell(cell: lxml.html.HtmlElement) -> str:
+        text = WHITESPACE_PATTERN.sub(" ", cell.text_content()).strip()
+        # 셀 안의 |가 열 구분자로 해석되지 않도록 escape.
+        return text.replace("|", "\\|")
+
+    @staticmethod
+    def _inline_text(text: Optional[str]) -> str:
+        return WHITESPACE_PATTERN.sub(" ", text) if text else ""
+
+
+def clean_html(html_text: str, extract: bool = True) -> CleanedPage:
+    """한 번 parse한 tree 위에서 stylesheet 제거 -> 제목 추출 -> 본문 추출 -> markdown 변환.
+
+    `extract=False`이면 이미 본문만 남은 HTML(예: readability 결과)로 보고 본문 추출을 건너뜀.
+    """
+    if not html_text.strip():
+        return CleanedPage(title=None, markdown="")
+
+    try:
+        tree = parse_html(html_text)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Failed to parse HTML: {str(e)}")
+        return CleanedPage(title=None, markdown="")
+
+    strip_stylesheets(tree)
+    title = extract_title(tree)
+    if extract:
+        content = extract_main_content(tree)
+    else:
+        content = tree.find("body") if tree.find("body") is not None else tree
+    return CleanedPage(title=title, markdown=MarkdownRenderer().render(content))
+
+
+def legacy_clean_html(html_text: str, extract: bool = True) -> CleanedPage:
+    """이전 정제 방식: stylesheet 제거 -> readability-lxml로 본문 추출 -> markdownify.
+
+    lxml 방식과 결과를 비교하는 기준(golden output)으로도 사용한다.
+    """
+    from bs4 import BeautifulSoup
+    from markdownify import markdownify
+    from readability import Document
+
+    if not html_text.strip():
+        return CleanedPage(title=None, markdown="")
+
+    soup = BeautifulSoup(html_text, "lxml")
+    for node in soup.select("style, script, link[rel=stylesheet]"):
+        node.decompose()
+
+    title = None
+    if (title_tag := soup.find("title")) is not None:
+        title = WHITESPACE_PATTERN.sub(" ", title_tag.get_text()).strip() or None
+
+    content = Document(str(soup)).summary() if extract else str(soup)
+    markdown = markdownify(content, strip=["a", "img"], heading_style="ATX")
+    return CleanedPage(
+        title=title, markdown=re.sub(r"\n{3,}", "\n\n", markdown).strip()
+    )
+
+
+HTML_CLEANERS: dict[str, Callable[..., CleanedPage]] = {
+    "legacy": legacy_clean_html,
+    "lxml": clean_html,
+}
+_warned_fallback = False
+
+
+def get_html_cleaner(pipeline: str = HTML_PIPELINE) -> Callable[..., CleanedPage]:
+    """`pipeline`의 정제 함수. legacy에 필요한 package가 없으면 lxml 방식을 사용 (경고는 한 번만)."""
+    global _warned_fallback
+
+    if pipeline not in HTML_CLEANERS:
+        raise ValueError(f"Unknown HTML pipeline: {pipeline}")
+
+    if pipeline == "legacy":
+        try:
+            import markdownify  # noqa: F401
+            import readability  # noqa: F401
+        except ImportError as e:
+            if not _warned_fallback:
+                logger.warning(f"Legacy HTML pipeline unavailable, using lxml: {e}")
+                _warned_fallback = True
+            return clean_html
+
+    return HTML_CLEANERS[pipeline]
+
+
+def compare_markdown(expected: str, actual: str) -> dict[str, float]:
+    """두 markdown의 단어 일치도. markdown 문법과 공백 차이는 무시한다.
+
+    - recall: `expected`의 단어 중 `actual`에도 있는 비율 (본문을 빠뜨리지 않았는지)
+    - precision: `actual`의 단어 중 `expected`에도 있는 비율 (본문이 아닌 내용이 섞이지 않았는지)
+    """
+    expected_words = Counter(WORD_PATTERN.findall(expected.lower()))
+    actual_words = Counter(WORD_PATTERN.findall(actual.lower()))
+    overlap = sum((expected_words & actual_words).values())
+    expected_total, actual_total = expected_words.total(), actual_words.total()
+    return {
+        "recall": overlap / expected_total if expected_total else 1.0,
+        "precision": overlap / actual_total if actual_total else 1.0,
+    }
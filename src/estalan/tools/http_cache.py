@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+from estalan.logging_config import get_logger
+from estalan.tools.utils import canonicalize_url
+
+logger = get_logger(__name__)
+
+# 응답 내용을 바꿀 수 있어 캐시 키에 포함하는 요청 header.
+VARY_REQUEST_HEADERS = ("accept", "accept-language")
+# 304 응답에서 기존 항목에 반영하는 header.
+REVALIDATION_HEADERS = ("cache-control", "expires", "etag", "last-modified", "date")
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    url: str
+    final_url: str
+    headers: dict[str, str]
+    body: bytes
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def conditional_headers(self) -> dict[str, str]:
+        """재검증(conditional GET)에 사용할 요청 header."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _parse_cache_control(value: str) -> dict[str, Optional[str]]:
+    directives = {}
+    for directive in value.split(","):
+        name, _, arg = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+class HTTPCache:
+    """ContentFetcher용 디스크(SQLite) HTTP 응답 캐시.
+
+    - Cache-Control(no-store, no-cache, max-age, s-maxage)과 Expires를 따르고, 없으면 `default_ttl`을 적용.
+    - 만료된 항목은 ETag/Last-Modified로 조건부 요청을 보내 304이면 본문을 재사용.
+    - 전체 크기가 `max_size_bytes`를 넘으면 가장 오래 사용하지 않은 항목부터 제거(LRU).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default_ttl: float = 600,
+        max_size_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_size_bytes = max_size_bytes
+        self.stats = {
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                final_url TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+        logger.debug(f"HTTPCache initialized at {path}")
+
+    @staticmethod
+    def cache_key(url: str, headers: Optional[Mapping[str, str]] = None) -> str:
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        vary = "\n".join(f"{h}:{headers.get(h, '')}" for h in VARY_REQUEST_HEADERS)
+        raw = f"{canonicalize_url(url)}\n{vary}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def freshness_lifetime(self, headers: Mapping[str, str]) -> Optional[float]:
+        """응답 header로부터 캐시 유지 시간(초)을 계산. 저장하면 안 되는 응답이면 None."""
+        directives = _parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return 0
+
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name):
+                try:
+                    return max(int(directives[name]), 0)
+                except ValueError:
+                    pass
+
+        if expires := headers.get("expires"):
+            try:
+                return max(parsedate_to_datetime(expires).timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                return 0
+
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, final_url, headers, body, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+
+        url, final_url, headers, body, expires_at = row
+        return CachedResponse(
+            url=url,
+            final_url=final_url,
+            headers=json.loads(headers),
+            body=body,
+            expires_at=expires_at,
+        )
+
+    def put(
+        self,
+        key: str,
+        url: str,
+        final_url: str,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> Optional[CachedResponse]:
+        headers = {k.lower(): v for k, v in headers.items()}
+        lifetime = self.freshness_lifetime(headers)
+        if lifetime is None:
+            logger.debug(f"Response is not cacheable: {url}")
+            return None
+
+        # 만료 직후에도 재검증할 수단이 없다면 저장할 의미가 없음.
+        if lifetime == 0 and "etag" not in headers and "last-modified" not in headers:
+            return None
+
+        entry = CachedResponse(
+            url=url,
+            final_url=final_url,
+            headers=headers,
+            body=body,
+            expires_at=time.time() + lifetime,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    final_url,
+                    json.dumps(headers),
+                    body,
+                    len(body),
+                    entry.expires_at,
+                    time.time(),
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+        self.stats["stores"] += 1
+        return entry
+
+    def refresh(
+        self, key: str, entry: CachedResponse, headers: Mapping[str, str]
+    ) -> CachedResponse:
+        """304 응답의 header로 기존 항목의 만료 시각을 갱신."""
+        entry.headers.update(
+            {
+                k.lower(): v
+                for k, v in headers.items()
+                if k.lower() in REVALIDATION_HEADERS
+            }
+        )
+        lifetime = self.freshness_lifetime(entry.headers)
+        entry.expires_at = time.time() + (lifetime or 0)
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET headers = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                (json.dumps(entry.headers), entry.expires_at, time.time(), key),
+            )
+            self._conn.commit()
+        return entry
+
+    def _evict(self) -> None:
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_size_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    async def aget(self, key: str) -> Optional[CachedResponse]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, *args, **kwargs) -> Optional[CachedResponse]:
+        return await asyncio.to_thread(self.put, *args, **kwargs)
+
+    async def arefresh(self, *args, **kwargs) -> CachedResponse:
+        return await asyncio.to_thread(self.refresh, *args, **kwargs)
+
+    def metrics(self) -> dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": (
+                (self.stats["hits"] + self.stats["revalidated"]) / lookups
+                if lookups
+                else 0.0
+            ),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
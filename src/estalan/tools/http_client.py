@@ -0,0 +1,308 @@
+import asyncio
+import importlib.util
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import httpx
+
+from estalan.logging_config import get_logger
+from estalan.tools.domain_scheduler import DomainScheduler, domain_scheduler
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class HTTPClientProfile:
+    """공유 HTTP client 하나의 설정."""
+
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    max_connections_per_host: int = 10
+    http2: bool = True
+    follow_redirects: bool = True
+    proxy: Optional[str] = None
+    headers: dict[str, str] = field(default_factory=dict)
+    # domain별 요청 간격/circuit breaker(`domain_scheduler`) 적용 여부. 크롤링하는 페이지용.
+    domain_scheduling: bool = True
+
+
+@dataclass(slots=True)
+class HTTPClientMetrics:
+    """client별 요청 수와 새로 연결한 connection 수."""
+
+    requests: int = 0
+    connections: int = 0
+
+    def report(self) -> dict[str, Any]:
+        reused = max(self.requests - self.connections, 0)
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": reused,
+            "reuse_ratio": reused / self.requests if self.requests else 0.0,
+        }
+
+
+@dataclass(slots=True)
+class _HostSlots:
+    """host 하나의 동시 요청 제한과, 슬롯을 기다리거나 사용 중인 요청 수."""
+
+    semaphore: asyncio.Semaphore
+    users: int = 0
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """response가 닫힐 때 host 슬롯을 반환하는 stream."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """host별 동시 connection 수를 제한하고, connection 재사용 지표를 수집하는 transport.
+
+    `scheduler`가 있으면 요청 전에 domain별 요청 간격/circuit breaker를 확인하고 결과를 기록한다.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_connections_per_host: int,
+        metrics: HTTPClientMetrics,
+        scheduler: Optional[DomainScheduler] = None,
+    ):
+        self._transport = transport
+        self._max_connections_per_host = max_connections_per_host
+        # 사용 중인 host만 유지하고, 마지막 요청이 끝나면 제거.
+        self._hosts: dict[str, _HostSlots] = {}
+        self.metrics = metrics
+        self.scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.scheduler is None:
+            return await self._handle_limited(request)
+
+        await self.scheduler.acquire(request)
+        try:
+            response = await self._handle_limited(request)
+        except BaseException as e:
+            self.scheduler.record_error(request, e)
+            raise
+
+        self.scheduler.record_response(request, response)
+        return response
+
+    async def _handle_limited(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slots = self._hosts.get(host)
+        if slots is None:
+            slots = self._hosts[host] = _HostSlots(
+                asyncio.Semaphore(self._max_connections_per_host)
+            )
+        slots.users += 1
+        try:
+            await slots.semaphore.acquire()
+        except BaseException:
+            self._leave(host, slots)
+            raise
+
+        def release() -> None:
+            slots.semaphore.release()
+            self._leave(host, slots)
+
+        self.metrics.requests += 1
+        request.extensions["trace"] = self._trace(request.extensions.get("trace"))
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        if response.is_closed:
+            # 본문을 이미 모두 읽은 response는 바로 슬롯을 반환.
+            release()
+            return response
+
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    def _leave(self, host: str, slots: _HostSlots) -> None:
+        slots.users -= 1
+        if slots.users == 0 and self._hosts.get(host) is slots:
+            del self._hosts[host]
+
+    def _trace(self, inner: Optional[Callable]) -> Callable:
+        async def trace(event_name: str, info: dict) -> None:
+            # 새 TCP connection을 맺은 경우에만 발생하는 이벤트.
+            if event_name == "connection.connect_tcp.complete":
+                self.metrics.connections += 1
+            if inner is not None:
+                await inner(event_name, info)
+
+        return trace
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _has_h2() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _proxy_url_from_env() -> Optional[str]:
+    try:
+        return (
+            f"http://{os.environ['PROXY_ID']}:{os.environ['PROXY_PASSWORD']}"
+            f"@{os.environ['PROXY_HOST']}:{os.environ['PROXY_PORT']}"
+        )
+    except KeyError:
+        return None
+
+
+class HTTPClientRegistry:
+    """프로세스 전체에서 공유하는 profile별 `httpx.AsyncClient` 모음.
+
+    client는 처음 사용할 때 생성되어 connection pool을 유지하며, 서버 lifespan 종료 시 `aclose`로 닫는다.
+    client는 생성된 event loop에 묶이므로, 다른 loop에서 요청하면 새로 만든다.
+    """
+
+    def __init__(self):
+        self._profiles: dict[str, HTTPClientProfile] = {
+            "default": HTTPClientProfile(),
+            # 검색/자막 등 외부 API 호출용. 여러 query를 동시에 보내므로 요청 간격과 breaker를 적용하지 않고,
+            # 실패는 호출하는 쪽의 재시도 정책에 맡긴다.
+            "api": HTTPClientProfile(
+                max_connections_per_host=50, domain_scheduling=False
+            ),
+            # slide 이미지 확인용. 한 CDN의 이미지 여러 개를 짧은 시간 예산 안에 확인하므로
+            # 요청 간격을 두지 않고 host별 동시 연결 수만 제한한다.
+            "image": HTTPClientProfile(domain_scheduling=False),
+        }
+        self._clients: dict[str, tuple[httpx.AsyncClient, Any]] = {}
+        self._retired: list[httpx.AsyncClient] = []
+        self._transport_wrapper: Optional[
+            Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]
+        ] = None
+        self.metrics: dict[str, HTTPClientMetrics] = {}
+
+    def register_profile(self, name: str, profile: HTTPClientProfile) -> None:
+        logger.debug(f"Registering HTTP client profile: {name}")
+        self._profiles[name] = profile
+
+    def get_profile(self, name: str) -> HTTPClientProfile:
+        if name not in self._profiles and name == "proxy":
+            proxy = _proxy_url_from_env()
+            if proxy is None:
+                raise KeyError("PROXY_* environment variables are not configured")
+            self._profiles[name] = HTTPClientProfile(proxy=proxy)
+
+        return self._profiles[name]
+
+    def set_transport_wrapper(
+        self,
+        wrapper: Optional[
+            Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]
+        ],
+    ) -> None:
+        """모든 client의 network transport를 `wrapper`로 감싼다. (요청 기록/재생 등)
+
+        이미 만든 client는 다음 요청부터 새로 만들고, 기존 client는 `aclose`에서 닫는다.
+        """
+        self._transport_wrapper = wrapper
+        self._retired.extend(client for client, _ in self._clients.values())
+        self._clients = {}
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client, client_loop = self._clients.get(name, (None, None))
+        if client is not None and not client.is_closed and client_loop is loop:
+            return client
+
+        client = self._create_client(name, self.get_profile(name))
+        self._clients[name] = (client, loop)
+        return client
+
+    def _create_client(
+        self, name: str, profile: HTTPClientProfile
+    ) -> httpx.AsyncClient:
+        http2 = profile.http2 and _has_h2()
+        logger.info(f"Creating shared HTTP client: {name} (http2={http2})")
+
+        limits = httpx.Limits(
+            max_connections=profile.max_connections,
+            max_keepalive_connections=profile.max_keepalive_connections,
+            keepalive_expiry=profile.keepalive_expiry,
+        )
+        metrics = self.metrics.setdefault(name, HTTPClientMetrics())
+        network: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            http2=http2, limits=limits, proxy=profile.proxy
+        )
+        if self._transport_wrapper is not None:
+            network = self._transport_wrapper(network)
+        transport = HostLimitedTransport(
+            network,
+            max_connections_per_host=profile.max_connections_per_host,
+            metrics=metrics,
+            scheduler=domain_scheduler if profile.domain_scheduling else None,
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(profile.timeout, connect=profile.connect_timeout),
+            follow_redirects=profile.follow_redirects,
+            headers=profile.headers,
+        )
+
+    def metrics_report(self) -> dict[str, dict[str, Any]]:
+        return {name: metrics.report() for name, metrics in self.metrics.items()}
+
+    def domain_report(self) -> dict[str, dict[str, Any]]:
+        """domain별 circuit breaker 상태."""
+        return domain_scheduler.snapshot()
+
+    async def aclose(self) -> None:
+        clients = [(name, client) for name, (client, _) in self._clients.items()]
+        clients += [("retired", client) for client in self._retired]
+        self._clients, self._retired = {}, []
+        for name, client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client {name}: {str(e)}")
+
+        logger.info(f"HTTP clients closed: {self.metrics_report()}")
+
+
+http_clients = HTTPClientRegistry()
+
+
+def get_http_client(profile: str = "default") -> httpx.AsyncClient:
+    return http_clients.get(profile)
+
+
+@asynccontextmanager
+async def http_client_lifespan(app: Any = None):
+    """서버 lifespan 동안 공유 HTTP client를 유지하고, 종료 시 닫는다."""
+    try:
+        yield http_clients
+    finally:
+        await http_clients.aclose()
@@ -0,0 +1,358 @@
+import asyncio
+import os
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from estalan.logging_config import get_logger
+from estalan.tools.domain_scheduler import DomainUnavailableError
+from estalan.tools.http_client import get_http_client
+
+logger = get_logger(__name__)
+
+IMAGE_PROBE_CONCURRENCY = int(os.getenv("IMAGE_PROBE_CONCURRENCY", 8))
+# 검색 결과 전체를 확인하는 데 쓰는 최대 시간. 시간 안에 확인하지 못한 이미지는 제외.
+IMAGE_PROBE_BUDGET = float(os.getenv("IMAGE_PROBE_BUDGET", 3.0))
+IMAGE_REQUEST_TIMEOUT = float(os.getenv("IMAGE_REQUEST_TIMEOUT", 2.0))
+# 대부분의 형식은 앞 수십 byte에 크기가 있지만, JPEG는 EXIF 뒤에 SOF가 오므로 여유를 둠.
+IMAGE_PROBE_MAX_BYTES = int(os.getenv("IMAGE_PROBE_MAX_BYTES", 64 * 1024))
+IMAGE_PROBE_TTL = float(os.getenv("IMAGE_PROBE_TTL", 24 * 3600))
+IMAGE_PROBE_MAX_ENTRIES = 4096
+# 실패한 URL과 제외한 origin을 기억하는 시간. 일시적인 장애일 수 있으므로 성공보다 짧게 둠.
+IMAGE_ORIGIN_TTL = float(os.getenv("IMAGE_ORIGIN_TTL", 3600))
+# 같은 origin에서 URL 단위 실패(HTTP 오류, 깨진 이미지, CORS 미허용 등)가 이 횟수만큼 쌓이면 origin 전체를 제외.
+IMAGE_ORIGIN_FAILURE_THRESHOLD = int(os.getenv("IMAGE_ORIGIN_FAILURE_THRESHOLD", 2))
+# slide를 보여주는 frontend의 origin (예: https://app.example.com).
+# CORS 확인은 opt-in: 설정하지 않으면 CORS 허용 여부는 확인하지 않고 접근 가능 여부와 크기만 확인한다.
+IMAGE_CORS_ORIGIN = os.getenv("IMAGE_CORS_ORIGIN")
+# slide에 사용할 이미지의 최소 가로/세로 크기.
+IMAGE_MIN_SIZE = int(os.getenv("IMAGE_MIN_SIZE", 400))
+
+# 크기 정보가 없는 JPEG marker (SOI, EOI, RSTn, TEM).
+JPEG_STANDALONE_MARKERS = {0x01, 0xD8, 0xD9, *range(0xD0, 0xD8)}
+# SOFn marker. (DHT 0xC4, JPG 0xC8, DAC 0xCC 제외)
+JPEG_SOF_MARKERS = {*range(0xC0, 0xD0)} - {0xC4, 0xC8, 0xCC}
+
+# 연결 자체가 안 되는 경우. 한 번만 실패해도 origin 전체를 제외.
+CONNECTION_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def get_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+@dataclass(slots=True)
+class ImageInfo:
+    format: str
+    width: int
+    height: int
+
+
+class IncompleteImageHeader(ValueError):
+    """형식은 알지만 크기 정보까지 받지 못한 경우. 더 읽으면 알 수 있음."""
+
+
+def parse_image_header(data: bytes) -> Optional[ImageInfo]:
+    """PNG/JPEG/WebP/GIF 파일 앞부분에서 형식과 크기를 읽음. 이미지가 아니면 None.
+
+    크기 정보가 뒤에 있어 `data`가 부족하면 `IncompleteImageHeader`.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) < 24:
+            raise IncompleteImageHeader("png")
+        width, height = struct.unpack(">II", data[16:24])
+        return ImageInfo("png", width, height)
+
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) < 10:
+            raise IncompleteImageHeader("gif")
+        width, height = struct.unpack("<HH", data[6:10])
+        return ImageInfo("gif", width, height)
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _parse_webp(data)
+
+    if data.startswith(b"\xff\xd8"):
+        return _parse_jpeg(data)
+
+    if len(data) < 12 and any(
+        signature.startswith(data[: len(signature)])
+        for signature in (b"\x89PNG", b"GIF8", b"RIFF", b"\xff\xd8")
+    ):
+        raise IncompleteImageHeader("unknown")
+    return None
+
+
+def _parse_webp(data: bytes) -> Optional[ImageInfo]:
+    if len(data) < 30:
+        raise IncompleteImageHeader("webp")
+
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        # key frame의 시작 코드 뒤 14bit 크기.
+        if data[23:26] != b"\x9d\x01\x2a":
+            return None
+        width, height = struct.unpack("<HH", data[26:30])
+        return ImageInfo("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L":
+        if data[20] != 0x2F:
+            return None
+        bits = int.from_bytes(data[21:25], "little")
+        return ImageInfo("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageInfo("webp", width, height)
+    return None
+
+
+def _parse_jpeg(data: bytes) -> Optional[ImageInfo]:
+    offset = 2
+    while True:
+        # marker 앞의 0xFF padding은 건너뜀.
+        while offset < len(data) and data[offset] == 0xFF:
+            offset += 1
+        if offset >= len(data):
+            raise IncompleteImageHeader("jpeg")
+
+        marker = data[offset]
+        offset += 1
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if offset + 2 > len(data):
+            raise IncompleteImageHeader("jpeg")
+
+        length = int.from_bytes(data[offset : offset + 2], "big")
+        if length < 2:
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            if offset + 7 > len(data):
+                raise IncompleteImageHeader("jpeg")
+            height, width = struct.unpack(">HH", data[offset + 3 : offset + 7])
+            return ImageInfo("jpeg", width, height)
+        offset += length
+
+
+@dataclass(slots=True)
+class OriginCheck:
+    reason: str
+    expires_at: float
+
+
+@dataclass(slots=True)
+class ProbeResult:
+    info: Optional[ImageInfo]
+    expires_at: float
+
+
+class ImageProber:
+    """이미지 앞부분만(HTTP Range) 받아 접근 가능 여부와 실제 형식/크기를 한 번의 요청으로 확인.
+
+    - 크기를 알 수 있을 만큼만 읽고 연결을 닫으며, 최대 `max_bytes`까지만 받는다.
+    - `cors_origin`(`IMAGE_CORS_ORIGIN`)을 설정한 경우에만 같은 응답의 CORS 허용 여부도 확인한다.
+    - 결과는 URL별로 캐시한다. 성공은 `ttl`, 실패(깨진 이미지 포함)는 `failure_ttl` 동안.
+    - origin 전체는 연결 오류이거나 URL 단위 실패가 `failure_threshold`번 쌓였을 때만
+      `failure_ttl` 동안 제외하고, 그동안 해당 origin의 이미지는 요청하지 않는다.
+    - 여러 이미지를 최대 `concurrency`개씩 동시에 확인하고, `budget`초 안에 끝나지 않으면 제외.
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cors_origin: Optional[str] = IMAGE_CORS_ORIGIN,
+        concurrency: int = IMAGE_PROBE_CONCURRENCY,
+        budget: float = IMAGE_PROBE_BUDGET,
+        timeout: float = IMAGE_REQUEST_TIMEOUT,
+        max_bytes: int = IMAGE_PROBE_MAX_BYTES,
+        ttl: float = IMAGE_PROBE_TTL,
+        failure_ttl: float = IMAGE_ORIGIN_TTL,
+        failure_threshold: int = IMAGE_ORIGIN_FAILURE_THRESHOLD,
+        max_entries: int = IMAGE_PROBE_MAX_ENTRIES,
+    ):
+        self.client = client
+        self.cors_origin = cors_origin
+        self.concurrency = concurrency
+        self.budget = budget
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.failure_threshold = failure_threshold
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, ProbeResult] = OrderedDict()
+        # origin별 상태도 URL 캐시처럼 `max_entries`개까지만 유지 (오래 사용하지 않은 origin부터 제거).
+        self._rejected_origins: OrderedDict[str, OriginCheck] = OrderedDict()
+        self._origin_failures: OrderedDict[str, int] = OrderedDict()
+        self.stats = {
+            "probes": 0,
+            "cache_hits": 0,
+            "origin_rejected": 0,
+            "bytes_received": 0,
+            "broken": 0,
+            "timed_out": 0,
+        }
+
+    async def afilter(
+        self, images: list[dict], min_size: int = IMAGE_MIN_SIZE
+    ) -> list[dict]:
+        """실제 크기가 `min_size` 이상인 이미지만 반환하고, metadata의 크기/형식을 실제 값으로 교체."""
+        infos = await self.aprobe_all(
+            [image["metadata"]["image_url"] for image in images]
+        )
+
+        filtered = []
+        for image in images:
+            info = infos[image["metadata"]["image_url"]]
+            if info is None or min(info.width, info.height) < min_size:
+                continue
+            image["metadata"].update(
+                imageWidth=info.width, imageHeight=info.height, format=info.format
+            )
+            filtered.append(image)
+        return filtered
+
+    async def aprobe_all(self, urls: list[str]) -> dict[str, Optional[ImageInfo]]:
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe(url: str) -> Optional[ImageInfo]:
+            async with semaphore:
+                return await self.aprobe(url)
+
+        tasks = {url: asyncio.create_task(probe(url)) for url in urls}
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.budget)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.stats["timed_out"] += len(pending)
+            logger.info(f"Image probe budget exceeded, dropping {len(pending)}")
+
+        return {
+            url: None if task in pending or task.exception() else task.result()
+            for url, task in tasks.items()
+        }
+
+    async def aprobe(self, url: str) -> Optional[ImageInfo]:
+        cached = self._cache.get(url)
+        if cached is not None and cached.expires_at > time.time():
+            self._cache.move_to_end(url)
+            self.stats["cache_hits"] += 1
+            return cached.info
+
+        origin = get_origin(url)
+        rejected = self._rejected_origins.get(origin)
+        if rejected is not None:
+            if rejected.expires_at > time.time():
+                self.stats["origin_rejected"] += 1
+                return None
+            del self._rejected_origins[origin]
+
+        try:
+            info = await self._afetch_header(url)
+        except DomainUnavailableError as e:
+            # 요청을 보내지 않았으므로 이미지의 실패로 캐시하지 않음.
+            logger.debug(f"Image probe skipped: {url} ({str(e)})")
+            return None
+        except CONNECTION_ERRORS as e:
+            self._reject_origin(origin, type(e).__name__)
+            return None
+
+        if info is None:
+            self.stats["broken"] += 1
+            self._record_failure(origin)
+        else:
+            self._origin_failures.pop(origin, None)
+        ttl = self.ttl if info is not None else self.failure_ttl
+        self._remember(self._cache, url, ProbeResult(info, time.time() + ttl))
+        return info
+
+    def _record_failure(self, origin: str) -> None:
+        failures = self._origin_failures.get(origin, 0) + 1
+        self._remember(self._origin_failures, origin, failures)
+        if failures >= self.failure_threshold:
+            self._reject_origin(origin, f"{failures} failures")
+
+    def _reject_origin(self, origin: str, reason: str) -> None:
+        logger.info(f"Image origin rejected: {origin} ({reason})")
+        self._remember(
+            self._rejected_origins,
+            origin,
+            OriginCheck(reason, time.time() + self.failure_ttl),
+        )
+        self._origin_failures.pop(origin, None)
+
+    def _remember(self, entries: OrderedDict, key: str, value: Any) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    async def _afetch_header(self, url: str) -> Optional[ImageInfo]:
+        """이미지 형식과 크기를 반환. 사용할 수 없는 이미지이면 None, 연결 오류는 그대로 raise.
+
+        같은 CDN의 이미지를 동시에 확인하므로 domain별 요청 간격을 두지 않는 "image" client를 사용한다.
+        """
+        self.stats["probes"] += 1
+        headers = {"Range": f"bytes=0-{self.max_bytes - 1}"}
+        if self.cors_origin:
+            headers["Origin"] = self.cors_origin
+
+        data = b""
+        try:
+            client = self.client or get_http_client("image")
+            async with client.stream(
+                "GET", url, headers=headers, timeout=self.timeout
+            ) as response:
+                reason = self._check_response(response)
+                if reason is not None:
+                    logger.debug(f"Image probe failed: {url} ({reason})")
+                    return None
+
+                # 서버가 Range를 무시해도 필요한 만큼만 읽고 닫음.
+                async for chunk in response.aiter_bytes():
+                    data += chunk
+                    try:
+                        return parse_image_header(data[: self.max_bytes])
+                    except IncompleteImageHeader:
+                        if len(data) >= self.max_bytes:
+                            break
+        except (DomainUnavailableError, *CONNECTION_ERRORS):
+            raise
+        except httpx.HTTPError as e:
+            logger.debug(f"Image probe failed: {url} ({type(e).__name__})")
+            return None
+        finally:
+            self.stats["bytes_received"] += len(data)
+
+        logger.debug(f"Image size not found in first {len(data)} bytes: {url}")
+        return None
+
+    def _check_response(self, response: httpx.Response) -> Optional[str]:
+        """실패 이유를 반환. 통과하면 None."""
+        if response.status_code >= 400:
+            return f"HTTP {response.status_code}"
+
+        if self.cors_origin:
+            allow_origin = response.headers.get("access-control-allow-origin")
+            if allow_origin not in ("*", self.cors_origin):
+                return "CORS not allowed"
+        return None
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            **self.stats,
+            "cached": len(self._cache),
+            "rejected_origins": len(self._rejected_origins),
+        }
+
+
+image_prober = ImageProber()
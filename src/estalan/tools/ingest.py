@@ -0,0 +1,214 @@
+import codecs
+import re
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from estalan.logging_config import get_logger
+
+try:
+    import chardet
+except ImportError:  # chardet이 없으면 utf-8로 decode.
+    chardet = None
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+SNIFF_BYTES = 4096
+
+META_CHARSET_PATTERN = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE
+)
+BODY_END = b"</body>"
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+@dataclass(slots=True)
+class StreamedBody:
+    content: bytes
+    """예산 내에서 받은 원본 byte (캐시 저장용)."""
+    text: str
+    encoding: str
+    truncated: bool
+
+
+def sniff_encoding(head: bytes, header_charset: Optional[str] = None) -> str:
+    """응답 header, BOM, `<meta>` 순서로 charset을 결정하고, 모두 없으면 앞부분만으로 추정."""
+    for charset in (header_charset, *_bom_and_meta_charset(head)):
+        if charset and _is_known_encoding(charset):
+            return charset
+
+    if chardet is not None and head:
+        detected = chardet.detect(head).get("encoding")
+        if detected and _is_known_encoding(detected):
+            return detected
+
+    return "utf-8"
+
+
+def _bom_and_meta_charset(head: bytes) -> list[Optional[str]]:
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return [encoding]
+
+    match = META_CHARSET_PATTERN.search(head)
+    return [match.group(1).decode("ascii") if match else None]
+
+
+def _is_known_encoding(name: str) -> bool:
+    try:
+        codecs.lookup(name)
+        return True
+    except LookupError:
+        return False
+
+
+class HTMLStreamDecoder:
+    """HTML 응답을 chunk 단위로 decode하는 incremental decoder.
+
+    앞부분 `sniff_bytes`만 모아 charset을 결정한 뒤에는 들어오는 chunk를 바로 decode해서 넘긴다.
+    `</body>`를 만나거나 byte/문자 예산에 도달하면 `done`이 되어 더 이상 읽지 않아도 된다.
+    """
+
+    def __init__(
+        self,
+        header_charset: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_chars: Optional[int] = None,
+        sniff_bytes: int = SNIFF_BYTES,
+    ):
+        self.header_charset = header_charset
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.sniff_bytes = sniff_bytes
+
+        self.encoding: Optional[str] = None
+        self.bytes_read = 0
+        self.chars_decoded = 0
+        self.done = False
+        self.truncated = False
+
+        self._decoder = None
+        self._pending = b""
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> tuple[bytes, str]:
+        """chunk를 입력받아 (예산 내에서 사용한 byte, decode된 텍스트)를 반환."""
+        if self.done or not chunk:
+            return b"", ""
+
+        remaining = self.max_bytes - self.bytes_read
+        if len(chunk) >= remaining:
+            chunk = chunk[:remaining]
+            self.truncated = True
+            self.done = True
+
+        end = self._find_body_end(chunk)
+        if end is not None:
+            chunk = chunk[:end]
+            self.truncated = False
+            self.done = True
+
+        self.bytes_read += len(chunk)
+        used = chunk
+
+        if self._decoder is None:
+            self._pending += chunk
+            if len(self._pending) < self.sniff_bytes and not self.done:
+                return used, ""
+            chunk, self._pending = self._pending, b""
+            self._start_decoder(chunk)
+
+        text = self._decoder.decode(chunk, final=self.done)
+        return used, self._limit_chars(text)
+
+    def close(self) -> str:
+        """stream 종료 시 남은 byte를 decode."""
+        if self._decoder is None:
+            chunk, self._pending = self._pending, b""
+            self._start_decoder(chunk)
+            text = self._decoder.decode(chunk, final=True)
+        elif not self.done:
+            text = self._decoder.decode(b"", final=True)
+        else:
+            text = ""
+
+        self.done = True
+        return self._limit_chars(text)
+
+    def _start_decoder(self, head: bytes) -> None:
+        self.encoding = sniff_encoding(head, self.header_charset)
+        logger.debug(f"Using encoding: {self.encoding}")
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+
+    def _find_body_end(self, chunk: bytes) -> Optional[int]:
+        # chunk 경계에 걸친 `</body>`도 찾을 수 있도록 이전 chunk의 끝부분을 함께 검사.
+        window = self._tail + chunk
+        index = window.lower().find(BODY_END)
+        self._tail = window[-(len(BODY_END) - 1) :]
+        if index == -1:
+            return None
+
+        return index + len(BODY_END) - (len(window) - len(chunk))
+
+    def _limit_chars(self, text: str) -> str:
+        if self.max_chars is None:
+            return text
+
+        remaining = self.max_chars - self.chars_decoded
+        if len(text) >= remaining:
+            text = text[: max(remaining, 0)]
+            self.truncated = True
+            self.done = True
+
+        self.chars_decoded += len(text)
+        return text
+
+
+async def aread_html(
+    chunks: AsyncIterator[bytes],
+    header_charset: Optional[str] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_chars: Optional[int] = None,
+) -> StreamedBody:
+    """byte stream을 읽으면서 decode하고, 예산이나 `</body>`에 도달하면 읽기를 멈춤."""
+    decoder = HTMLStreamDecoder(header_charset, max_bytes, max_chars)
+    raw_parts, text_parts = [], []
+
+    async for chunk in chunks:
+        raw, text = decoder.feed(chunk)
+        raw_parts.append(raw)
+        text_parts.append(text)
+        if decoder.done:
+            logger.debug(f"Stopped reading early after {decoder.bytes_read} bytes")
+            break
+
+    text_parts.append(decoder.close())
+    return StreamedBody(
+        content=b"".join(raw_parts),
+        text="".join(text_parts),
+        encoding=decoder.encoding,
+        truncated=decoder.truncated,
+    )
+
+
+def read_html(
+    content: bytes,
+    header_charset: Optional[str] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_chars: Optional[int] = None,
+) -> StreamedBody:
+    """이미 받아둔 byte(캐시 등)를 streaming 경로와 같은 규칙으로 decode."""
+    decoder = HTMLStreamDecoder(header_charset, max_bytes, max_chars)
+    raw, text = decoder.feed(content)
+    text += decoder.close()
+    return StreamedBody(
+        content=raw,
+        text=text,
+        encoding=decoder.encoding,
+        truncated=decoder.truncated,
+    )
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+KV_CACHE_TTL = float(os.getenv("KV_CACHE_TTL", 3600))
+KV_CACHE_MAX_ENTRIES = int(os.getenv("KV_CACHE_MAX_ENTRIES", 1024))
+
+
+def _encode_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+@dataclass(slots=True)
+class _Entry:
+    encoded: str
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class KVCache(Generic[T]):
+    """API 응답, 자막처럼 작은 값을 저장하는 key-value 캐시.
+
+    - 값은 `encode`/`decode`(기본 JSON)로 문자열로 바꿔 저장하고, 꺼낼 때마다 새로 decode하므로
+      호출한 쪽이 결과를 수정해도 캐시는 바뀌지 않는다.
+    - 메모리 LRU(`max_entries`)만 사용하며, `path`가 있을 때만 디스크(SQLite)에도 저장한다.
+    - 같은 파일을 여러 캐시가 함께 쓸 수 있도록 `namespace`별로 key를 구분한다.
+    - 항목은 `ttl`초(저장 시 지정하면 그 값) 후 만료된다.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        path: Optional[str] = None,
+        ttl: float = KV_CACHE_TTL,
+        max_entries: int = KV_CACHE_MAX_ENTRIES,
+        encode: Callable[[T], str] = _encode_json,
+        decode: Callable[[str], T] = json.loads,
+    ):
+        self.namespace = namespace
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.encode = encode
+        self.decode = decode
+        self._memory: OrderedDict[str, _Entry] = OrderedDict()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+        }
+
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """)
+            self._conn.commit()
+        logger.debug(f"KVCache {namespace} initialized (disk: {path})")
+
+    def get(self, key: str) -> Optional[T]:
+        entry = self._get_from_memory(key)
+        if entry is None:
+            entry = self._remember_disk_hit(key, self._get_from_disk(key))
+        return self.decode(entry.encoded) if entry is not None else None
+
+    def put(self, key: str, value: T, ttl: Optional[float] = None) -> None:
+        entry = self._put_to_memory(key, value, ttl)
+        self._put_to_disk(key, entry)
+
+    async def aget(self, key: str) -> Optional[T]:
+        # 메모리 LRU는 event loop에서만 다루고, 디스크 I/O만 thread로 넘김.
+        entry = self._get_from_memory(key)
+        if entry is None:
+            disk_entry = (
+                await asyncio.to_thread(self._get_from_disk, key)
+                if self._conn is not None
+                else None
+            )
+            entry = self._remember_disk_hit(key, disk_entry)
+        return self.decode(entry.encoded) if entry is not None else None
+
+    async def aput(self, key: str, value: T, ttl: Optional[float] = None) -> None:
+        entry = self._put_to_memory(key, value, ttl)
+        if self._conn is not None:
+            await asyncio.to_thread(self._put_to_disk, key, entry)
+
+    def _get_from_memory(self, key: str) -> Optional[_Entry]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if not entry.is_fresh:
+            del self._memory[key]
+            return None
+
+        self._memory.move_to_end(key)
+        self.stats["memory_hits"] += 1
+        return entry
+
+    def _remember_disk_hit(self, key: str, entry: Optional[_Entry]) -> Optional[_Entry]:
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["disk_hits"] += 1
+        self._remember(key, entry)
+        return entry
+
+    def _put_to_memory(self, key: str, value: T, ttl: Optional[float]) -> _Entry:
+        entry = _Entry(
+            encoded=self.encode(value),
+            expires_at=time.time() + (self.ttl if ttl is None else ttl),
+        )
+        self._remember(key, entry)
+        self.stats["stores"] += 1
+        return entry
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_from_disk(self, key: str) -> Optional[_Entry]:
+        if self._conn is None:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+
+        entry = _Entry(encoded=row[0], expires_at=row[1])
+        return entry if entry.is_fresh else None
+
+    def _put_to_disk(self, key: str, entry: _Entry) -> None:
+        if self._conn is None:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?)",
+                (self.namespace, key, entry.encoded, entry.expires_at),
+            )
+            self._conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+            self._conn.commit()
+
+    def metrics(self) -> dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "namespace": self.namespace,
+            "memory_entries": len(self._memory),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
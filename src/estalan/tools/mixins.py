@@ -1,16 +1,28 @@
+import asyncio
+import html
 import os
+import re
 import uuid
-from typing import Any, Optional
+from typing import Any, Mapping, Optional
 
-import httpx
-from bs4 import BeautifulSoup
-from httpx._decoders import TextDecoder
 from langchain.schema import Document
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_core.messages import BaseMessage
 from langchain_core.runnables import RunnableBinding
 
 from estalan.logging_config import get_logger
+from estalan.tools.document_cache import CleanedDocument, document_cache
+from estalan.tools.html_pipeline import get_html_cleaner
+from estalan.tools.http_cache import CachedResponse, HTTPCache
+from estalan.tools.http_client import get_http_client
+from estalan.tools.ingest import (
+    DEFAULT_MAX_BYTES,
+    StreamedBody,
+    aread_html,
+    read_html,
+)
+from estalan.tools.readability_sidecar import readability_sidecar
+from estalan.tools.workers import cpu_pool
 
 logger = get_logger(__name__)
 
@@ -42,10 +54,44 @@ def _parse_content_type_header(header: str) -> tuple[str, dict]:
     return content_type, params_dict
 
 
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
+
+def _check_content_type(headers: Mapping[str, str], content_type: Optional[str]):
+    if content_type is not None and content_type not in headers.get("content-type", ""):
+        logger.warning(
+            f"Content type mismatch. Expected: {content_type}, Got: {headers.get('content-type')}"
+        )
+        raise ContentTypeError
+
+
+def _header_charset(headers: Mapping[str, str]) -> Optional[str]:
+    _, params = _parse_content_type_header(headers.get("content-type", ""))
+    charset = params.get("charset")
+    return charset.strip("'\"") if isinstance(charset, str) else None
+
+
+def _extract_title(html_text: str) -> Optional[str]:
+    match = TITLE_PATTERN.search(html_text)
+    if match is None:
+        return None
+
+    title = html.unescape(match.group(1)).strip()
+    return title or None
+
+
 class ContentTypeError(Exception):
     pass
 
 
+class NotModifiedError(Exception):
+    """본문이 필요한데 재사용할 캐시 없이 304 응답만 받은 경우."""
+
+
+# 본문 없는 304를 받으면 이 header를 빼고 다시 요청.
+CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since"}
+
+
 class MessageMixin:
     def get_first_message(
         self, messages: list, message_type: type[BaseMessage]
@@ -83,53 +129,151 @@ class NoSyncChainMixin:
 
 
 class HTTPXMixin:
+    # 한 페이지에서 읽을 최대 byte/문자 수. `</body>`를 만나면 그 전에 멈춤.
+    max_html_bytes: int = DEFAULT_MAX_BYTES
+    max_html_chars: Optional[int] = None
+
     async def aget(
         self, url: str, headers: dict = dict(), content_type: str = None, **kwargs
     ) -> str:
+        doc = await self.afetch(url, headers, content_type, **kwargs)
+        return doc.page_content
+
+    async def afetch(
+        self, url: str, headers: dict = dict(), content_type: str = None, **kwargs
+    ) -> Document:
+        """한 번의 요청으로 본문과 title, charset, 최종 URL(redirect 이후)을 함께 가져옴.
+
+        `http_cache`(HTTPCache)가 설정되어 있으면 캐시된 응답을 사용하거나 조건부 요청으로 재검증함.
+        """
         logger.debug(f"Making HTTP GET request to: {url}")
 
         try:
-            async with httpx.AsyncClient(
-                timeout=10,
-                follow_redirects=True,
-                headers=headers,
-            ) as client:
-                async with client.stream("GET", _clean_url(url), **kwargs) as stream:
-                    stream.raise_for_status()
-                    logger.debug(f"HTTP request successful: {stream.status_code}")
-
-                    if (
-                        content_type is not None
-                        and content_type not in stream.headers["Content-Type"]
-                    ):
-                        logger.warning(
-                            f"Content type mismatch. Expected: {content_type}, Got: {stream.headers['Content-Type']}"
-                        )
-                        raise ContentTypeError
-
-                    content = await anext(stream.aiter_bytes(2 * 1024 * 1024))
-                    content_type_header, params = _parse_content_type_header(
-                        stream.headers["content-type"]
+            http_cache = getattr(self, "http_cache", None)
+            if http_cache is not None:
+                final_url, body = await self._adownload_cached(
+                    http_cache, url, headers, content_type, **kwargs
+                )
+            else:
+                _, final_url, _, body = await self._adownload(
+                    url, headers, content_type, **kwargs
+                )
+                if body is None:
+                    # 호출한 쪽이 넘긴 조건부 header로 304를 받은 경우.
+                    final_url, _, body = await self._adownload_unconditional(
+                        url, headers, content_type, **kwargs
                     )
 
-                    if "charset" in params:
-                        encoding = params["charset"].strip("'\"")
-                    else:
-                        encoding = chardet.detect(content).get("encoding") or "utf-8"
-
-                    logger.debug(f"Using encoding: {encoding}")
-                    decoder = TextDecoder(encoding=encoding)
-                    result = "".join([decoder.decode(content), decoder.flush()])
-
-                    logger.info(
-                        f"Successfully fetched content from {url} ({len(result)} characters)"
-                    )
-                    return result
+            logger.info(
+                f"Successfully fetched content from {url} ({len(body.text)} characters)"
+            )
+            return Document(
+                page_content=body.text,
+                metadata={
+                    "source": url,
+                    "final_url": final_url,
+                    "charset": body.encoding,
+                    "title": _extract_title(body.text),
+                },
+            )
 
         except Exception as e:
             logger.error(f"HTTP request failed for {url}: {str(e)}")
             raise
 
+    async def _adownload(
+        self, url: str, headers: dict, content_type: str = None, **kwargs
+    ) -> tuple[int, str, Mapping[str, str], Optional[StreamedBody]]:
+        """(status, 최종 URL, 응답 header, 본문)을 반환. 304 응답은 본문 없이 반환."""
+        client = get_http_client()
+        async with client.stream(
+            "GET", _clean_url(url), headers=headers, **kwargs
+        ) as stream:
+            if stream.status_code == 304:
+                return stream.status_code, str(stream.url), stream.headers, None
+
+            stream.raise_for_status()
+            logger.debug(f"HTTP request successful: {stream.status_code}")
+
+            # 본문을 받기 전에 content type을 먼저 확인.
+            _check_content_type(stream.headers, content_type)
+
+            # 받는 즉시 decode하고, 예산이나 `</body>`에 도달하면 나머지는 받지 않음.
+            body = await aread_html(
+                stream.aiter_bytes(),
+                header_charset=_header_charset(stream.headers),
+                max_bytes=self.max_html_bytes,
+                max_chars=self.max_html_chars,
+            )
+            return stream.status_code, str(stream.url), stream.headers, body
+
+    async def _adownload_unconditional(
+        self, url: str, headers: dict, content_type: str = None, **kwargs
+    ) -> tuple[str, Mapping[str, str], StreamedBody]:
+        """조건부 header 없이 다시 요청해 본문을 받음. 그래도 304이면 `NotModifiedError`."""
+        headers = {
+            k: v for k, v in headers.items() if k.lower() not in CONDITIONAL_HEADERS
+        }
+        _, final_url, response_headers, body = await self._adownload(
+            url, headers, content_type, **kwargs
+        )
+        if body is None:
+            raise NotModifiedError(f"304 Not Modified without a cached body: {url}")
+        return final_url, response_headers, body
+
+    async def _adownload_cached(
+        self,
+        http_cache: HTTPCache,
+        url: str,
+        headers: dict,
+        content_type: str = None,
+        **kwargs,
+    ) -> tuple[str, StreamedBody]:
+        key = http_cache.cache_key(url, headers)
+        entry = await http_cache.aget(key)
+        if entry is not None and entry.is_fresh:
+            logger.debug(f"HTTP cache hit: {url}")
+            http_cache.stats["hits"] += 1
+            return entry.final_url, self._read_cached(entry, content_type)
+
+        request_headers = {**headers, **(entry.conditional_headers() if entry else {})}
+        status, final_url, response_headers, body = await self._adownload(
+            url, request_headers, content_type, **kwargs
+        )
+
+        if status == 304 and entry is not None:
+            logger.debug(f"HTTP cache revalidated: {url}")
+            http_cache.stats["revalidated"] += 1
+            entry = await http_cache.arefresh(key, entry, response_headers)
+            return entry.final_url, self._read_cached(entry, content_type)
+
+        if body is None:
+            # 조건부 요청을 보내지 않았는데 304를 받은 경우. (호출한 쪽이 넘긴 header 등)
+            final_url, response_headers, body = await self._adownload_unconditional(
+                url, headers, content_type, **kwargs
+            )
+
+        http_cache.stats["misses"] += 1
+        if body.truncated:
+            # 예산에서 잘린 본문은 완전한 응답이 아니므로 저장하지 않음.
+            logger.debug(f"Not caching truncated response: {url}")
+        else:
+            await http_cache.aput(
+                key, url, final_url, dict(response_headers), body.content
+            )
+        return final_url, body
+
+    def _read_cached(
+        self, entry: CachedResponse, content_type: Optional[str]
+    ) -> StreamedBody:
+        _check_content_type(entry.headers, content_type)
+        return read_html(
+            entry.body,
+            header_charset=_header_charset(entry.headers),
+            max_bytes=self.max_html_bytes,
+            max_chars=self.max_html_chars,
+        )
+
 
 class HTMLToMarkdownMixin:
     async def aclean_html(
@@ -142,7 +286,12 @@ class HTMLToMarkdownMixin:
 
         try:
             metadata = html_text.metadata
-            md_text = self._transform_html_readability_markdown(html_text.page_content)
+            cleaned = await self._aclean_cached(html_text.page_content, metadata)
+
+            metadata = {**cleaned.metadata, **metadata}
+            if not metadata.get("title"):
+                metadata["title"] = cleaned.title
+            md_text = cleaned.markdown
 
             if not md_text:
                 logger.warning("No content found in HTMLToMarkdownMixin")
@@ -155,61 +304,59 @@ class HTMLToMarkdownMixin:
             logger.debug(f"HTML cleaning successful, markdown length: {len(md_text)}")
             return Document(page_content=md_text, metadata=metadata)
 
+        except asyncio.TimeoutError:
+            logger.warning("HTML cleaning timed out")
+            metadata.update({"error": "TimeoutError"})
+            return Document(
+                page_content="콘텐츠를 처리하지 못했습니다.",
+                metadata=metadata,
+            )
+
         except Exception as e:
             logger.error(f"Error cleaning HTML: {str(e)}")
             raise
 
-    def _strip_stylesheets(self, html: str) -> str:
-        logger.debug("Stripping stylesheets from HTML")
-        try:
-            soup = BeautifulSoup(html, "lxml")
-
-            for node in soup.select("style, link[rel=stylesheet]"):
-                node.decompose()
+    async def _aclean_cached(
+        self, html_text: str, metadata: dict[str, Any]
+    ) -> CleanedDocument:
+        """HTML을 정제. 같은 URL의 같은 내용을 이미 정제했다면 캐시된 결과를 반환."""
+        cleaner = get_html_cleaner()
+        key = document_cache.cache_key(
+            metadata.get("source"), html_text, cleaner.__name__
+        )
+        if (cached := await document_cache.aget(key)) is not None:
+            logger.debug(f"Using cached document: {metadata.get('source')}")
+            return cached
 
-            result = str(soup)
-            logger.debug("Stylesheets stripped successfully")
-            return result
+        plain_content = await self._aextract_readability(
+            html_text, metadata.get("source")
+        )
 
-        except Exception as e:
-            logger.error(f"Error stripping stylesheets: {str(e)}")
-            raise
+        # parsing/본문 추출/markdown 변환은 CPU를 오래 점유하므로 worker process에서 실행.
+        if plain_content is not None:
+            page = await cpu_pool.run(cleaner, plain_content, False)
+        else:
+            page = await cpu_pool.run(cleaner, html_text)
 
-    def _transform_html_readability_markdown(self, html_text: str) -> str:
-        logger.debug("Transforming HTML to markdown using readability")
+        title = metadata.get("title") or page.title
+        if not page.markdown:
+            return CleanedDocument(markdown="", title=title, metadata=metadata)
 
-        try:
-            if have_node():
-                logger.debug("Using readability with Node.js")
-                sanitized_html = self._strip_stylesheets(html_text)
-                readability_content = simple_json_from_html_string(
-                    sanitized_html,
-                    use_readability=True,
-                )
-                plain_content = readability_content["plain_content"]
-            else:
-                logger.debug("Using fallback readability method")
-                doc = readability.Document(html_text)
-                plain_content = doc.summary()
+        return await document_cache.aput(key, page.markdown, title, metadata)
 
-            if plain_content is None:
-                raise ValueError("No content extracted")
+    async def _aextract_readability(
+        self, html_text: str, url: Optional[str] = None
+    ) -> Optional[str]:
+        """상시 실행 중인 Node readability worker로 본문을 추출. 사용할 수 없으면 None."""
+        if not readability_sidecar.enabled:
+            return None
 
+        try:
+            article = await readability_sidecar.aextract(html_text, url)
+            return article["content"]
         except Exception as e:
-            logger.warning(
-                f"Readability extraction failed, using BeautifulSoup fallback: {str(e)}"
-            )
-            # BeautifulSoup fallback
-            soup = BeautifulSoup(html_text, "html.parser")
-            for script in soup(["script", "style"]):
-                script.decompose()
-            plain_content = soup.get_text()
-
-        md_content = markdownify(plain_content, strip=["a", "img"], heading_style="ATX")
-        logger.debug(
-            f"HTML to markdown transformation completed, length: {len(md_content)}"
-        )
-        return md_content
+            logger.warning(f"Readability sidecar failed, using fallback: {str(e)}")
+            return None
 
     async def aget_title(
         self, url: str, headers=dict(), content_type=None, **kwargs
@@ -217,23 +364,22 @@ class HTMLToMarkdownMixin:
         logger.debug(f"Fetching title from: {url}")
 
         try:
-            async with httpx.AsyncClient(
-                timeout=10,
-                follow_redirects=True,
-                headers=headers,
-            ) as client:
-                async with client.stream("GET", _clean_url(url), **kwargs) as stream:
-                    stream.raise_for_status()
-                    if (
-                        content_type is not None
-                        and content_type not in stream.headers["Content-Type"]
-                    ):
-                        raise ContentTypeError
-
-                    content = await anext(stream.aiter_bytes(1 * 1024 * 1024))
-
-                    soup = BeautifulSoup(content.decode("utf-8"), "html.parser")
-                    title_tag = soup.find("title").get_text(strip=True)
+            client = get_http_client()
+            async with client.stream(
+                "GET", _clean_url(url), headers=headers, **kwargs
+            ) as stream:
+                stream.raise_for_status()
+                if (
+                    content_type is not None
+                    and content_type not in stream.headers["Content-Type"]
+                ):
+                    raise ContentTypeError
+
+                content = await anext(stream.aiter_bytes(1 * 1024 * 1024))
+
+                # 제목만 필요하므로 문서 전체를 parse하지 않고 <title>만 찾음.
+                body = read_html(content, _header_charset(stream.headers))
+                title_tag = _extract_title(body.text)
 
             if title_tag:
                 logger.debug(f"Title extracted: {title_tag}")
@@ -254,17 +400,17 @@ class ChromeExtensionMixin(HTMLToMarkdownMixin):
         logger.debug(f"Getting article content for user {user_id} from {url}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                api_url = os.environ.get("ALAN_OPENAPI_ENDPOINT") + "/api/v1/cache/page"
-                response = await client.get(
-                    api_url,
-                    params={"user_id": user_id, "url": url},
-                )
-                response.raise_for_status()
-                data = response.json()
-                text = data.get("content", "")
+            api_url = os.environ.get("ALAN_OPENAPI_ENDPOINT") + "/api/v1/cache/page"
+            response = await get_http_client("api").get(
+                api_url,
+                params={"user_id": user_id, "url": url},
+            )
+            response.raise_for_status()
+            data = response.json()
+            text = data.get("content", "")
 
-            result = self._transform_html_readability_markdown(text)
+            cleaned = await self._aclean_cached(text, {"source": url})
+            result = cleaned.markdown
             logger.info(
                 f"Article content retrieved successfully for {url} ({len(result)} characters)"
             )
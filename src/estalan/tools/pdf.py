@@ -0,0 +1,218 @@
+import asyncio
+import base64
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from estalan.logging_config import get_logger
+from estalan.tools.http_client import get_http_client
+from estalan.tools.workers import cpu_pool
+
+try:
+    import pypdf
+except ImportError:  # pypdf가 없으면 추출하지 않고 Gemini media 입력으로 처리.
+    pypdf = None
+
+logger = get_logger(__name__)
+
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", 50 * 1024 * 1024))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 300))
+# Gemini에 파일을 그대로 보낼 수 있는 최대 크기 (inline data 제한).
+PDF_MEDIA_MAX_BYTES = int(os.getenv("PDF_MEDIA_MAX_BYTES", 20 * 1024 * 1024))
+# 요약에 사용할 페이지 텍스트의 최대 길이.
+PDF_SELECTED_MAX_CHARS = int(os.getenv("PDF_SELECTED_MAX_CHARS", 60000))
+# 페이지당 평균 글자 수가 이보다 적으면 텍스트 레이어가 없는(스캔) PDF로 판단.
+SCANNED_MIN_CHARS_PER_PAGE = 50
+
+_warned_missing_pypdf = False
+
+PAGE_SEPARATOR = "\f"
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class PDFTooLargeError(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class PDFContent:
+    pages: list[str]
+    """페이지별 텍스트. 추출하지 못했으면 빈 list."""
+    total_pages: int
+    media: Optional[str] = None
+    """스캔 PDF 등 텍스트를 쓸 수 없을 때 Gemini에 보낼 base64 원본."""
+
+    @property
+    def text(self) -> str:
+        return PAGE_SEPARATOR.join(self.pages)
+
+
+async def adownload_pdf(
+    url: str,
+    max_bytes: int = PDF_MAX_BYTES,
+    client: Optional[httpx.AsyncClient] = None,
+) -> str:
+    """PDF를 메모리에 올리지 않고 임시 파일로 받아 경로를 반환. `max_bytes`를 넘으면 중단."""
+    client = client or get_http_client()
+
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        content_length = int(response.headers.get("content-length") or 0)
+        if content_length > max_bytes:
+            raise PDFTooLargeError(f"PDF is too large: {content_length} bytes")
+
+        # 파일 I/O는 event loop를 막지 않도록 thread에서 실행.
+        received = 0
+        f = await asyncio.to_thread(
+            tempfile.NamedTemporaryFile, suffix=".pdf", delete=False
+        )
+        try:
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > max_bytes:
+                    raise PDFTooLargeError(f"PDF exceeds {max_bytes} bytes")
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+        except BaseException:
+            await asyncio.to_thread(_discard, f)
+            raise
+
+    logger.debug(f"PDF downloaded to {f.name} ({received} bytes)")
+    return f.name
+
+
+def extract_pdf_pages(
+    path: str, max_pages: int = PDF_MAX_PAGES
+) -> tuple[list[str], int]:
+    """페이지별 텍스트와 전체 페이지 수를 반환. worker process에서 실행.
+
+    pypdf는 페이지를 요청할 때 해당 객체만 읽으므로 앞에서부터 `max_pages`까지만 추출한다.
+    """
+    reader = pypdf.PdfReader(path)
+    total_pages = len(reader.pages)
+
+    pages = []
+    for index in range(min(total_pages, max_pages)):
+        try:
+            pages.append((reader.pages[index].extract_text() or "").strip())
+        except Exception as e:
+            logger.warning(f"Failed to extract text from page {index + 1}: {str(e)}")
+            pages.append("")
+    return pages, total_pages
+
+
+def _discard(f) -> None:
+    f.close()
+    os.unlink(f.name)
+
+
+def _read_media(path: str) -> str:
+    """임시 파일을 base64로 읽음. thread에서 실행."""
+    size = os.path.getsize(path)
+    if size > PDF_MEDIA_MAX_BYTES:
+        raise PDFTooLargeError(f"PDF is too large for media input: {size} bytes")
+
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+def _warn_missing_pypdf() -> None:
+    global _warned_missing_pypdf
+
+    if not _warned_missing_pypdf:
+        logger.warning(
+            "pypdf is not installed, sending PDFs as media without text extraction "
+            "(pip install est-alan[pdf])"
+        )
+        _warned_missing_pypdf = True
+
+
+def is_scanned(pages: list[str]) -> bool:
+    if not pages:
+        return True
+    chars = sum(len(page.strip()) for page in pages)
+    return chars / len(pages) < SCANNED_MIN_CHARS_PER_PAGE
+
+
+async def aload_pdf(url: str) -> PDFContent:
+    """PDF를 받아 텍스트를 추출. 텍스트를 쓸 수 없으면 media(base64)로 반환."""
+    path = await adownload_pdf(url)
+    try:
+        if pypdf is None:
+            _warn_missing_pypdf()
+            total_pages = 0
+        else:
+            pages, total_pages = await cpu_pool.run(extract_pdf_pages, path)
+            if not is_scanned(pages):
+                logger.info(
+                    f"Extracted text from {len(pages)}/{total_pages} PDF pages: {url}"
+                )
+                return PDFContent(pages=pages, total_pages=total_pages)
+            logger.info(f"PDF has no usable text layer, using media fallback: {url}")
+
+        media = await asyncio.to_thread(_read_media, path)
+        return PDFContent(pages=[], total_pages=total_pages, media=media)
+
+    finally:
+        await asyncio.to_thread(os.unlink, path)
+
+
+def select_relevant_pages(
+    pages: list[str], query: str = "", max_chars: int = PDF_SELECTED_MAX_CHARS
+) -> str:
+    """질문과 관련된 페이지를 골라 연속된 범위로 묶은 텍스트를 반환.
+
+    전체가 `max_chars` 이내면 모든 페이지를 사용한다. 그렇지 않으면 첫 페이지(제목/초록)를 포함해
+    질문 단어가 많이 등장하는 페이지부터 예산 안에서 고르고, 문서 순서대로 이어 붙인다.
+    """
+    if sum(len(page) for page in pages) <= max_chars:
+        selected = dict(enumerate(pages))
+    else:
+        terms = {
+            token.lower() for token in TOKEN_PATTERN.findall(query) if len(token) > 1
+        }
+
+        def score(index: int) -> float:
+            tokens = [token.lower() for token in TOKEN_PATTERN.findall(pages[index])]
+            # 조사가 붙은 한국어 단어("문서는")도 찾도록 접두어로 비교.
+            matches = sum(
+                any(token.startswith(term) for term in terms) for token in tokens
+            )
+            return matches / (len(tokens) ** 0.5) if tokens else 0.0
+
+        # 점수가 같으면 앞쪽 페이지를 우선.
+        ranked = sorted(range(1, len(pages)), key=lambda i: (-score(i), i))
+        selected, used = {}, 0
+        for index in [0, *ranked]:
+            page = pages[index]
+            if not page:
+                continue
+            if used + len(page) > max_chars:
+                if selected:
+                    continue
+                # 처음 고른 페이지가 예산보다 길면 잘라서 사용.
+                page = page[:max_chars]
+            selected[index] = page
+            used += len(page)
+
+    parts = []
+    for start, end in _to_ranges(sorted(selected)):
+        label = f"p. {start + 1}" if start == end else f"p. {start + 1}-{end + 1}"
+        text = "\n\n".join(selected[i] for i in range(start, end + 1) if selected[i])
+        if text:
+            parts.append(f"[{label}]\n{text}")
+    return "\n\n".join(parts)
+
+
+def _to_ranges(indices: list[int]) -> list[tuple[int, int]]:
+    ranges = []
+    for index in indices:
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1] = (ranges[-1][0], index)
+        else:
+            ranges.append((index, index))
+    return ranges
@@ -0,0 +1,87 @@
+import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+from langchain.schema import Document
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PrefetchCache:
+    """검색 결과 상위 URL의 본문을 미리 받아 정제해두는 run 단위 캐시.
+
+    `schedule`로 백그라운드 fetch를 시작하고, 이후 tool 호출에서 `get`으로 결과를 가져간다.
+    턴이 끝나면 `cancel`로 사용되지 않은 prefetch를 모두 취소한다.
+    턴마다 새로 만들어 RunnableConfig의 `PREFETCH_CACHE_KEY`로 전달하므로, 같은 agent의 다른 thread와 공유하지 않는다.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Document]],
+        max_size: int = 5,
+    ):
+        self.loader = loader
+        self.max_size = max_size
+        self._tasks: OrderedDict[str, asyncio.Task] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        logger.debug(f"PrefetchCache initialized with max_size: {max_size}")
+
+    def schedule(self, urls: list[str]) -> None:
+        for url in urls:
+            if url in self._tasks:
+                continue
+
+            if len(self._tasks) >= self.max_size:
+                evicted_url, evicted_task = self._tasks.popitem(last=False)
+                evicted_task.cancel()
+                logger.debug(f"Evicted prefetch for: {evicted_url}")
+
+            logger.debug(f"Scheduling prefetch for: {url}")
+            self._tasks[url] = asyncio.create_task(self.loader(url))
+
+    async def get(self, url: str) -> Optional[Document]:
+        task = self._tasks.get(url)
+        if task is None or task.cancelled():
+            self.misses += 1
+            return None
+
+        try:
+            # 호출한 쪽이 취소되더라도 prefetch 자체는 유지되도록 shield.
+            doc = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                # 호출한 쪽이 취소된 경우.
+                raise
+            # 기다리는 중에 prefetch가 evict/취소되면 직접 가져오도록 miss로 처리.
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Prefetch failed for {url}: {str(e)}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"Prefetch hit for: {url}")
+        return doc.model_copy(deep=True)
+
+    def cancel(self) -> None:
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+
+        if pending:
+            logger.debug(f"Cancelled {len(pending)} unused prefetches")
+        self._tasks.clear()
+
+
+# AlanAgent가 턴마다 만든 PrefetchCache를 ToolCalling에 전달하는 RunnableConfig["configurable"] key.
+PREFETCH_CACHE_KEY = "prefetch_cache"
+
+# ToolCalling이 tool을 실행하는 동안 현재 run의 PrefetchCache를 tool에 전달하기 위한 context.
+current_prefetch_cache: ContextVar[Optional[PrefetchCache]] = ContextVar(
+    "current_prefetch_cache", default=None
+)
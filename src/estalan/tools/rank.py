@@ -0,0 +1,159 @@
+import hashlib
+import os
+import re
+from collections import Counter
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# MinHash로 추정한 snippet 간 Jaccard 유사도가 이 값 이상이면 같은 내용으로 판단.
+NEAR_DUPLICATE_SIMILARITY = float(os.getenv("NEAR_DUPLICATE_SIMILARITY", 0.5))
+# 같은 domain의 결과가 이미 선택될 때마다 점수에 곱하는 값. 작을수록 여러 출처를 고르게 선택.
+DOMAIN_DIVERSITY_DECAY = float(os.getenv("DOMAIN_DIVERSITY_DECAY", 0.7))
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# 영문/숫자와 한글이 붙어 있으면("asyncio로") 나눠서 token으로 만듦.
+WORD_PATTERN = re.compile(r"[가-힣]+|[^\W가-힣]+")
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+PERMUTATION_SEEDS = np.random.default_rng(0).integers(
+    0, np.iinfo(np.uint64).max, NUM_PERMUTATIONS, dtype=np.uint64
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """단어 단위 token. 조사가 붙는 한국어 단어는 글자 bigram도 추가해 부분 일치를 허용."""
+    tokens = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and "가" <= word[0] <= "힣":
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def minhash(text: str) -> np.ndarray:
+    """공백/기호를 정규화한 글자 shingle의 MinHash signature. (한국어 어미 변화에도 안정적)"""
+    normalized = " ".join(TOKEN_PATTERN.findall(text.lower()))
+    shingles = {
+        normalized[i : i + SHINGLE_SIZE]
+        for i in range(max(len(normalized) - SHINGLE_SIZE + 1, 1))
+    }
+    hashes = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            for shingle in shingles
+        ],
+        dtype=np.uint64,
+    )
+    # seed마다 다른 hash 함수(splitmix64)를 적용. uint64 곱셈의 overflow는 의도된 동작.
+    permuted = _splitmix64(hashes ^ PERMUTATION_SEEDS[:, None])
+    return permuted.min(axis=1)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def similarities(signature: np.ndarray, signatures: np.ndarray) -> np.ndarray:
+    """signature 하나와 여러 signature 간의 추정 Jaccard 유사도."""
+    return (signatures == signature).mean(axis=1)
+
+
+def bm25_scores(query_tokens: list[str], documents: list[list[str]]) -> np.ndarray:
+    """query token에 대해 문서별 BM25 점수. 문서 집합 자체를 corpus로 사용."""
+    terms = list(dict.fromkeys(query_tokens))
+    if not terms or not documents:
+        return np.zeros(len(documents))
+
+    index = {term: i for i, term in enumerate(terms)}
+    tf = np.zeros((len(documents), len(terms)))
+    for row, tokens in enumerate(documents):
+        for token, count in Counter(tokens).items():
+            if token in index:
+                tf[row, index[token]] = count
+
+    lengths = np.array([len(tokens) for tokens in documents], dtype=float)
+    avg_length = lengths.mean() or 1.0
+    df = (tf > 0).sum(axis=0)
+    idf = np.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+    return (tf * (BM25_K1 + 1) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+def _domain(result: dict) -> str:
+    host = urlsplit(result["metadata"].get("source") or "").hostname or ""
+    return host.removeprefix("www.")
+
+
+def dedup_and_rank(
+    results: list[dict[str, Any]],
+    query: str,
+    k: Optional[int] = None,
+    threshold: float = NEAR_DUPLICATE_SIMILARITY,
+    diversity_decay: float = DOMAIN_DIVERSITY_DECAY,
+    rank: bool = True,
+) -> list[dict[str, Any]]:
+    """검색 결과에서 거의 같은 snippet을 제거하고 query 관련도 순으로 상위 `k`개를 반환.
+
+    1. 제목+snippet의 BM25 점수를 계산 (동점이면 원래 순서 유지).
+    2. 점수 순으로 고르면서 이미 고른 결과와 snippet이 거의 같은 결과(다른 사이트에 재게시된 기사 등)는 제외.
+    3. 같은 domain의 결과가 선택될 때마다 해당 domain의 남은 결과 점수를 `diversity_decay`배 해서
+       한 출처가 상위를 독점하지 않게 한다.
+
+    `rank`가 False이면 점수 계산 없이 원래 순서대로 고르면서 중복만 제거한다.
+    (최신순 등 검색 API의 순서가 의미 있는 뉴스 검색용)
+    """
+    if not results:
+        return results
+
+    texts = [
+        f"{result['metadata'].get('title', '')} {result['page_content']}"
+        for result in results
+    ]
+    if rank:
+        scores = bm25_scores(tokenize(query), [tokenize(text) for text in texts])
+    else:
+        scores, diversity_decay = np.zeros(len(results)), 1.0
+    signatures = np.stack([minhash(text) for text in texts])
+    domains = [_domain(result) for result in results]
+
+    remaining = list(range(len(results)))
+    selected: list[int] = []
+    domain_counts: Counter = Counter()
+    duplicates = 0
+    while remaining and (k is None or len(selected) < k):
+        best = max(
+            remaining,
+            key=lambda i: (
+                scores[i] * diversity_decay ** domain_counts[domains[i]],
+                -i,
+            ),
+        )
+        remaining.remove(best)
+
+        if selected and (
+            similarities(signatures[best], signatures[selected]).max() >= threshold
+        ):
+            duplicates += 1
+            continue
+
+        selected.append(best)
+        domain_counts[domains[best]] += 1
+
+    logger.debug(
+        f"Ranked {len(results)} results: {len(selected)} selected, {duplicates} near-duplicates"
+    )
+    return [results[i] for i in selected]
@@ -0,0 +1,270 @@
+import asyncio
+import importlib.util
+import itertools
+import json
+import os
+import shutil
+import time
+from typing import Any, Optional
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "readability_worker.js")
+READABILITY_SIDECAR_WORKERS = int(os.getenv("READABILITY_SIDECAR_WORKERS", 2))
+READABILITY_SIDECAR_TIMEOUT = float(os.getenv("READABILITY_SIDECAR_TIMEOUT", 10))
+# 한 줄(JSON 요청/응답)의 최대 크기.
+LINE_LIMIT = 64 * 1024 * 1024
+
+
+class WorkerCrashedError(ConnectionError):
+    pass
+
+
+def _find_node_path() -> Optional[str]:
+    """@mozilla/readability, jsdom이 설치된 node_modules 경로.
+
+    `READABILITY_NODE_PATH`가 없으면 readabilipy가 설치해둔 node_modules를 사용.
+    """
+    if node_path := os.getenv("READABILITY_NODE_PATH"):
+        return node_path
+
+    spec = importlib.util.find_spec("readabilipy")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+
+    node_path = os.path.join(
+        spec.submodule_search_locations[0], "javascript", "node_modules"
+    )
+    return node_path if os.path.isdir(node_path) else None
+
+
+class _NodeWorker:
+    """Node process 하나. 요청마다 id를 붙여 여러 요청을 동시에 보낼 수 있음(pipelining).
+
+    Node는 요청을 한 번에 하나씩 처리하므로, 응답이 timeout을 넘긴 worker는 뒤에 쌓인 요청도 처리하지 못한다.
+    timeout이 발생하면 process를 종료하고 대기 중인 요청을 모두 실패 처리하며, 다음 요청 시 새로 띄운다.
+    """
+
+    def __init__(self, command: list[str], env: dict[str, str]):
+        self.command = command
+        self.env = env
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._ids = itertools.count()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._killed = False
+
+    @property
+    def alive(self) -> bool:
+        return (
+            not self._killed
+            and self.process is not None
+            and self.process.returncode is None
+            and not self._tasks[0].done()
+        )
+
+    @property
+    def load(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.env,
+            limit=LINE_LIMIT,
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_responses()),
+            asyncio.create_task(self._drain_stderr()),
+        ]
+        logger.debug(f"Readability worker started (pid={self.process.pid})")
+
+    async def request(self, payload: dict, timeout: float) -> dict:
+        if not self.alive:
+            raise WorkerCrashedError("Readability worker is not running")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            line = json.dumps({"id": request_id, **payload}, ensure_ascii=False)
+            self.process.stdin.write(line.encode("utf-8") + b"\n")
+            await self.process.stdin.drain()
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Readability worker timed out after {timeout}s, killing")
+            self.kill()
+            raise
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise WorkerCrashedError(str(e)) from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    def kill(self) -> None:
+        """process를 바로 종료하고 응답을 기다리던 요청을 실패 처리."""
+        self._killed = True
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+        self._fail_pending("Readability worker killed after a timeout")
+
+    def _fail_pending(self, message: str) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(WorkerCrashedError(message))
+
+    async def _read_responses(self) -> None:
+        try:
+            while line := await self.process.stdout.readline():
+                response = json.loads(line)
+                future = self._pending.get(response.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            logger.error(f"Readability worker output error: {str(e)}")
+        finally:
+            # process가 종료되면 응답을 기다리던 요청을 모두 실패 처리.
+            self._fail_pending("Readability worker exited")
+
+    async def _drain_stderr(self) -> None:
+        while line := await self.process.stderr.readline():
+            logger.debug(
+                f"Readability worker: {line.decode(errors='replace').rstrip()}"
+            )
+
+    async def aclose(self) -> None:
+        if self.process is None:
+            return
+
+        if self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), 2)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._fail_pending("Readability worker closed")
+
+
+class ReadabilitySidecar:
+    """상시 실행되는 Node readability worker pool.
+
+    문서마다 Node process를 띄우는 대신, line-delimited JSON으로 요청을 보내 IPC 한 번으로 본문을 추출한다.
+    종료되거나 timeout으로 종료시킨 worker는 다음 요청 시 다시 띄우고,
+    요청은 대기 중인 요청이 가장 적은 worker로 보낸다.
+    """
+
+    def __init__(
+        self,
+        size: int = READABILITY_SIDECAR_WORKERS,
+        node: str = "node",
+        script: str = WORKER_SCRIPT,
+        node_path: Optional[str] = None,
+        timeout: float = READABILITY_SIDECAR_TIMEOUT,
+    ):
+        self.size = size
+        self.node = shutil.which(node)
+        self.script = script
+        self.node_path = node_path if node_path is not None else _find_node_path()
+        self.timeout = timeout
+
+        self._workers: list[Optional[_NodeWorker]] = [None] * size
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {
+            "requests": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "restarts": 0,
+            "latency_seconds": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        # 기본 worker script는 readability/jsdom 모듈이 있어야 실행 가능.
+        return (
+            self.size > 0
+            and self.node is not None
+            and (self.script != WORKER_SCRIPT or self.node_path is not None)
+        )
+
+    async def aextract(self, html: str, url: Optional[str] = None) -> dict[str, Any]:
+        """본문 추출 결과({"title", "content"})를 반환. 추출에 실패하면 예외를 발생시킴."""
+        worker = await self._acquire_worker()
+
+        started_at = time.perf_counter()
+        self.stats["requests"] += 1
+        try:
+            response = await worker.request({"html": html, "url": url}, self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["failures"] += 1
+            self.stats["timeouts"] += 1
+            raise
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            self.stats["latency_seconds"] += time.perf_counter() - started_at
+
+        if response.get("error"):
+            self.stats["failures"] += 1
+            raise ValueError(response["error"])
+
+        return {"title": response.get("title"), "content": response.get("content")}
+
+    async def _acquire_worker(self) -> _NodeWorker:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            for i, worker in enumerate(self._workers):
+                if worker is not None and worker.alive:
+                    continue
+
+                if worker is not None:
+                    logger.warning("Readability worker exited, restarting")
+                    self.stats["restarts"] += 1
+                    await worker.aclose()
+
+                self._workers[i] = _NodeWorker(
+                    [self.node, self.script], self._worker_env()
+                )
+                await self._workers[i].start()
+
+            return min(self._workers, key=lambda worker: worker.load)
+
+    def _worker_env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        if self.node_path:
+            env["NODE_PATH"] = self.node_path
+        return env
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": sum(w is not None and w.alive for w in self._workers),
+            "avg_latency_seconds": (
+                self.stats["latency_seconds"] / self.stats["requests"]
+                if self.stats["requests"]
+                else 0.0
+            ),
+        }
+
+    async def aclose(self) -> None:
+        workers, self._workers = self._workers, [None] * self.size
+        await asyncio.gather(
+            *[worker.aclose() for worker in workers if worker is not None],
+            return_exceptions=True,
+        )
+        self._lock = None
+
+
+readability_sidecar = ReadabilitySidecar()
@@ -0,0 +1,43 @@
+// 상시 실행되는 readability worker.
+// stdin으로 한 줄에 하나씩 JSON 요청을 받고, 같은 id로 stdout에 한 줄씩 응답한다.
+//   요청: {"id": 1, "html": "<html>...</html>", "url": "https://..."}
+//   응답: {"id": 1, "title": "...", "content": "<div>...</div>", "error": null}
+const readline = require("readline");
+const { Readability } = require("@mozilla/readability");
+const { JSDOM } = require("jsdom");
+
+// jsdom이 stylesheet를 파싱하는 비용이 크므로 미리 제거.
+const STYLESHEETS = /<style[\s\S]*?<\/style>|<link[^>]+rel=["']?stylesheet[^>]*>/gi;
+
+function extract(html, url) {
+  const dom = new JSDOM(html.replace(STYLESHEETS, ""), { url: url || undefined });
+  try {
+    const article = new Readability(dom.window.document).parse();
+    return article
+      ? { title: article.title, content: article.content }
+      : { title: null, content: null };
+  } finally {
+    dom.window.close();
+  }
+}
+
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+rl.on("line", (line) => {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (e) {
+    return;
+  }
+
+  let response;
+  try {
+    response = { id: request.id, ...extract(request.html, request.url), error: null };
+  } catch (e) {
+    response = { id: request.id, title: null, content: null, error: String(e) };
+  }
+  process.stdout.write(JSON.stringify(response) + "\n");
+});
+
+rl.on("close", () => process.exit(0));
@@ -1,8 +1,15 @@
 import asyncio
+import hashlib
+import json
+import os
 import re
+import sqlite3
+import threading
+import time
+import unicodedata
 from abc import abstractmethod
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Optional
+from typing import Annotated, Any, Awaitable, Callable, Optional
 
 from langchain.callbacks.manager import AsyncCallbackManagerForToolRun
 from langchain.utilities.google_serper import GoogleSerperAPIWrapper
@@ -13,10 +20,239 @@ from pydantic import BaseModel, Field
 
 from estalan.logging_config import get_logger
 from estalan.tools.base import AsyncTool
-from estalan.tools.utils import noop, retry_on_api_empty
+from estalan.tools.http_client import get_http_client
+from estalan.tools.image import IMAGE_MIN_SIZE, ImageProber, image_prober
+from estalan.tools.rank import dedup_and_rank
+from estalan.tools.singleflight import JSON_CODEC, SingleFlight, singleflight
+from estalan.tools.utils import (
+    ResilientExecutor,
+    RetryBudget,
+    canonicalize_url,
+    noop,
+)
+from estalan.tools.youtube import YouTubeSearchClient
 
 logger = get_logger(__name__)
 
+SERPER_API_URL = os.getenv("SERPER_API_URL", "https://google.serper.dev")
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH")
+# 여러 query 변형의 결과를 합친 뒤 LLM에 넘길 최대 결과 수.
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", 20))
+SERPER_RETRY_ATTEMPTS = int(os.getenv("SERPER_RETRY_ATTEMPTS", 3))
+SERPER_RETRY_BASE_DELAY = float(os.getenv("SERPER_RETRY_BASE_DELAY", 0.5))
+# 재시도는 전체 Serper 요청의 이 비율 이내로 제한 (장애 시 재시도 폭주 방지).
+SERPER_RETRY_BUDGET_RATIO = float(os.getenv("SERPER_RETRY_BUDGET_RATIO", 0.2))
+# 저장 몇 번마다 stale 기간까지 지난 검색 결과를 지울지.
+SEARCH_CACHE_PURGE_EVERY = int(os.getenv("SEARCH_CACHE_PURGE_EVERY", 100))
+ISO8601_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# type별 (신선한 기간, 만료 후에도 stale 결과를 반환하며 재검증하는 기간), 초 단위.
+SEARCH_CACHE_TTLS = {
+    "news": (
+        float(os.getenv("SEARCH_CACHE_TTL_NEWS", 10 * 60)),
+        float(os.getenv("SEARCH_CACHE_STALE_NEWS", 60 * 60)),
+    ),
+    "search": (
+        float(os.getenv("SEARCH_CACHE_TTL_SEARCH", 24 * 3600)),
+        float(os.getenv("SEARCH_CACHE_STALE_SEARCH", 7 * 24 * 3600)),
+    ),
+    "images": (
+        float(os.getenv("SEARCH_CACHE_TTL_IMAGES", 7 * 24 * 3600)),
+        float(os.getenv("SEARCH_CACHE_STALE_IMAGES", 30 * 24 * 3600)),
+    ),
+}
+
+
+class SearchCache:
+    """Serper 검색 결과 캐시. (정규화된 query, type, hl, gl, k) 단위로 원본 응답을 저장.
+
+    - type별 TTL 동안은 캐시된 결과를 그대로 반환.
+    - TTL이 지났지만 stale 기간 안이면 캐시된 결과를 바로 반환하고, 백그라운드에서 다시 검색해 갱신.
+    - 같은 key에 대한 동시 검색은 `flight`로 하나로 합친다. (Redis 설정 시 worker 사이에서도)
+    - `path`가 없으면 프로세스 메모리(SQLite `:memory:`)에만 저장.
+    - 저장 `purge_every`번마다 stale 기간까지 지난 결과를 지운다.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttls: dict[str, tuple[float, float]] = SEARCH_CACHE_TTLS,
+        flight: Optional[SingleFlight] = None,
+        purge_every: int = SEARCH_CACHE_PURGE_EVERY,
+    ):
+        self.path = path or ":memory:"
+        self.ttls = ttls
+        self.flight = flight or singleflight
+        self.purge_every = purge_every
+        self._puts = 0
+        self.stats = {
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "errors": 0,
+        }
+        self._background: set[asyncio.Task] = set()
+
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_results (
+                key TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                results TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """)
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+    @classmethod
+    def cache_key(cls, query: str, search_type: str, hl: str, gl: str, k: int) -> str:
+        raw = json.dumps([cls.normalize_query(query), search_type, hl, gl, k])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _ttl(self, search_type: str) -> tuple[float, float]:
+        return self.ttls.get(search_type, self.ttls["search"])
+
+    def get(self, key: str) -> Optional[tuple[dict, str, float]]:
+        """(응답, type, 저장 후 경과 시간)을 반환."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, type, fetched_at FROM search_results WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        results, search_type, fetched_at = row
+        return json.loads(results), search_type, time.time() - fetched_at
+
+    def put(self, key: str, search_type: str, results: dict) -> None:
+        encoded = json.dumps(results, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results VALUES (?, ?, ?, ?)",
+                (key, search_type, encoded, time.time()),
+            )
+            self._conn.commit()
+            self._puts += 1
+            purge = self.purge_every > 0 and self._puts % self.purge_every == 0
+
+        if purge:
+            self.purge_expired()
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            for search_type, (ttl, stale_ttl) in self.ttls.items():
+                self._conn.execute(
+                    "DELETE FROM search_results WHERE type = ? AND fetched_at < ?",
+                    (search_type, time.time() - ttl - stale_ttl),
+                )
+            self._conn.commit()
+        logger.debug("Purged expired search results")
+
+    async def aget_or_fetch(
+        self,
+        key: str,
+        search_type: str,
+        fetch: Callable[[], Awaitable[dict]],
+        cacheable: Callable[[dict], bool] = bool,
+    ) -> dict:
+        """캐시된 결과를 반환하거나 `fetch`로 검색. `cacheable`이 False인 응답은 저장하지 않음."""
+        ttl, stale_ttl = self._ttl(search_type)
+        cached = await asyncio.to_thread(self.get, key)
+
+        if cached is not None:
+            results, _, age = cached
+            if age < ttl:
+                self.stats["fresh_hits"] += 1
+                return results
+            if age < ttl + stale_ttl:
+                self.stats["stale_hits"] += 1
+                self._revalidate(key, search_type, fetch, cacheable)
+                return results
+
+        self.stats["misses"] += 1
+        return await self._fetch_once(key, search_type, fetch, cacheable)
+
+    async def _fetch_once(
+        self,
+        key: str,
+        search_type: str,
+        fetch: Callable[[], Awaitable[dict]],
+        cacheable: Callable[[dict], bool],
+    ) -> dict:
+        async def run() -> dict:
+            results = await fetch()
+            if cacheable(results):
+                await asyncio.to_thread(self.put, key, search_type, results)
+            return results
+
+        return await self.flight.do(f"search:{key}", run, JSON_CODEC)
+
+    def _revalidate(
+        self,
+        key: str,
+        search_type: str,
+        fetch: Callable[[], Awaitable[dict]],
+        cacheable: Callable[[dict], bool],
+    ) -> None:
+        if self.flight.inflight(f"search:{key}"):
+            return
+
+        async def run() -> None:
+            try:
+                await self._fetch_once(key, search_type, fetch, cacheable)
+                self.stats["revalidations"] += 1
+            except Exception as e:
+                # stale 결과는 이미 반환했으므로 실패해도 다음 요청에서 다시 시도.
+                self.stats["errors"] += 1
+                logger.warning(f"Search cache revalidation failed: {str(e)}")
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def metrics(self) -> dict[str, Any]:
+        hits = self.stats["fresh_hits"] + self.stats["stale_hits"]
+        lookups = hits + self.stats["misses"]
+        return {**self.stats, "hit_rate": hits / lookups if lookups else 0.0}
+
+
+async def aserper_results(wrapper: GoogleSerperAPIWrapper, q: str) -> dict:
+    """`wrapper.aresults`와 같은 요청을 공유 API client로 보냄. (connection 재사용, 요청 기록/재생)"""
+    params = {
+        "q": q,
+        "gl": wrapper.gl,
+        "hl": wrapper.hl,
+        "num": wrapper.k,
+        "tbs": wrapper.tbs,
+    }
+    response = await get_http_client("api").post(
+        f"{SERPER_API_URL}/{wrapper.type}",
+        params={key: value for key, value in params.items() if value is not None},
+        headers={
+            "X-API-KEY": wrapper.serper_api_key or "",
+            "Content-Type": "application/json",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+search_cache = SearchCache(SEARCH_CACHE_PATH)
+# 모든 Serper tool이 재시도 한도를 공유.
+serper_executor = ResilientExecutor(
+    attempts=SERPER_RETRY_ATTEMPTS,
+    base_delay=SERPER_RETRY_BASE_DELAY,
+    budget=RetryBudget(ratio=SERPER_RETRY_BUDGET_RATIO),
+)
+
 
 class GoogleSerperSearchArgs(BaseModel):
     query: Optional[list[str]] = Field(
@@ -59,6 +295,46 @@ class BaseGoogleSerperResult(AsyncTool):
     api_wrapper: GoogleSerperAPIWrapper
     args_schema: type[BaseModel] = GoogleSerperSearchArgs
     k: int
+    max_results: int = SEARCH_MAX_RESULTS
+    # False이면 중복만 제거하고 Serper가 반환한 순서를 유지.
+    rank_results: bool = True
+    executor: ResilientExecutor = serper_executor
+
+    async def _acached_results(self, q: str) -> dict:
+        """캐시를 거쳐 Serper 검색. 파싱 결과가 비어 있는 응답은 캐시하지 않음."""
+        wrapper = self.api_wrapper
+        key = search_cache.cache_key(q, wrapper.type, wrapper.hl, wrapper.gl, wrapper.k)
+
+        async def fetch() -> dict:
+            return self._with_absolute_dates(await aserper_results(wrapper, q))
+
+        return await search_cache.aget_or_fetch(
+            key,
+            wrapper.type,
+            fetch,
+            cacheable=lambda results: bool(self._parse_results(results)),
+        )
+
+    def _with_absolute_dates(self, results: dict) -> dict:
+        """상대 날짜(예: 3 hours ago)를 검색한 시각 기준의 절대 시각으로 바꿈.
+
+        캐시에 저장하기 전에 적용해서, 캐시된 결과를 읽는 시각에 따라 날짜가 달라지지 않도록 함.
+        """
+
+        def convert(item: Any) -> Any:
+            if isinstance(item, dict) and isinstance(item.get("date"), str):
+                date = self.convert_to_iso8601(item["date"])
+                return {**item, "date": date or item["date"]}
+            return item
+
+        return {
+            key: (
+                [convert(item) for item in value]
+                if isinstance(value, list)
+                else convert(value)
+            )
+            for key, value in results.items()
+        }
 
     async def _arun(
         self,
@@ -100,21 +376,11 @@ class BaseGoogleSerperResult(AsyncTool):
 
         async def fetch_results(q):
             logger.debug(f"Fetching results for query: {q}")
-            result = await self.api_wrapper.aresults(q)
+            result = await self._acached_results(q)
             return self._parse_results(result)
 
-        @retry_on_api_empty()
-        async def fetch_all_results(query: list[str]):
-            results = []
-            fetch_tasks = [fetch_results(q) for q in query]
-            results_list = await asyncio.gather(*fetch_tasks)
-            for result in results_list:
-                results.extend(result)  # 결과를 합침
-
-            return results
-
         try:
-            results = await fetch_all_results(query_w_options) or []
+            results = await self._afetch_all(query_w_options, fetch_results)
             logger.debug(f"Retrieved {len(results)} search results")
 
             if self.__class__.__name__ != "GoogleSerperNewsResult" and results:
@@ -125,6 +391,7 @@ class BaseGoogleSerperResult(AsyncTool):
             merged_results = {}
             for doc in results:
                 link = doc["metadata"].get("source")
+                link = canonicalize_url(link) if link else link
                 if link in merged_results:
                     if doc["page_content"] not in merged_results[link]["page_content"]:
                         merged_results[link]["page_content"].append(doc["page_content"])
@@ -135,7 +402,13 @@ class BaseGoogleSerperResult(AsyncTool):
             for doc in merged_results.values():
                 doc["page_content"] = ", ".join(doc["page_content"])
 
-            final_results = list(merged_results.values())
+            # 다른 사이트에 재게시된 같은 기사를 제거하고 (rank_results이면 query 관련도 순으로) 상위 결과만 남김.
+            final_results = dedup_and_rank(
+                list(merged_results.values()),
+                " ".join(query),
+                k=self.max_results,
+                rank=self.rank_results,
+            )
             logger.info(
                 f"{self.__class__.__name__} completed with {len(final_results)} merged results"
             )
@@ -145,10 +418,39 @@ class BaseGoogleSerperResult(AsyncTool):
             logger.error(f"Error in {self.__class__.__name__}: {str(e)}")
             raise
 
+    async def _afetch_all(
+        self, queries: list[str], fetch: Callable[[str], Awaitable[list]]
+    ) -> list:
+        """query별로 재시도하며 검색해 결과를 합침. 일부 query가 실패하면 나머지 결과만 반환.
+
+        query 하나의 빈 결과는 정상일 수 있으므로 다시 시도하지 않고,
+        모든 query의 결과가 비었을 때만 전체를 한 번 더 시도한다.
+        """
+        for attempt in range(2):
+            batch = await self.executor.arun(queries, fetch)
+            for q, error in batch.failures.items():
+                logger.warning(
+                    f"Search failed for query {q!r}: {type(error).__name__} {str(error)}"
+                )
+            if batch.failures and not batch.results:
+                raise next(iter(batch.failures.values()))
+
+            docs = [doc for q in queries for doc in batch.results.get(q, [])]
+            if docs or attempt > 0 or not self.executor.budget.try_spend():
+                return docs
+            logger.debug(f"Empty results for all queries, retrying: {queries}")
+
     def convert_to_iso8601(self, time_str):
         if time_str is None:
             return None
 
+        # 캐시에 저장할 때 이미 변환된 날짜.
+        try:
+            datetime.strptime(time_str, ISO8601_FORMAT)
+            return time_str
+        except ValueError:
+            pass
+
         now = datetime.now(timezone(timedelta()))
 
         relative_match = re.match(
@@ -173,12 +475,12 @@ class BaseGoogleSerperResult(AsyncTool):
                 return None
 
             past_time = now - delta
-            return past_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+            return past_time.strftime(ISO8601_FORMAT)
 
         try:
             absolute_time = datetime.strptime(time_str, "%b %d, %Y")
             absolute_time = absolute_time.replace(tzinfo=timezone(timedelta()))
-            return absolute_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+            return absolute_time.strftime(ISO8601_FORMAT)
         except ValueError:
             return None
 
@@ -264,6 +566,8 @@ class GoogleSerperSearchResult(BaseGoogleSerperResult):
 class GoogleSerperNewsResult(BaseGoogleSerperResult):
     name: str = "search_google_news"
     description: str = "Search for high-cost news, including relatively long summaries."
+    # 뉴스는 Serper의 순서(최신성 반영)를 유지하고 재게시된 기사만 제거.
+    rank_results: bool = False
 
     @classmethod
     def from_api_key(
@@ -315,6 +619,8 @@ class GoogleSerperNewsResult(BaseGoogleSerperResult):
 class GoogleSerperImageSearchResult(BaseGoogleSerperResult):
     name: str = "search_image"
     description: str = "Low-cost web search with image"
+    prober: Optional[ImageProber] = image_prober
+    min_image_size: int = IMAGE_MIN_SIZE
 
     @classmethod
     def from_api_key(
@@ -344,7 +650,6 @@ class GoogleSerperImageSearchResult(BaseGoogleSerperResult):
             return docs
         image_results = results["images"]
 
-        num_pass = 0
         for result in image_results:
             # 필수 필드 확인
             if not all(key in result for key in ["title", "imageUrl", "link"]):
@@ -374,24 +679,12 @@ class GoogleSerperImageSearchResult(BaseGoogleSerperResult):
             if not any(image_url.endswith(ext) for ext in ['.jpg', '.jpeg', '.png']):
                 continue
 
-            # cors_violation = is_cors_violation(result["imageUrl"])
-            # if cors_violation:
-            #     print(f"CORS violation detected for {result['imageUrl']}")
-            # else:
-            #     print(f"Pass CORS for {result['imageUrl']}")
-            #
-            # num_pass += 1
-            # print(f"{num_pass} / {self.k}")
-
             docs.append(
                 {
                     "page_content": result["title"],
                     "metadata": {k: v for k, v in metadata.items() if v is not None},
                 }
             )
-            # print(f"docs : {len(docs)}")
-            if num_pass > self.k:
-                break
 
         logger.debug(f"Parsed {len(docs)} image results")
         return docs
@@ -408,19 +701,15 @@ class GoogleSerperImageSearchResult(BaseGoogleSerperResult):
 
         if isinstance(query, str):
             query = [query]
-        results = []
 
         async def fetch_results(q):
             logger.debug(f"Fetching image results for query: {q}")
-            result = await self.api_wrapper.aresults(q)
+            result = await self._acached_results(q)
             return self._parse_results(result)
 
         try:
             # 각 쿼리에 대해 결과를 비동기적으로 가져옴
-            fetch_tasks = [fetch_results(q) for q in query]
-            results_list = await asyncio.gather(*fetch_tasks)
-            for result in results_list:
-                results.extend(result)  # 결과를 합침
+            results = await self._afetch_all(query, fetch_results)
             merged_results = {}
             for doc in results:
                 link = doc["metadata"].get("image_url")
@@ -428,6 +717,12 @@ class GoogleSerperImageSearchResult(BaseGoogleSerperResult):
                     merged_results[link] = doc
 
             final_results = list(merged_results.values())
+            if self.prober is not None:
+                # 한 번의 요청(파일 앞부분)으로 접근 가능 여부와 실제 크기를 확인해서,
+                # 접근할 수 없거나(CORS 포함) 깨지거나 작은 이미지는 제외하고 Serper의 크기 정보를 교체.
+                final_results = await self.prober.afilter(
+                    final_results, min_size=self.min_image_size
+                )
             logger.info(
                 f"Image search completed with {len(final_results)} unique results"
             )
@@ -469,21 +764,13 @@ class RapidYoutubeSearchResult(AsyncTool):
     ):
         logger.debug("Starting YouTube video search")
 
+        if isinstance(query, str):
+            query = [query]
+
         try:
-            videos = []
-            video_ids = set()
-
-            for keyword in query:
-                logger.debug(f"Searching videos for keyword: {keyword}")
-                for video in (
-                    get_video_list_by_keyword(
-                        keyword, api_key=self.api_key, api_endpoint=self.api_endpoint
-                    )
-                    or []
-                ):
-                    if video["video_id"] not in video_ids:
-                        videos.append(video)
-                        video_ids.add(video["video_id"])
+            # 모든 keyword를 동시에 검색하므로 전체 지연 시간은 가장 느린 검색 하나와 같음.
+            client = YouTubeSearchClient(self.api_endpoint, self.api_key)
+            videos = await client.asearch_all(query or [], k=self.k)
 
             results = [
                 {**video, "number": i, "metadata": {"type": "video"}}
@@ -497,31 +784,3 @@ class RapidYoutubeSearchResult(AsyncTool):
             logger.error(f"Error in YouTube video search: {str(e)}")
             raise
 
-
-import requests
-from urllib.parse import urlparse
-
-
-def get_origin_from_url(url: str) -> str:
-    parsed = urlparse(url)
-    return f"{parsed.scheme}://{parsed.netloc}"
-
-def is_cors_violation(url: str, method="GET", headers=None) -> bool:
-    """check cors violation."""
-    origin = get_origin_from_url(url)  # URL에서 자동 추출
-
-    try:
-        response = requests.head(url, timeout=5)
-        allow_origin = response.headers.get("Access-Control-Allow-Origin")
-
-        # CORS 헤더가 없거나 요청 origin과 매칭되지 않으면 False
-        if not allow_origin:
-            return True
-
-        if allow_origin == "*" or allow_origin == origin:
-            return False
-
-        return True
-
-    except requests.RequestException:
-        return True
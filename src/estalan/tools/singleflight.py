@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+from estalan.logging_config import get_logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis가 없으면 process 안에서만 요청을 합친다.
+    aioredis = None
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# 설정하면 같은 Redis를 쓰는 worker 사이에서도 요청을 합친다. (예: REDIS_URI와 같은 값)
+SINGLEFLIGHT_REDIS_URI = os.getenv("SINGLEFLIGHT_REDIS_URI")
+SINGLEFLIGHT_KEY_PREFIX = os.getenv("SINGLEFLIGHT_KEY_PREFIX", "estalan:singleflight:")
+# leader worker가 실행 중임을 알리는 lock의 최대 유지 시간. leader가 죽어도 이 시간 후 풀린다.
+SINGLEFLIGHT_LOCK_TTL = float(os.getenv("SINGLEFLIGHT_LOCK_TTL", 60))
+# 다른 worker가 결과를 가져갈 수 있도록 결과를 남겨두는 시간. 캐시가 아니므로 짧게 유지.
+SINGLEFLIGHT_RESULT_TTL = float(os.getenv("SINGLEFLIGHT_RESULT_TTL", 5))
+SINGLEFLIGHT_WAIT_TIMEOUT = float(os.getenv("SINGLEFLIGHT_WAIT_TIMEOUT", 30))
+# 이보다 큰 결과(예: 긴 PDF 본문)는 Redis에 올리지 않고, 기다리던 worker가 직접 실행.
+SINGLEFLIGHT_MAX_RESULT_BYTES = int(
+    os.getenv("SINGLEFLIGHT_MAX_RESULT_BYTES", 1024 * 1024)
+)
+SINGLEFLIGHT_POLL_INTERVAL = 0.05
+
+# 자신이 잡은 lock만 지우도록 token을 비교.
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+_MISSING = object()
+
+
+@dataclass(slots=True)
+class FlightCodec(Generic[T]):
+    """worker 사이에 결과를 전달할 때의 직렬화 방식. `encode`가 None을 반환하면 공유하지 않음."""
+
+    encode: Callable[[T], Optional[str]]
+    decode: Callable[[str], T]
+
+
+JSON_CODEC = FlightCodec(encode=json.dumps, decode=json.loads)
+
+
+class SingleFlight:
+    """같은 key로 동시에 들어온 요청을 하나의 실행으로 합친다.
+
+    - process 안에서는 먼저 들어온 요청의 task를 나머지 요청이 함께 기다린다.
+    - `redis_uri`가 있고 `codec`을 넘기면, Redis lock으로 worker 사이에서도 한 곳만 실행하고
+      나머지 worker는 Redis에 남겨진 결과를 사용한다. Redis 오류나 대기 시간 초과 시에는 직접 실행.
+      `max_result_bytes`를 넘는 결과는 Redis에 올리지 않는다.
+    - key의 첫 ":" 앞부분(search, fetch, transcript 등)별로 절약한 호출 수를 집계한다.
+    """
+
+    def __init__(
+        self,
+        redis_uri: Optional[str] = SINGLEFLIGHT_REDIS_URI,
+        key_prefix: str = SINGLEFLIGHT_KEY_PREFIX,
+        lock_ttl: float = SINGLEFLIGHT_LOCK_TTL,
+        result_ttl: float = SINGLEFLIGHT_RESULT_TTL,
+        wait_timeout: float = SINGLEFLIGHT_WAIT_TIMEOUT,
+        max_result_bytes: int = SINGLEFLIGHT_MAX_RESULT_BYTES,
+    ):
+        self.redis_uri = redis_uri if aioredis is not None else None
+        self.key_prefix = key_prefix
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.max_result_bytes = max_result_bytes
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._redis_client: tuple[Any, Optional[asyncio.AbstractEventLoop]] = (
+            None,
+            None,
+        )
+        self.stats: dict[str, dict[str, int]] = {}
+
+        if redis_uri and aioredis is None:
+            logger.warning("redis is not installed, singleflight is process-local")
+
+    def _count(self, key: str, name: str) -> None:
+        kind = key.split(":", 1)[0]
+        stats = self.stats.setdefault(
+            kind,
+            {
+                "calls": 0,
+                "executions": 0,
+                "shared_local": 0,
+                "shared_remote": 0,
+                "remote_fallbacks": 0,
+            },
+        )
+        stats[name] += 1
+
+    def inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        codec: Optional[FlightCodec[T]] = None,
+    ) -> T:
+        """`key`에 대해 실행 중인 요청이 있으면 그 결과를, 없으면 `fn()`의 결과를 반환."""
+        self._count(key, "calls")
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self._count(key, "shared_local")
+            logger.debug(f"Joining in-flight request: {key}")
+            return await asyncio.shield(task)
+
+        task = asyncio.create_task(self._execute(key, fn, codec))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+        # 먼저 요청한 쪽이 취소되어도 함께 기다리는 요청은 결과를 받도록 shield.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _execute(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        codec: Optional[FlightCodec[T]],
+    ) -> T:
+        client = self._redis() if codec is not None else None
+        if client is None:
+            return await self._run(key, fn)
+
+        lock_key = f"{self.key_prefix}{key}:lock"
+        result_key = f"{self.key_prefix}{key}:result"
+        token = uuid.uuid4().hex
+        try:
+            if (encoded := await client.get(result_key)) is not None:
+                self._count(key, "shared_remote")
+                return codec.decode(encoded)
+            acquired = await client.set(
+                lock_key, token, nx=True, px=int(self.lock_ttl * 1000)
+            )
+        except Exception as e:
+            logger.warning(f"Singleflight Redis error, running locally: {str(e)}")
+            return await self._run(key, fn)
+
+        if not acquired:
+            result = await self._await_remote(client, lock_key, result_key, codec)
+            if result is not _MISSING:
+                self._count(key, "shared_remote")
+                return result
+            # leader가 실패했거나 너무 오래 걸림.
+            self._count(key, "remote_fallbacks")
+            return await self._run(key, fn)
+
+        try:
+            result = await self._run(key, fn)
+            try:
+                if (encoded := self._encode(key, result, codec)) is not None:
+                    await client.set(
+                        result_key, encoded, px=int(self.result_ttl * 1000)
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to publish singleflight result: {str(e)}")
+            return result
+        finally:
+            try:
+                await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.warning(f"Failed to release singleflight lock: {str(e)}")
+
+    def _encode(self, key: str, result: T, codec: FlightCodec[T]) -> Optional[str]:
+        encoded = codec.encode(result)
+        if encoded is None:
+            return None
+
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_result_bytes:
+            logger.debug(
+                f"Singleflight result too large to share ({size} bytes): {key}"
+            )
+            return None
+        return encoded
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self._count(key, "executions")
+        return await fn()
+
+    async def _await_remote(
+        self,
+        client: Any,
+        lock_key: str,
+        result_key: str,
+        codec: FlightCodec[T],
+    ) -> Any:
+        """다른 worker의 결과를 기다림. lock이 풀렸는데 결과가 없거나 시간이 지나면 `_MISSING`."""
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(SINGLEFLIGHT_POLL_INTERVAL)
+                if (encoded := await client.get(result_key)) is not None:
+                    return codec.decode(encoded)
+                if not await client.exists(lock_key):
+                    encoded = await client.get(result_key)
+                    return codec.decode(encoded) if encoded is not None else _MISSING
+        except Exception as e:
+            logger.warning(f"Singleflight Redis error while waiting: {str(e)}")
+        return _MISSING
+
+    def _redis(self) -> Any:
+        """event loop별 Redis client. (client는 생성된 loop에 묶임)"""
+        if self.redis_uri is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        client, client_loop = self._redis_client
+        if client is None or client_loop is not loop:
+            client = aioredis.from_url(self.redis_uri, decode_responses=True)
+            self._redis_client = (client, loop)
+        return client
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        return {
+            kind: {**stats, "saved": stats["shared_local"] + stats["shared_remote"]}
+            for kind, stats in self.stats.items()
+        }
+
+    async def aclose(self) -> None:
+        client, _ = self._redis_client
+        if client is not None:
+            await client.aclose()
+        self._redis_client = (None, None)
+
+
+singleflight = SingleFlight()
@@ -19,6 +19,7 @@ from pydantic import BaseModel, Field
 
 from estalan.core.prompt import SummaryPrompt
 from estalan.logging_config import get_logger
+from estalan.tools.pdf import PAGE_SEPARATOR, select_relevant_pages
 from estalan.tools.utils import add_graph_components
 
 load_dotenv()
@@ -265,7 +266,18 @@ class MapReduceSummarizationSubgraph:
         )
 
         try:
-            if document.metadata.get("type") == "pdf":
+            if document.metadata.get("type") == "pdf" and not document.metadata.get(
+                "media"
+            ):
+                # 추출한 텍스트 중 질문과 관련된 페이지 범위만 요약.
+                document = Document(
+                    page_content=select_relevant_pages(
+                        document.page_content.split(PAGE_SEPARATOR), user_query
+                    ),
+                    metadata=document.metadata,
+                )
+            elif document.metadata.get("type") == "pdf":
+                # 스캔 PDF처럼 텍스트를 추출하지 못한 경우에만 파일을 Gemini에 직접 전달.
                 logger.debug("Processing PDF document with Gemini")
                 messages = SummaryPrompt().format_messages(
                     user_query=user_query,
@@ -1,11 +1,10 @@
-import base64
+import asyncio
+import hashlib
+import json
 import os
 import re
-import xml.etree.ElementTree as ET
 from typing import Annotated, Optional
-from xml.sax.saxutils import unescape as unescape_xml
 
-import httpx
 from langchain.base_language import BaseLanguageModel
 from langchain.callbacks.manager import AsyncCallbackManagerForToolRun
 from langchain.schema import BaseMessage, Document, HumanMessage
@@ -15,14 +14,19 @@ from pydantic import BaseModel, Field
 
 from estalan.logging_config import get_logger
 from estalan.tools.base import AsyncTool
+from estalan.tools.http_cache import HTTPCache
 from estalan.tools.mixins import (
     ContentTypeError,
     HTMLToMarkdownMixin,
     HTTPXMixin,
     MessageMixin,
 )
+from estalan.tools.pdf import aload_pdf
+from estalan.tools.prefetch import current_prefetch_cache
+from estalan.tools.singleflight import FlightCodec, SingleFlight, singleflight
 from estalan.tools.summarize import MapReduceSummarizationSubgraph
-from estalan.tools.utils import noop
+from estalan.tools.utils import canonicalize_url, noop
+from estalan.tools.youtube import transcript_service
 
 RAPID_API_HOST = os.getenv("RAPID_API_ENDPOINT").replace("https://", "")
 RAPID_API_KEY = os.getenv("RAPID_API_KEY")
@@ -30,7 +34,8 @@ HEADERS = {
     "x-rapidapi-host": RAPID_API_HOST,
     "x-rapidapi-key": RAPID_API_KEY,
 }
-CLIENT_TIMEOUT = 10  # seconds
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH")
+HTTP_CACHE_DEFAULT_TTL = float(os.getenv("HTTP_CACHE_DEFAULT_TTL", 600))
 
 logger = get_logger(__name__)
 
@@ -51,6 +56,22 @@ youtube_url_pattern = re.compile(
 )
 
 
+def _encode_document(doc: Document) -> Optional[str]:
+    # 오류 응답과 media(base64) PDF는 다른 worker와 공유하지 않음.
+    if "error" in doc.metadata or doc.metadata.get("media"):
+        return None
+    return json.dumps(
+        {"page_content": doc.page_content, "metadata": doc.metadata},
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+DOCUMENT_CODEC = FlightCodec(
+    encode=_encode_document, decode=lambda encoded: Document(**json.loads(encoded))
+)
+
+
 class HTTPURLArgs(BaseModel):
     urls: list[str] = Field(
         ...,
@@ -122,7 +143,15 @@ class URLProcessor:
 
 
 class ContentFetcher(HTTPXMixin):
-    def __init__(self):
+    def __init__(
+        self,
+        http_cache: Optional[HTTPCache] = None,
+        flight: Optional[SingleFlight] = None,
+    ):
+        if http_cache is None and HTTP_CACHE_PATH:
+            http_cache = HTTPCache(HTTP_CACHE_PATH, default_ttl=HTTP_CACHE_DEFAULT_TTL)
+        self.http_cache = http_cache
+        self.flight = flight or singleflight
         self.url_processor = URLProcessor(
             {
                 r"^https?:\/\/(?:m\.)?blog\.naver\.com\/([^\/?#]+)\/([0-9]+)\/?": "https://m.blog.naver.com/PostView.naver?blogId={0}&logNo={1}"
@@ -130,7 +159,21 @@ class ContentFetcher(HTTPXMixin):
         )
         logger.debug("ContentFetcher initialized")
 
+    @staticmethod
+    def request_key(url: str, headers: dict) -> str:
+        raw = json.dumps([canonicalize_url(url), sorted(headers.items())])
+        return f"fetch:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
     async def fetch_content(self, url: str, headers: dict) -> Document:
+        """같은 URL에 대한 동시 요청은 한 번만 가져오고, 호출한 쪽마다 Document 복사본을 반환."""
+        doc = await self.flight.do(
+            self.request_key(url, headers),
+            lambda: self._fetch_content(url, headers),
+            DOCUMENT_CODEC,
+        )
+        return Document(page_content=doc.page_content, metadata=dict(doc.metadata))
+
+    async def _fetch_content(self, url: str, headers: dict) -> Document:
         logger.info(f"Fetching content from: {url}")
 
         try:
@@ -177,15 +220,23 @@ class ContentFetcher(HTTPXMixin):
         logger.debug(f"Fetching PDF content from: {url}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                pdf = base64.b64encode(response.content).decode("utf-8")
+            pdf = await aload_pdf(url)
+            if pdf.media is not None:
+                logger.info(
+                    f"PDF fetched as media from {url} ({len(pdf.media)} base64 characters)"
+                )
+                return Document(
+                    page_content=pdf.media,
+                    metadata={"source": url, "type": "pdf", "media": True},
+                )
 
             logger.info(
-                f"PDF fetched successfully from {url} ({len(pdf)} base64 characters)"
+                f"PDF fetched successfully from {url} ({len(pdf.pages)}/{pdf.total_pages} pages)"
+            )
+            return Document(
+                page_content=pdf.text,
+                metadata={"source": url, "type": "pdf", "pages": pdf.total_pages},
             )
-            return Document(page_content=pdf, metadata={"source": url, "type": "pdf"})
 
         except Exception as e:
             logger.error(f"Error fetching PDF from {url}: {str(e)}")
@@ -195,13 +246,12 @@ class ContentFetcher(HTTPXMixin):
         logger.debug(f"Fetching HTML content from: {url}")
 
         try:
-            html_text = await self.aget(url, headers, content_type="text")
+            doc = await self.afetch(url, headers, content_type="text")
+            doc.metadata["type"] = "text"
             logger.info(
-                f"HTML fetched successfully from {url} ({len(html_text)} characters)"
-            )
-            return Document(
-                page_content=html_text, metadata={"source": url, "type": "text"}
+                f"HTML fetched successfully from {url} ({len(doc.page_content)} characters)"
             )
+            return doc
         except Exception as e:
             logger.error(f"Error fetching HTML from {url}: {str(e)}")
             raise
@@ -217,23 +267,8 @@ class ContentFetcher(HTTPXMixin):
             match = pattern.search(url)
             video_id = match.group(1)
             logger.debug(f"Extracted YouTube video ID: {video_id}")
-            proxies = {
-                "http": f"http://{os.environ['PROXY_ID']}:{os.environ['PROXY_PASSWORD']}@{os.environ['PROXY_HOST']}:{os.environ['PROXY_PORT']}",
-                "https": f"https://{os.environ['PROXY_ID']}:{os.environ['PROXY_PASSWORD']}@{os.environ['PROXY_HOST']}:{os.environ['PROXY_PORT']}",
-            }
-            try:
-                transcript_info = YouTubeTranscriptApi.get_transcript(
-                    video_id, languages=LANGUAGE_CODES, proxies=proxies
-                )
-                transcript_info = sorted(transcript_info, key=lambda x: x["start"])
-                full_scripts = [script["text"].strip() for script in transcript_info]
-                transcript_text = "\n".join(full_scripts)
-
-            except Exception as e:
-                logger.warning(
-                    f"Error fetching YouTube script via YouTubeTranscriptApi: {e}"
-                )
-                transcript_text = await self._fetch_youtube_script(video_id)
+            transcript = await transcript_service.aget_transcript(video_id)
+            transcript_text = transcript.text
 
             logger.info(
                 f"YouTube transcript fetched successfully for {video_id} ({len(transcript_text)} characters)"
@@ -247,73 +282,13 @@ class ContentFetcher(HTTPXMixin):
             logger.error(f"Error fetching YouTube transcript from {url}: {str(e)}")
             raise
 
-    async def _fetch_youtube_script(self, video_id: str) -> Optional[str]:
-        rapid_api_endpoint = os.getenv("RAPID_API_ENDPOINT")
-        rapid_api_key = os.getenv("RAPID_API_KEY")
-        if not (rapid_api_endpoint and rapid_api_key):
-            logger.error("RAPID API key is not configured")
-            return None
-
-        try:
-            async with httpx.AsyncClient(timeout=CLIENT_TIMEOUT) as client:
-                list_url = f"{rapid_api_endpoint}/subtitles"
-                resp = await client.get(
-                    list_url,
-                    params={"id": video_id},
-                    headers={
-                        "x-rapidapi-host": rapid_api_endpoint.replace("https://", ""),
-                        "x-rapidapi-key": rapid_api_key,
-                    },
-                )
-                resp.raise_for_status()
-                subtitles = resp.json().get("subtitles", [])
-
-                urls_map = {st["languageCode"]: st["url"] for st in subtitles}
-                url = next(
-                    (urls_map[lc] for lc in LANGUAGE_CODES if lc in urls_map), None
-                )
-                if url:
-                    resp = await client.get(url)
-                    resp.raise_for_status()
-                    text = await self.extract_text_from_transcript(resp.text.strip())
-                    if text:
-                        return text
-                logger.info(f"No matching subtitles for video {video_id}")
-
-        except Exception as e:
-            logger.error(f"Failed to fetch YouTube script: {e}")
-
-        raise TranscriptsDisabled(video_id)
-
-    async def extract_text_from_transcript(self, xml_content: str) -> Optional[str]:
-        try:
-            root = ET.fromstring(xml_content)
-
-            texts = []
-            for text_element in root.findall(".//text"):
-                content = text_element.text
-                if content:
-                    content = unescape_xml(content, {"&quot;": '"'})
-                    content = re.sub(r"\[.*?\]", "", content).strip()
-
-                    if content:
-                        texts.append(content)
-
-            return " ".join(texts)
-
-        except ET.ParseError as e:
-            logger.error(f"XML parsing error: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error: {e}")
-            return None
-
 
 class BaseHTTPTool(AsyncTool, HTMLToMarkdownMixin, MessageMixin):
     name: str = ""
     description: str = ""
     summarize_graph: MapReduceSummarizationSubgraph
     content_fetcher: ContentFetcher = ContentFetcher()
+    max_concurrent_fetches: int = 5
 
     @classmethod
     def from_llm(
@@ -330,7 +305,45 @@ class BaseHTTPTool(AsyncTool, HTMLToMarkdownMixin, MessageMixin):
             summarize_graph=summarize_graph,
         )
 
+    async def _fetch_all(self, urls: list[str]) -> list[Document]:
+        """URL들을 동시에(최대 `max_concurrent_fetches`개) 가져오며, 입력 순서대로 반환."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+
+        async def fetch(url: str) -> Document:
+            async with semaphore:
+                logger.debug(f"Processing URL: {url}")
+                return await self._fetch_and_preprocess(url)
+
+        results = await asyncio.gather(
+            *[fetch(url) for url in urls], return_exceptions=True
+        )
+
+        docs = []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                # 한 URL의 실패로 전체가 실패하지 않도록 fetch_content와 같은 형식의 오류 Document로 반환.
+                result = Document(
+                    page_content="콘텐츠에 접근할 수 없습니다.",
+                    metadata={
+                        "error": type(result).__name__,
+                        "error_content": str(result),
+                        "source": url,
+                    },
+                )
+            docs.append(result)
+        return docs
+
     async def _fetch_and_preprocess(self, url: str) -> Document:
+        prefetch_cache = current_prefetch_cache.get()
+        if prefetch_cache is not None and (doc := await prefetch_cache.get(url)):
+            logger.debug(f"Using prefetched document: {url}")
+            return doc
+
+        return await self._afetch_and_clean(url)
+
+    async def _afetch_and_clean(self, url: str) -> Document:
         logger.debug(f"Fetching and preprocessing: {url}")
 
         try:
@@ -338,6 +351,9 @@ class BaseHTTPTool(AsyncTool, HTMLToMarkdownMixin, MessageMixin):
             if "error" in doc.metadata:
                 logger.warning(f"Error in fetched document: {doc.metadata['error']}")
                 return doc
+            if doc.metadata.get("type") == "pdf":
+                # PDF는 페이지 구분(\f)을 유지한 채 요약 단계에서 관련 페이지를 고름.
+                return doc
 
             md_doc = await self.aclean_html(doc)
             md_doc.page_content = re.sub(r"\n+", " ", md_doc.page_content)
@@ -388,11 +404,7 @@ class URLSummarizeTool(BaseHTTPTool):
         urls = [url if url.startswith("http") else "https://" + url for url in urls]
         logger.debug(f"Processed URLs: {urls}")
 
-        md_docs = []
-        for url in urls:
-            logger.debug(f"Processing URL: {url}")
-            md_doc = await self._fetch_and_preprocess(url)
-            md_docs.append(md_doc)
+        md_docs = await self._fetch_all(urls)
 
         filtered = [doc for doc in md_docs if "error" not in doc.metadata]
         logger.debug(
@@ -408,17 +420,10 @@ class URLSummarizeTool(BaseHTTPTool):
                 }
             ]
 
-        # Extract titles
-        for url, doc in zip(urls, filtered):
+        # title은 본문과 함께 가져온 값을 사용.
+        for doc in filtered:
             doc.metadata["thumbnail"] = None
-            try:
-                logger.debug(f"Extracting title for: {url}")
-                doc.metadata["title"] = await self.aget_title(
-                    url=url, headers={"Accept": "text/*"}, content_type="text"
-                )
-            except Exception as e:
-                logger.warning(f"Failed to extract title for {url}: {str(e)}")
-                doc.metadata["title"] = None
+            doc.metadata.setdefault("title", None)
 
         # Prepare display information
         titles, urls_display = [], []
@@ -533,19 +538,9 @@ class RefSummarizeTool(BaseHTTPTool):
         referenced_urls, referenced_idxs = map(list, zip(*unique_urls.items()))
         logger.debug(f"Processing {len(referenced_urls)} unique URLs")
 
-        md_docs = []
-        for idx, url in zip(referenced_idxs, referenced_urls):
-            logger.debug(f"Processing reference {idx}: {url}")
-            md_doc = await self._fetch_and_preprocess(url)
-            try:
-                md_doc.metadata["title"] = await self.aget_title(
-                    url=url, headers={"Accept": "text/*"}, content_type="text"
-                )
-            except Exception as e:
-                logger.warning(f"Failed to extract title for reference {idx}: {str(e)}")
-                md_doc.metadata["title"] = None
-
-            md_docs.append(md_doc)
+        md_docs = await self._fetch_all(referenced_urls)
+        for md_doc in md_docs:
+            md_doc.metadata.setdefault("title", None)
 
         # Prepare display information
         titles, urls_display = [], []
@@ -1,5 +1,11 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 from langgraph.graph import StateGraph
-from tenacity import retry, retry_if_result, stop_after_attempt
 
 from estalan.logging_config import get_logger
 
@@ -34,13 +40,125 @@ async def noop(*args, **kwargs):
     pass
 
 
-def is_result_empty(result):
-    return not result
+class RetryBudget:
+    """여러 요청이 공유하는 재시도 한도.
+
+    첫 시도마다 `ratio`만큼 적립하고 재시도마다 1을 사용한다(최대 `max_tokens`). 장애로 모든 요청이
+    실패하면 재시도는 전체 요청의 `ratio` 비율 정도로 제한되어, 재시도가 장애를 키우지 않는다.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.exhausted = 0
+
+    def record_attempt(self) -> None:
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass(slots=True)
+class BatchResult:
+    results: dict[str, Any] = field(default_factory=dict)
+    """성공한(재시도 후에도 비어 있는 결과 포함) query별 결과."""
+    failures: dict[str, BaseException] = field(default_factory=dict)
+    """모든 시도가 실패한 query별 마지막 오류."""
+
+
+class ResilientExecutor:
+    """query마다 독립적으로 재시도(지수 backoff + jitter)하며 실행.
+
+    - 오류가 나면 해당 query만 최대 `attempts`번까지 다시 시도.
+      빈 결과는 정상일 수 있으므로 `retry_if_empty`일 때만 다시 시도한다.
+    - 실패한 query는 `BatchResult.failures`로 따로 보고하고, 성공한 query의 결과는 그대로 반환.
+    - 재시도는 `budget`을 사용하며, 한도를 넘으면 더 이상 재시도하지 않는다.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 4.0,
+        budget: Optional[RetryBudget] = None,
+        retry_if_empty: bool = False,
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.retry_if_empty = retry_if_empty
+
+    async def arun(
+        self, queries: list[str], fetch: Callable[[str], Awaitable[Any]]
+    ) -> BatchResult:
+        outcomes = await asyncio.gather(
+            *[self._arun_one(query, fetch) for query in queries]
+        )
+
+        batch = BatchResult()
+        for query, (result, error) in zip(queries, outcomes):
+            if error is not None:
+                batch.failures[query] = error
+            else:
+                batch.results[query] = result
+        return batch
+
+    async def _arun_one(
+        self, query: str, fetch: Callable[[str], Awaitable[Any]]
+    ) -> tuple[Any, Optional[BaseException]]:
+        self.budget.record_attempt()
+        result, error = None, None
+        for attempt in range(self.attempts):
+            if attempt > 0:
+                if not self.budget.try_spend():
+                    logger.warning(f"Retry budget exhausted, giving up on: {query}")
+                    break
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+            started = time.monotonic()
+            try:
+                result, error = await fetch(query), None
+            except Exception as e:
+                result, error = None, e
+                logger.warning(
+                    f"Attempt {attempt + 1}/{self.attempts} failed for {query} "
+                    f"after {time.monotonic() - started:.2f}s: {type(e).__name__} {str(e)}"
+                )
+                continue
+
+            if result or not self.retry_if_empty:
+                break
+            logger.debug(f"Empty result for {query} (attempt {attempt + 1})")
+
+        return result, error
+
+
+# 캐시 키를 만들 때 제거하는, 페이지 내용과 무관한 추적용 query parameter.
+TRACKING_QUERY_PARAMS = ("utm_", "fbclid", "gclid", "igshid", "mc_cid", "mc_eid")
+
+
+def canonicalize_url(url: str) -> str:
+    """같은 페이지를 가리키는 URL이 같은 문자열이 되도록 정규화.
 
+    scheme/host 소문자화, 기본 port와 fragment 제거, 추적용 query 제거 및 query 정렬.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
 
-def retry_on_api_empty():
-    return retry(
-        retry=retry_if_result(is_result_empty),  # 결과값이 비었을 경우에만 재시도.
-        stop=stop_after_attempt(2),  # 최대 2번 실행.
-        retry_error_callback=lambda future: None,  # 최종 실패 시, None 반환.
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_QUERY_PARAMS)
     )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
@@ -0,0 +1,184 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from estalan.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CPU_POOL_MAX_WORKERS = int(os.getenv("CPU_POOL_MAX_WORKERS", os.cpu_count() or 1))
+CPU_POOL_TIMEOUT = float(os.getenv("CPU_POOL_TIMEOUT", 30))
+
+
+class CPUWorkerPool:
+    """HTML 정제처럼 CPU를 많이 쓰는 작업을 event loop 밖의 process에서 실행하는 pool.
+
+    - 동시에 제출할 수 있는 작업 수를 `max_pending`으로 제한하고, 넘치면 자리가 날 때까지 대기.
+      자리는 worker process의 작업이 실제로 끝나야 반납한다. (timeout으로 기다림을 멈춰도 process는 계속 실행 중)
+    - 작업마다 `timeout`을 적용하며, 초과 시 `TimeoutError`를 발생시키고 멈춘 process를 종료하기 위해
+      pool을 새로 만든다. 이때 같은 pool에서 실행 중이던 다른 작업은 새 pool에서 한 번 다시 실행한다.
+    - process pool은 처음 사용할 때 생성한다. (`spawn` 방식으로 event loop/thread 상태를 물려받지 않음)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = CPU_POOL_MAX_WORKERS,
+        max_pending: Optional[int] = None,
+        timeout: float = CPU_POOL_TIMEOUT,
+    ):
+        self.max_workers = max(max_workers, 1)
+        self.max_pending = max_pending or self.max_workers * 4
+        self.timeout = timeout
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "recycles": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "queue_wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    def _ensure_started(self) -> None:
+        # semaphore는 event loop에 묶이므로 loop가 바뀌면 새로 만듦.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(f"Starting CPU worker pool with {self.max_workers} processes")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(
+        self, fn: Callable[..., Any], args: tuple
+    ) -> tuple[ProcessPoolExecutor, Future]:
+        """자리를 얻은 뒤 작업을 제출. 자리는 작업이 끝나는 시점(완료, 실패, 취소, process 종료)에 반납."""
+        loop, semaphore = self._loop, self._semaphore
+        queued_at = time.perf_counter()
+        await semaphore.acquire()
+        submitted_at = time.perf_counter()
+        self.stats["queue_wait_seconds"] += submitted_at - queued_at
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(
+            self.stats["peak_in_flight"], self.stats["in_flight"]
+        )
+
+        def finish() -> None:
+            self.stats["in_flight"] -= 1
+            self.stats["run_seconds"] += time.perf_counter() - submitted_at
+            semaphore.release()
+
+        try:
+            executor = self._get_executor()
+            future = executor.submit(fn, *args)
+        except BaseException:
+            finish()
+            raise
+
+        def release(_: Future) -> None:
+            # executor의 관리 thread에서 호출될 수 있으므로 loop thread에서 반납.
+            try:
+                loop.call_soon_threadsafe(finish)
+            except RuntimeError:
+                # loop가 이미 닫힌 경우.
+                pass
+
+        future.add_done_callback(release)
+        return executor, future
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """timeout된 작업이 실행 중인 process를 종료하고, 다음 작업부터 새 pool을 사용."""
+        if executor is not self._executor:
+            # 다른 작업의 timeout으로 이미 교체됨.
+            return
+
+        logger.warning("Recycling CPU worker pool after a timed out job")
+        self.stats["recycles"] += 1
+        self._executor = None
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    async def run(
+        self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None
+    ) -> Any:
+        """`fn(*args)`를 worker process에서 실행하고 결과를 기다림. `fn`과 인자는 pickle 가능해야 함."""
+        self._ensure_started()
+
+        self.stats["submitted"] += 1
+        retried = False
+        try:
+            while True:
+                executor, future = await self._submit(fn, args)
+                try:
+                    result = await asyncio.wait_for(
+                        asyncio.wrap_future(future), timeout or self.timeout
+                    )
+                except BrokenProcessPool:
+                    if executor is self._executor:
+                        # worker process가 비정상 종료됨. 다음 작업부터 새 pool을 사용.
+                        self._executor = None
+                        raise
+                    # 다른 작업의 timeout으로 pool이 교체되면서 함께 종료된 경우 새 pool에서 한 번 다시 실행.
+                    if retried:
+                        raise
+                    retried = True
+                    continue
+
+                self.stats["completed"] += 1
+                return result
+
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning(f"CPU job {getattr(fn, '__name__', fn)} timed out")
+            self._recycle(executor)
+            raise
+
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"CPU job {getattr(fn, '__name__', fn)} failed: {str(e)}")
+            raise
+
+    def metrics(self) -> dict[str, Any]:
+        finished = (
+            self.stats["completed"] + self.stats["failed"] + self.stats["timeouts"]
+        )
+        return {
+            **self.stats,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "avg_queue_wait_seconds": (
+                self.stats["queue_wait_seconds"] / self.stats["submitted"]
+                if self.stats["submitted"]
+                else 0.0
+            ),
+            "avg_run_seconds": (
+                self.stats["run_seconds"] / finished if finished else 0.0
+            ),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            logger.info(f"Shutting down CPU worker pool: {self.metrics()}")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+cpu_pool = CPUWorkerPool()
@@ -0,0 +1,359 @@
+import asyncio
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+from xml.sax.saxutils import unescape as unescape_xml
+
+import httpx
+
+from estalan.logging_config import get_logger
+from estalan.tools.http_client import get_http_client
+from estalan.tools.kv_cache import KVCache
+from estalan.tools.singleflight import (
+    JSON_CODEC,
+    FlightCodec,
+    SingleFlight,
+    singleflight,
+)
+
+try:
+    from youtube_transcript_api import YouTubeTranscriptApi
+except ImportError:  # 없으면 RapidAPI 자막만 사용.
+    YouTubeTranscriptApi = None
+
+logger = get_logger(__name__)
+
+LANGUAGE_CODES = os.getenv("YOUTUBE_TRANSCRIPT_LANGUAGES", "ko,en").split(",")
+# 설정하지 않으면 자막/자막 목록/검색 결과 캐시는 메모리에만 유지되어 process 재시작 시 사라진다.
+YOUTUBE_TRANSCRIPT_CACHE_PATH = os.getenv("YOUTUBE_TRANSCRIPT_CACHE_PATH")
+# 한 번 게시된 자막은 거의 바뀌지 않으므로 길게 보관.
+YOUTUBE_TRANSCRIPT_TTL = float(os.getenv("YOUTUBE_TRANSCRIPT_TTL", 30 * 24 * 3600))
+YOUTUBE_SUBTITLE_LIST_TTL = float(os.getenv("YOUTUBE_SUBTITLE_LIST_TTL", 24 * 3600))
+YOUTUBE_SEARCH_TTL = float(os.getenv("YOUTUBE_SEARCH_TTL", 3600))
+CLIENT_TIMEOUT = 10  # seconds
+
+
+class TranscriptUnavailableError(LookupError):
+    pass
+
+
+@dataclass(slots=True)
+class Transcript:
+    video_id: str
+    language: str
+    text: str
+
+
+def parse_transcript_xml(xml_content: str) -> Optional[str]:
+    """RapidAPI가 돌려주는 자막 XML에서 텍스트만 추출."""
+    try:
+        root = ET.fromstring(xml_content)
+    except ET.ParseError as e:
+        logger.error(f"XML parsing error: {e}")
+        return None
+
+    texts = []
+    for text_element in root.findall(".//text"):
+        content = text_element.text
+        if content:
+            content = unescape_xml(content, {"&quot;": '"'})
+            content = re.sub(r"\[.*?\]", "", content).strip()
+
+            if content:
+                texts.append(content)
+
+    return " ".join(texts)
+
+
+TRANSCRIPT_CODEC = FlightCodec(
+    encode=lambda transcript: json.dumps(asdict(transcript), ensure_ascii=False),
+    decode=lambda encoded: Transcript(**json.loads(encoded)),
+)
+
+
+def _proxies() -> Optional[dict[str, str]]:
+    if not all(
+        os.getenv(name)
+        for name in ("PROXY_ID", "PROXY_PASSWORD", "PROXY_HOST", "PROXY_PORT")
+    ):
+        return None
+
+    auth = f"{os.environ['PROXY_ID']}:{os.environ['PROXY_PASSWORD']}"
+    address = f"{os.environ['PROXY_HOST']}:{os.environ['PROXY_PORT']}"
+    return {"http": f"http://{auth}@{address}", "https": f"https://{auth}@{address}"}
+
+
+def _rapidapi_headers(api_endpoint: str, api_key: str) -> dict[str, str]:
+    return {
+        "x-rapidapi-host": api_endpoint.replace("https://", ""),
+        "x-rapidapi-key": api_key,
+    }
+
+
+def _fetch_with_transcript_api(video_id: str, languages: list[str]) -> tuple[str, str]:
+    """youtube_transcript_api(동기, requests 기반)로 자막을 가져옴. thread에서 실행."""
+    transcript = YouTubeTranscriptApi.list_transcripts(
+        video_id, proxies=_proxies()
+    ).find_transcript(languages)
+    snippets = sorted(transcript.fetch(), key=lambda x: x["start"])
+    text = "\n".join(snippet["text"].strip() for snippet in snippets)
+    return transcript.language_code, text
+
+
+class TranscriptService:
+    """YouTube 자막을 event loop를 막지 않고 가져오는 서비스.
+
+    - 자막은 (video_id, language) 단위로, RapidAPI 자막 목록은 video_id 단위로 각각의 `KVCache`에 캐시.
+      캐시는 메모리에만 유지되며, `YOUTUBE_TRANSCRIPT_CACHE_PATH`를 설정했을 때만 SQLite에 저장된다.
+    - 같은 영상에 대한 동시 요청은 `flight`로 하나의 fetch로 합친다.
+    - youtube_transcript_api를 thread에서 먼저 시도하고, 실패하면 RapidAPI 자막을 사용.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[KVCache[str]] = None,
+        languages: Optional[list[str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        flight: Optional[SingleFlight] = None,
+        subtitle_cache: Optional[KVCache[list[dict[str, Any]]]] = None,
+    ):
+        self.cache = cache or KVCache(
+            "youtube_transcript",
+            YOUTUBE_TRANSCRIPT_CACHE_PATH,
+            ttl=YOUTUBE_TRANSCRIPT_TTL,
+        )
+        self.subtitle_cache = subtitle_cache or KVCache(
+            "youtube_subtitles",
+            YOUTUBE_TRANSCRIPT_CACHE_PATH,
+            ttl=YOUTUBE_SUBTITLE_LIST_TTL,
+        )
+        self.languages = languages or LANGUAGE_CODES
+        self.client = client
+        self.flight = flight or singleflight
+        self.stats = {
+            "cache_hits": 0,
+            "transcript_api_fetches": 0,
+            "rapidapi_fetches": 0,
+            "failures": 0,
+        }
+
+    @staticmethod
+    def transcript_key(video_id: str, language: str) -> str:
+        return f"{video_id}:{language}"
+
+    async def aget_transcript(self, video_id: str) -> Transcript:
+        """선호 언어 순서대로 자막을 찾음. 없으면 `TranscriptUnavailableError`."""
+        if (cached := await self._aget_cached(video_id)) is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        return await self.flight.do(
+            f"transcript:{video_id}:{','.join(self.languages)}",
+            lambda: self._afetch(video_id),
+            TRANSCRIPT_CODEC,
+        )
+
+    async def _aget_cached(self, video_id: str) -> Optional[Transcript]:
+        for language in self.languages:
+            text = await self.cache.aget(self.transcript_key(video_id, language))
+            if text is not None:
+                return Transcript(video_id, language, text)
+        return None
+
+    async def _afetch(self, video_id: str) -> Transcript:
+        transcript = None
+        if YouTubeTranscriptApi is not None:
+            try:
+                language, text = await asyncio.to_thread(
+                    _fetch_with_transcript_api, video_id, self.languages
+                )
+                self.stats["transcript_api_fetches"] += 1
+                transcript = Transcript(video_id, language, text)
+            except Exception as e:
+                logger.warning(
+                    f"Error fetching YouTube script via YouTubeTranscriptApi: {e}"
+                )
+
+        if transcript is None:
+            transcript = await self._afetch_from_rapidapi(video_id)
+
+        if transcript is None or not transcript.text:
+            self.stats["failures"] += 1
+            raise TranscriptUnavailableError(video_id)
+
+        await self.cache.aput(
+            self.transcript_key(video_id, transcript.language), transcript.text
+        )
+        return transcript
+
+    async def _afetch_from_rapidapi(self, video_id: str) -> Optional[Transcript]:
+        rapid_api_endpoint = os.getenv("RAPID_API_ENDPOINT")
+        rapid_api_key = os.getenv("RAPID_API_KEY")
+        if not (rapid_api_endpoint and rapid_api_key):
+            logger.error("RAPID API key is not configured")
+            return None
+
+        try:
+            subtitles = await self._aget_subtitle_list(
+                self.client or get_http_client("api"),
+                video_id,
+                rapid_api_endpoint,
+                rapid_api_key,
+            )
+
+            urls_map = {st["languageCode"]: st["url"] for st in subtitles}
+            language = next((lc for lc in self.languages if lc in urls_map), None)
+            if language is None:
+                logger.info(f"No matching subtitles for video {video_id}")
+                return None
+
+            client = self.client or get_http_client()
+            resp = await client.get(urls_map[language], timeout=CLIENT_TIMEOUT)
+            resp.raise_for_status()
+            self.stats["rapidapi_fetches"] += 1
+            text = parse_transcript_xml(resp.text.strip())
+            return Transcript(video_id, language, text) if text else None
+
+        except Exception as e:
+            logger.error(f"Failed to fetch YouTube script: {e}")
+            return None
+
+    async def _aget_subtitle_list(
+        self,
+        client: httpx.AsyncClient,
+        video_id: str,
+        rapid_api_endpoint: str,
+        rapid_api_key: str,
+    ) -> list[dict[str, Any]]:
+        if (subtitles := await self.subtitle_cache.aget(video_id)) is not None:
+            return subtitles
+
+        resp = await client.get(
+            f"{rapid_api_endpoint}/subtitles",
+            params={"id": video_id},
+            headers=_rapidapi_headers(rapid_api_endpoint, rapid_api_key),
+            timeout=CLIENT_TIMEOUT,
+        )
+        resp.raise_for_status()
+        subtitles = resp.json().get("subtitles", [])
+
+        await self.subtitle_cache.aput(video_id, subtitles)
+        return subtitles
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            **self.stats,
+            "cache": self.cache.metrics(),
+            "subtitle_cache": self.subtitle_cache.metrics(),
+            "singleflight": self.flight.metrics().get("transcript", {}),
+        }
+
+
+transcript_service = TranscriptService()
+youtube_search_cache: KVCache[list[dict[str, Any]]] = KVCache(
+    "youtube_search", YOUTUBE_TRANSCRIPT_CACHE_PATH, ttl=YOUTUBE_SEARCH_TTL
+)
+
+
+def parse_search_results(data: dict[str, Any]) -> list[dict[str, Any]]:
+    """RapidAPI 검색 응답에서 영상만 골라 tool 결과 형식으로 변환."""
+    videos = []
+    for item in data.get("data", []):
+        if item.get("type") != "video" or not item.get("videoId"):
+            continue
+
+        thumbnails = item.get("thumbnail") or [{}]
+        videos.append(
+            {
+                "video_id": item["videoId"],
+                "title": item.get("title"),
+                "url": f"https://www.youtube.com/watch?v={item['videoId']}",
+                "channel": item.get("channelTitle"),
+                "description": item.get("description"),
+                "thumbnail": thumbnails[-1].get("url"),
+                "duration": item.get("lengthText"),
+                "view_count": item.get("viewCount"),
+                "published": item.get("publishedTimeText"),
+            }
+        )
+    return videos
+
+
+class YouTubeSearchClient:
+    """RapidAPI YouTube 검색을 공유 HTTP client로 비동기 호출.
+
+    - 검색 결과는 keyword별로 `youtube_search_cache`(자막과 별도 namespace, `YOUTUBE_SEARCH_TTL`)에 캐시하고,
+      같은 keyword의 동시 검색은 `flight`로 합친다.
+    - 여러 keyword는 동시에 검색하고, 끝나는 순서대로 `video_id` 기준으로 합친다.
+    """
+
+    def __init__(
+        self,
+        api_endpoint: str,
+        api_key: str,
+        cache: Optional[KVCache[list[dict[str, Any]]]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        flight: Optional[SingleFlight] = None,
+    ):
+        self.api_endpoint = api_endpoint.rstrip("/")
+        self.api_key = api_key
+        self.cache = cache or youtube_search_cache
+        self.client = client
+        self.flight = flight or singleflight
+
+    @staticmethod
+    def search_key(keyword: str) -> str:
+        return " ".join(keyword.lower().split())
+
+    async def asearch(self, keyword: str) -> list[dict[str, Any]]:
+        key = self.search_key(keyword)
+        if (videos := await self.cache.aget(key)) is not None:
+            return videos
+
+        async def fetch() -> list[dict[str, Any]]:
+            client = self.client or get_http_client("api")
+            resp = await client.get(
+                f"{self.api_endpoint}/search",
+                params={"query": keyword, "type": "video"},
+                headers=_rapidapi_headers(self.api_endpoint, self.api_key),
+                timeout=CLIENT_TIMEOUT,
+            )
+            resp.raise_for_status()
+            videos = parse_search_results(resp.json())
+            if videos:
+                await self.cache.aput(key, videos)
+            return videos
+
+        return await self.flight.do(f"youtube_search:{key}", fetch, JSON_CODEC)
+
+    async def asearch_all(
+        self, keywords: list[str], k: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """모든 keyword를 동시에 검색. keyword별 상위 `k`개를 keyword 순서대로 중복 없이 반환.
+
+        실패한 keyword는 건너뛴다.
+        """
+
+        async def search(index: int, keyword: str):
+            return index, await self.asearch(keyword)
+
+        # video_id -> (keyword 순서, keyword 안의 순위, 영상)
+        merged: dict[str, tuple[int, int, dict[str, Any]]] = {}
+        for future in asyncio.as_completed(
+            [search(index, keyword) for index, keyword in enumerate(keywords)]
+        ):
+            try:
+                index, videos = await future
+            except Exception as e:
+                logger.warning(f"YouTube search failed: {str(e)}")
+                continue
+
+            for rank, video in enumerate(videos[:k]):
+                current = merged.get(video["video_id"])
+                if current is None or (index, rank) < current[:2]:
+                    merged[video["video_id"]] = (index, rank, video)
+
+        return [video for _, _, video in sorted(merged.values(), key=lambda x: x[:2])]
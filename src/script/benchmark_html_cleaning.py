@@ -0,0 +1,84 @@
+"""
+HTML 정제 경로별 페이지당 CPU 시간과 최대 메모리 사용량을 비교하는 스크립트.
+
+- legacy: BeautifulSoup(lxml)로 stylesheet 제거 후 문자열로 직렬화 -> readability가 다시 parse
+          -> markdownify, 제목은 BeautifulSoup(html.parser)로 별도 parse
+- single_parse: estalan.tools.html_pipeline.clean_html (lxml tree 하나로 전체 처리)
+
+legacy 경로는 readability-lxml, markdownify가 설치되어 있어야 측정됨.
+
+사용법: python -m script.benchmark_html_cleaning page1.html page2.html [--runs 5]
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from estalan.tools.html_pipeline import clean_html
+
+
+def legacy_clean(html_text: str) -> str:
+    from markdownify import markdownify
+    from readability import Document
+
+    soup = BeautifulSoup(html_text, "lxml")
+    for node in soup.select("style, link[rel=stylesheet]"):
+        node.decompose()
+    plain_content = Document(str(soup)).summary()
+
+    BeautifulSoup(html_text, "html.parser").find("title")
+    return markdownify(plain_content, strip=["a", "img"], heading_style="ATX")
+
+
+def single_parse_clean(html_text: str) -> str:
+    return clean_html(html_text).markdown
+
+
+def measure(fn, htmls: list[str]) -> dict:
+    cpu_times, peaks = [], []
+    for html_text in htmls:
+        gc.collect()
+        tracemalloc.start()
+        started_at = time.process_time()
+        fn(html_text)
+        cpu_times.append(time.process_time() - started_at)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        "pages": len(htmls),
+        "mean_cpu_ms": statistics.mean(cpu_times) * 1000,
+        "p95_cpu_ms": sorted(cpu_times)[int(len(cpu_times) * 0.95)] * 1000,
+        "mean_peak_kib": statistics.mean(peaks) / 1024,
+        "max_peak_kib": max(peaks) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("html_paths", nargs="+")
+    parser.add_argument("--runs", type=int, default=3, help="페이지별 반복 횟수")
+    args = parser.parse_args()
+
+    htmls = []
+    for path in args.html_paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            htmls.append(f.read())
+    htmls *= args.runs
+
+    report = {"single_parse": measure(single_parse_clean, htmls)}
+    try:
+        report["legacy"] = measure(legacy_clean, htmls)
+    except ImportError as e:
+        report["legacy"] = {"error": f"skipped: {str(e)}"}
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
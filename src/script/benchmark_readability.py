@@ -0,0 +1,78 @@
+"""
+문서마다 Node를 띄우는 readabilipy 방식과 상시 실행 readability worker(sidecar)의 문서당 latency를 비교하는 스크립트.
+
+사용법: python -m script.benchmark_readability page1.html page2.html [--runs 5]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from readabilipy import simple_json_from_html_string
+
+from estalan.tools.readability_sidecar import ReadabilitySidecar
+
+
+def summarize(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "documents": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+    }
+
+
+def run_spawn(htmls: list[str]) -> list[float]:
+    latencies = []
+    for html in htmls:
+        started_at = time.perf_counter()
+        simple_json_from_html_string(html, use_readability=True)
+        latencies.append(time.perf_counter() - started_at)
+    return latencies
+
+
+async def run_sidecar(htmls: list[str]) -> tuple[list[float], dict]:
+    sidecar = ReadabilitySidecar(size=1)
+    if not sidecar.enabled:
+        raise SystemExit("node 또는 readability node_modules를 찾을 수 없습니다.")
+
+    try:
+        # worker 기동 시간은 문서당 latency에서 제외.
+        await sidecar.aextract("<html><body></body></html>")
+        latencies = []
+        for html in htmls:
+            started_at = time.perf_counter()
+            await sidecar.aextract(html)
+            latencies.append(time.perf_counter() - started_at)
+        return latencies, sidecar.metrics()
+    finally:
+        await sidecar.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("html_paths", nargs="+")
+    parser.add_argument("--runs", type=int, default=3, help="문서별 반복 횟수")
+    args = parser.parse_args()
+
+    htmls = []
+    for path in args.html_paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            htmls.append(f.read())
+    htmls *= args.runs
+
+    sidecar_latencies, sidecar_metrics = asyncio.run(run_sidecar(htmls))
+    report = {
+        "spawn_per_document": summarize(run_spawn(htmls)),
+        "sidecar": summarize(sidecar_latencies),
+        "sidecar_metrics": sidecar_metrics,
+    }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Serper 검색 -> 결과 페이지 fetch (-> RapidAPI 영상 검색) 흐름의 query당 latency와 처리량을 측정하는 스크립트.
+
+공유 HTTP client의 요청을 cassette로 기록해 두면 network와 API 비용 없이 같은 응답으로 반복 측정할 수 있다.
+
+- record: 실제 API를 호출하면서 응답을 cassette에 기록 (SERPER_API_KEY, RAPID_API_* 필요)
+- replay: cassette의 응답을 --latency 분포만큼 지연시켜 재생 (API key 불필요)
+
+사용법:
+  python -m script.benchmark_tools --cassette bench.json.gz --mode record "파이썬 asyncio" "서울 날씨"
+  python -m script.benchmark_tools --cassette bench.json.gz --latency lognormal:0.4,0.6 \\
+      --iterations 5 --concurrency 4 "파이썬 asyncio" "서울 날씨"
+
+url 모듈은 import 시 RAPID_API_ENDPOINT를 읽으므로 replay에서도 해당 환경 변수는 설정되어 있어야 한다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from estalan.tools.cassette import RECORD, REPLAY, use_cassette
+from estalan.tools.http_client import http_clients
+from estalan.tools.search import (
+    GoogleSerperSearchResult,
+    RapidYoutubeSearchResult,
+    search_cache,
+)
+from estalan.tools.url import ContentFetcher
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "queries": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+        "throughput_qps": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+async def run_query(
+    query: str,
+    search_tool: GoogleSerperSearchResult,
+    fetcher: ContentFetcher,
+    video_tool: RapidYoutubeSearchResult | None,
+    pages: int,
+) -> tuple[float, dict]:
+    started_at = time.perf_counter()
+    results = await search_tool._arun(query=[query])
+    links = [result["metadata"]["source"] for result in results[:pages]]
+    tasks = [fetcher.fetch_content(link, {"Accept": "text/*"}) for link in links]
+    if video_tool is not None:
+        tasks.append(video_tool._arun(query=[query]))
+    outputs = await asyncio.gather(*tasks, return_exceptions=True)
+
+    failed_pages = sum(
+        1
+        for doc in outputs[: len(links)]
+        if isinstance(doc, BaseException) or "error" in doc.metadata
+    )
+    return time.perf_counter() - started_at, {
+        "results": len(results),
+        "pages": len(links),
+        "failed_pages": failed_pages,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.cold:
+        # 반복 실행에서도 Serper를 매번 호출하도록 검색 캐시를 사용하지 않음.
+        search_cache.ttls = {
+            search_type: (0.0, 0.0) for search_type in search_cache.ttls
+        }
+
+    search_tool = GoogleSerperSearchResult.from_api_key(
+        os.getenv("SERPER_API_KEY", "replay"), k=args.k
+    )
+    video_tool = None
+    if args.video:
+        video_tool = RapidYoutubeSearchResult.from_api_key(
+            os.getenv("RAPID_API_KEY", "replay"), os.environ["RAPID_API_ENDPOINT"]
+        )
+    fetcher = ContentFetcher()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def measure(query: str) -> tuple[float, dict]:
+        async with semaphore:
+            return await run_query(query, search_tool, fetcher, video_tool, args.pages)
+
+    iterations = 1 if args.mode == RECORD else args.iterations
+    latencies, details = [], []
+    with use_cassette(
+        args.cassette, mode=args.mode, latency=args.latency, seed=args.seed
+    ) as cassette:
+        started_at = time.perf_counter()
+        for _ in range(iterations):
+            cassette.rewind()
+            for latency, detail in await asyncio.gather(
+                *[measure(query) for query in args.queries]
+            ):
+                latencies.append(latency)
+                details.append(detail)
+        elapsed = time.perf_counter() - started_at
+
+        report = {
+            "mode": args.mode,
+            "latency_model": args.latency,
+            "summary": summarize(latencies, elapsed),
+            "failed_pages": sum(detail["failed_pages"] for detail in details),
+            "cassette": cassette.stats,
+            "search_cache": search_cache.metrics(),
+            "http_clients": http_clients.metrics_report(),
+        }
+
+    await http_clients.aclose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument(
+        "--cassette", required=True, help="cassette 파일 경로 (.json.gz)"
+    )
+    parser.add_argument("--mode", choices=[RECORD, REPLAY], default=REPLAY)
+    parser.add_argument(
+        "--latency",
+        default="recorded",
+        help="replay 지연: recorded[:배율], none, fixed:<초>, lognormal:<중앙값>,<sigma>",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="latency 분포의 seed")
+    parser.add_argument("--iterations", type=int, default=3, help="replay 반복 횟수")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="동시에 처리할 query 수"
+    )
+    parser.add_argument(
+        "--pages", type=int, default=3, help="query당 가져올 결과 페이지 수"
+    )
+    parser.add_argument("-k", type=int, default=5, help="Serper 검색 결과 수")
+    parser.add_argument("--video", action="store_true", help="RapidAPI 영상 검색 포함")
+    parser.add_argument("--cold", action="store_true", help="검색 캐시를 사용하지 않음")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+lxml 정제 방식(clean_html)의 결과를 이전 방식(readability-lxml + markdownify)의 결과와 비교하는 스크립트.
+
+clean_html(HTML_PIPELINE 기본값)을 수정할 때 대표 페이지 모음에서 본문 누락(recall)과
+본문이 아닌 내용의 혼입(precision)이 기준 안에 있는지 확인하는 용도.
+
+- 각 `<name>.html` 옆의 `<name>.md`를 이전 방식의 결과(golden output)로 사용
+- --update-golden: 이전 방식으로 golden output을 다시 생성 (readability-lxml, markdownify 필요)
+
+사용법:
+  python -m script.compare_html_pipelines tests/test_estalan/test_tools/html_corpus
+  python -m script.compare_html_pipelines pages/ --update-golden
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+from estalan.tools.html_pipeline import clean_html, compare_markdown, legacy_clean_html
+
+MIN_RECALL = 0.9
+MIN_PRECISION = 0.85
+
+
+def golden_path(html_path: str) -> str:
+    return os.path.splitext(html_path)[0] + ".md"
+
+
+def compare_page(html_path: str, update_golden: bool = False) -> dict:
+    with open(html_path, encoding="utf-8", errors="replace") as f:
+        html_text = f.read()
+
+    if update_golden:
+        with open(golden_path(html_path), "w", encoding="utf-8") as f:
+            f.write(legacy_clean_html(html_text).markdown + "\n")
+
+    with open(golden_path(html_path), encoding="utf-8") as f:
+        expected = f.read()
+    return compare_markdown(expected, clean_html(html_text).markdown)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "corpus", help="HTML 페이지와 golden output(.md)이 있는 디렉터리"
+    )
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--min-recall", type=float, default=MIN_RECALL)
+    parser.add_argument("--min-precision", type=float, default=MIN_PRECISION)
+    args = parser.parse_args()
+
+    report = {}
+    for html_path in sorted(glob.glob(os.path.join(args.corpus, "*.html"))):
+        scores = compare_page(html_path, args.update_golden)
+        scores["passed"] = (
+            scores["recall"] >= args.min_recall
+            and scores["precision"] >= args.min_precision
+        )
+        report[os.path.basename(html_path)] = scores
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not all(scores["passed"] for scores in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
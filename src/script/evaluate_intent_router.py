@@ -0,0 +1,66 @@
+"""
+로그로 남긴 대화 턴(JSONL)으로 IntentRouter를 학습/평가하는 스크립트.
+
+로그 형식: {"text": "사용자 질문", "used_tools": ["search_web"], "latency": 3.2}
+- used_tools가 비어 있으면 tool 없이 답변 가능한 턴("chat")으로 간주.
+- latency(초)가 있으면 경로별 평균 latency로 routing된 턴당 절약 시간을 추정.
+
+사용법: python -m script.evaluate_intent_router logs/turns.jsonl [--train] [--test-ratio 0.2]
+--train은 scikit-learn이 필요함. (pip install "est-alan[router]")
+"""
+
+import argparse
+import json
+import random
+import time
+
+from estalan.core.router import IntentRouter, load_logged_turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log_path")
+    parser.add_argument("--train", action="store_true", help="hashing 분류기 학습 여부")
+    parser.add_argument("--test-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    texts, labels = load_logged_turns(args.log_path)
+    samples = list(zip(texts, labels))
+    random.Random(args.seed).shuffle(samples)
+
+    split = int(len(samples) * (1 - args.test_ratio))
+    train, test = samples[:split], samples[split:]
+
+    if not test:
+        raise SystemExit(
+            f"test split이 비어 있습니다. (샘플 {len(samples)}개, --test-ratio {args.test_ratio})"
+        )
+    if args.train and not train:
+        raise SystemExit("train split이 비어 있습니다. --test-ratio를 줄여주세요.")
+
+    router = IntentRouter()
+    if args.train:
+        router.fit(*map(list, zip(*train)))
+
+    test_texts, test_labels = map(list, zip(*test))
+    started_at = time.perf_counter()
+    report = router.evaluate(test_texts, test_labels)
+    report["router_overhead_ms"] = (
+        (time.perf_counter() - started_at) / len(test_texts) * 1000
+    )
+
+    with open(args.log_path, encoding="utf-8") as f:
+        turns = [json.loads(line) for line in f if line.strip()]
+    for turn in turns:
+        if "latency" in turn:
+            router.record_latency(
+                "tools" if turn.get("used_tools") else "chat", turn["latency"]
+            )
+    report.update(router.latency_report())
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fireworks")
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+from estalan.core import llm as llm_module  # noqa: E402
+from estalan.core.llm import DeepSeekR1_Continue  # noqa: E402
+
+
+def make_llm() -> DeepSeekR1_Continue:
+    return DeepSeekR1_Continue(
+        model="test-model", fireworks_api_key="key", base_url="http://localhost:1"
+    )
+
+
+def count_rendered(monkeypatch) -> list[str]:
+    rendered = []
+    convert = llm_module._convert_message_to_text
+
+    def counting_convert(message):
+        rendered.append(message.content)
+        return convert(message)
+
+    monkeypatch.setattr(llm_module, "_convert_message_to_text", counting_convert)
+    return rendered
+
+
+def test_async_client_is_pooled_per_event_loop():
+    """같은 event loop에서는 async client를 공유하고, 다른 loop에서는 새로 만드는지 테스트"""
+    llm = make_llm()
+
+    async def get_clients():
+        return llm._aclient(), llm._aclient()
+
+    first, same_loop = asyncio.run(get_clients())
+    second, _ = asyncio.run(get_clients())
+
+    assert first is same_loop
+    assert first is not second
+
+
+def test_render_reuses_prefix_for_appended_messages(monkeypatch):
+    """메시지가 뒤에 추가된 턴에서는 이전에 렌더링한 메시지를 다시 변환하지 않는지 테스트"""
+    llm = make_llm()
+    rendered = count_rendered(monkeypatch)
+    turn = [HumanMessage(content="질문", id="1"), AIMessage(content="답변", id="2")]
+
+    first = llm._render_messages(turn)
+    rendered.clear()
+    turn = [*turn, HumanMessage(content="다음 질문", id="3")]
+    second = llm._render_messages(turn)
+
+    assert first == "User: 질문\n\nAssistant: 답변"
+    assert second == "User: 질문\n\nAssistant: 답변\n\nUser: 다음 질문"
+    assert rendered == ["답변", "다음 질문"]
+
+
+def test_render_cache_is_invalidated_by_edits_and_removals(monkeypatch):
+    """앞의 메시지가 (같은 id로) 수정되거나 삭제되면 캐시를 쓰지 않고 다시 렌더링하는지 테스트"""
+    llm = make_llm()
+    history = [
+        HumanMessage(content="질문", id="1"),
+        AIMessage(content="초안", id="2"),
+        HumanMessage(content="계속", id="3"),
+    ]
+    llm._render_messages([*history, AIMessage(content="", id="4")])
+
+    history[1].content = "수정된 답변"
+    edited = llm._render_messages([*history, AIMessage(content="", id="4")])
+    removed = llm._render_messages([history[0], history[2], AIMessage(content="")])
+
+    assert "초안" not in edited and "수정된 답변" in edited
+    assert removed == "User: 질문\n\nUser: 계속\n\nAssistant: "
@@ -0,0 +1,60 @@
+import pytest
+
+node = pytest.importorskip("estalan.core.node")
+
+from langchain_core.language_models.fake_chat_models import (  # noqa: E402
+    GenericFakeChatModel,
+)
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+)  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+
+
+@tool
+def search_web(query: list[str]) -> str:
+    """웹 검색"""
+    return ""
+
+
+def json_tool_llm(output: str) -> "node.JsonToolCallingLLM":
+    return node.JsonToolCallingLLM(
+        llm=GenericFakeChatModel(messages=iter([AIMessage(content=output)])),
+        tools=[search_web],
+    )
+
+
+def test_known_tool_call_is_returned():
+    """등록된 tool의 JSON tool call은 tool_calls로 변환되는지 테스트"""
+    llm = json_tool_llm(
+        '{"tool_calls": [{"name": "search_web", "args": {"query": ["날씨"]}}]}'
+    )
+    result = llm.invoke([HumanMessage(content="날씨 알려줘")])
+
+    assert [call["name"] for call in result.tool_calls] == ["search_web"]
+    assert result.content == ""
+
+
+def test_unknown_tool_call_falls_back_to_text():
+    """없는 tool 이름만 호출하면 빈 답변 대신 모델 출력을 그대로 답변으로 보내는지 테스트"""
+    output = '{"tool_calls": [{"name": "book_flight", "args": {"to": "제주"}}]}'
+    result = json_tool_llm(output).invoke([HumanMessage(content="제주 가는 비행기")])
+
+    assert not result.tool_calls
+    assert result.content == output
+
+
+def test_content_block_chunks_are_concatenated():
+    """content block list로 stream되는 chunk에서 text block만 합치는지 테스트"""
+    chunk = AIMessageChunk(
+        content=[
+            {"type": "text", "text": "안녕"},
+            {"type": "tool_use", "id": "x", "name": "a", "input": {}},
+            "하세요",
+        ]
+    )
+
+    assert node.JsonToolCallingLLM._chunk_text(chunk) == "안녕하세요"
+    assert node.JsonToolCallingLLM._chunk_text(AIMessageChunk(content="")) == ""
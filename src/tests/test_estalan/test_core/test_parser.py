@@ -0,0 +1,63 @@
+from estalan.core.parser import JsonToolCallStreamParser
+
+
+def feed_all(parser, chunks):
+    return "".join(parser.feed(chunk) for chunk in chunks)
+
+
+def test_plain_answer_is_streamed():
+    """일반 답변은 chunk 단위로 바로 흘려보내는지 테스트"""
+    parser = JsonToolCallStreamParser()
+
+    assert parser.feed("안녕") == "안녕"
+    assert parser.feed("하세요") == "하세요"
+    assert parser.finalize() == ([], "")
+
+
+def test_fenced_tool_call_is_parsed():
+    """```tool_calls 블록이 쪼개져서 들어와도 tool call로 파싱되는지 테스트"""
+    parser = JsonToolCallStreamParser()
+    chunks = [
+        "``",
+        "`tool_",
+        'calls\n{"tool_calls": [{"name": "search_web", ',
+        '"args": {"query": ["날씨"]}}]}\n```',
+    ]
+
+    assert feed_all(parser, chunks) == ""
+    assert parser.finalize() == (
+        [{"name": "search_web", "args": {"query": ["날씨"]}}],
+        "",
+    )
+
+
+def test_raw_json_tool_call_is_parsed():
+    """fence 없이 JSON만 출력한 경우도 tool call로 파싱되는지 테스트"""
+    parser = JsonToolCallStreamParser()
+
+    assert parser.feed('  {"tool_calls": [{"name": "search_news"}]}') == ""
+    assert parser.finalize() == ([{"name": "search_news", "args": {}}], "")
+
+
+def test_json_answer_is_streamed():
+    """tool_calls key가 아닌 ```json 코드 블록이나 JSON 답변은 판단 즉시 stream되는지 테스트"""
+    parser = JsonToolCallStreamParser()
+
+    assert parser.feed("```json\n") == ""
+    assert parser.feed('{"a"') == '```json\n{"a"'
+    assert parser.feed(": 1}\n```") == ": 1}\n```"
+    assert parser.finalize() == ([], "")
+
+    parser = JsonToolCallStreamParser()
+    assert parser.feed('{ "tool') == ""
+    assert parser.feed('_calls": [{"name": "search_web"}]}') == ""
+    assert parser.finalize() == ([{"name": "search_web", "args": {}}], "")
+
+
+def test_backticks_not_matching_fence_are_answer():
+    """fence가 아닌 코드 블록으로 시작하는 답변은 판단 즉시 stream되는지 테스트"""
+    parser = JsonToolCallStreamParser()
+
+    assert parser.feed("``") == ""
+    assert parser.feed("`python\nprint(1)") == "```python\nprint(1)"
+    assert parser.finalize() == ([], "")
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from estalan.core.router import IntentRouter, load_logged_turns
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["안녕하세요!", "고마워요 ㅎㅎ", "네", "더 쉽게 설명해줘", "thanks!"],
+)
+def test_route_chit_chat(text):
+    """인사, 감사, 재요청은 chat 경로로 routing되는지 테스트"""
+    assert IntentRouter().route(text) == "chat"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "오늘 서울 날씨 어때?",
+        "https://example.com 요약해줘",
+        "안녕하세요, 최신 AI 뉴스 알려줘",
+        "네이버에 대해 설명해줘",
+        "",
+    ],
+)
+def test_route_tool_turns(text):
+    """tool이 필요하거나 애매한 질문은 tools 경로로 routing되는지 테스트"""
+    assert IntentRouter().route(text) == "tools"
+
+
+def test_evaluate_precision_recall():
+    """held-out set에 대한 precision/recall 계산 테스트"""
+    router = IntentRouter()
+    report = router.evaluate(
+        ["안녕", "고마워", "파이썬 설명해줘", "오늘 뉴스"],
+        ["chat", "chat", "chat", "tools"],
+    )
+
+    assert report["precision"] == 1.0
+    assert report["recall"] == pytest.approx(2 / 3)
+    assert report["support"] == 4
+
+
+def test_latency_report():
+    """경로별 평균 latency와 절약된 latency 계산 테스트"""
+    router = IntentRouter()
+    assert router.latency_report()["saved_per_routed_turn"] is None
+
+    router.record_latency("tools", 3.0)
+    router.record_latency("tools", 5.0)
+    router.record_latency("chat", 1.0)
+
+    assert router.latency_report() == {
+        "chat": 1.0,
+        "tools": 4.0,
+        "saved_per_routed_turn": 3.0,
+    }
+
+
+def test_load_logged_turns(tmp_path):
+    """로그 JSONL에서 학습 데이터를 읽는지 테스트"""
+    path = tmp_path / "turns.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps(turn, ensure_ascii=False)
+            for turn in [
+                {"text": "안녕", "used_tools": []},
+                {"text": "오늘 뉴스", "used_tools": ["search_news"]},
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    assert load_logged_turns(str(path)) == (["안녕", "오늘 뉴스"], ["chat", "tools"])
+
+
+def test_latency_window_is_bounded():
+    """경로별로 최근 latency_window개의 latency만 유지하는지 테스트"""
+    router = IntentRouter(latency_window=2)
+    for seconds in (10.0, 2.0, 4.0):
+        router.record_latency("tools", seconds)
+
+    assert router.latency_report()["tools"] == 3.0
+
+
+def test_fit_with_single_route_uses_rules():
+    """로그에 한 가지 경로만 있으면 분류기 없이 규칙으로 routing하는지 테스트"""
+    router = IntentRouter().fit(["오늘 뉴스", "환율 알려줘"], ["tools", "tools"])
+
+    assert router.classifier is None
+    assert router.route("안녕하세요") == "chat"
+    assert router.route("파이썬 설명해줘") == "tools"
@@ -0,0 +1,92 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from estalan.tools.cassette import REPLAY, use_cassette
+
+# `HTTP_CASSETTE_MODE=record`로 실행하면 실제 API 응답을 cassettes/<이름>.json.gz에 기록.
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+
+PAGES = {
+    "/": (b"ok", "text/plain"),
+    "/article": (
+        "<html><head><title>테스트 &amp; 제목</title></head><body>본문</body></html>".encode(
+            "utf-8"
+        ),
+        "text/html; charset=utf-8",
+    ),
+}
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+                return
+
+            body = b"<html><head><title>etag</title></head></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/article")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body, content_type = PAGES.get(self.path, (b"", "text/plain"))
+        self.send_response(200 if self.path in PAGES else 404)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    server.paths = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def local_server(http_server):
+    return f"http://127.0.0.1:{http_server.server_address[1]}"
+
+
+@pytest.fixture
+def http_cassette():
+    """`with http_cassette("이름"):` 안의 공유 HTTP client 요청을 cassette로 재생(또는 기록)."""
+    mode = os.getenv("HTTP_CASSETTE_MODE", REPLAY)
+
+    def factory(name: str, latency: str = "none"):
+        path = CASSETTE_DIR / f"{name}.json.gz"
+        if mode == REPLAY and not path.exists():
+            pytest.skip(f"cassette not recorded: {path.name}")
+        return use_cassette(str(path), mode=mode, latency=latency)
+
+    return factory
@@ -0,0 +1,101 @@
+import gzip
+import statistics
+
+import httpx
+import pytest
+
+from estalan.tools.cassette import (
+    RECORD,
+    REPLAY,
+    Cassette,
+    CassetteMissError,
+    CassetteTransport,
+    LatencyModel,
+    use_cassette,
+)
+from estalan.tools.http_client import HTTPClientRegistry
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay(tmp_path):
+    """기록한 응답을 network 없이 순서대로 재생하고 API key는 저장하지 않는지 테스트"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(
+            200,
+            json={"organic": [{"link": "https://a.test", "n": len(calls)}]},
+            headers={"Set-Cookie": "session=1"},
+        )
+
+    path = str(tmp_path / "serper.json.gz")
+    cassette = Cassette(path)
+    transport = CassetteTransport(cassette, httpx.MockTransport(handler), RECORD)
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(2):
+            response = await client.post(
+                "https://google.serper.dev/search",
+                params={"q": "날씨", "num": 10},
+                headers={"X-API-KEY": "secret"},
+            )
+            assert response.json()["organic"][0]["link"] == "https://a.test"
+    cassette.save()
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        saved = f.read()
+    assert "secret" not in saved and "session" not in saved
+
+    transport = CassetteTransport(
+        Cassette.load(path), mode=REPLAY, latency=LatencyModel("none")
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        # query 순서와 API key가 달라도 같은 요청으로 판단.
+        replayed = [
+            (
+                await client.post(
+                    "https://google.serper.dev/search",
+                    params={"num": 10, "q": "날씨"},
+                    headers={"X-API-KEY": "other"},
+                )
+            ).json()["organic"][0]["n"]
+            for _ in range(3)
+        ]
+        with pytest.raises(CassetteMissError):
+            await client.post("https://google.serper.dev/search", params={"q": "x"})
+
+    assert len(calls) == 2
+    assert replayed == [1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_use_cassette_wraps_shared_client(tmp_path, http_server, local_server):
+    """공유 client의 요청을 기록하고 서버 없이 재생하는지 테스트"""
+    registry = HTTPClientRegistry()
+    path = str(tmp_path / "pages.json.gz")
+
+    with use_cassette(path, mode=RECORD, registry=registry):
+        response = await registry.get().get(f"{local_server}/article")
+        assert "본문" in response.text
+
+    with use_cassette(path, mode=REPLAY, latency="fixed:0.01", registry=registry):
+        response = await registry.get().get(f"{local_server}/article")
+        assert "본문" in response.text
+        assert response.headers["content-type"] == "text/html; charset=utf-8"
+
+    await registry.aclose()
+    assert http_server.paths == ["/article"]
+
+
+def test_latency_model():
+    """latency 설정을 해석하고 seed가 같으면 같은 지연을 만드는지 테스트"""
+    assert LatencyModel.from_spec("recorded:0.5").delay(0.4) == 0.2
+    assert LatencyModel.from_spec("fixed:0.1").delay(3.0) == 0.1
+    assert LatencyModel.from_spec("none").delay(3.0) == 0.0
+
+    first = LatencyModel.from_spec("lognormal:0.2,0.5", seed=7)
+    second = LatencyModel.from_spec("lognormal:0.2,0.5", seed=7)
+    delays = [first.delay(0.0) for _ in range(2000)]
+    assert delays[:5] == [second.delay(0.0) for _ in range(5)]
+    assert statistics.median(delays) == pytest.approx(0.2, rel=0.1)
+    assert max(delays) > 0.4
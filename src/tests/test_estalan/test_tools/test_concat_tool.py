@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain.callbacks")
+
+from pydantic import BaseModel  # noqa: E402
+
+from estalan.tools.base import AsyncTool, ConcatTool  # noqa: E402
+
+
+class QueryArgs(BaseModel):
+    query: str
+
+
+class FakeSearchTool(AsyncTool):
+    args_schema: type[BaseModel] = QueryArgs
+    delay: float = 0.0
+    results: list[dict] = []
+    error: bool = False
+
+    async def _arun(self, query: str, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError("backend down")
+        return [{**result, "page_content": self.name} for result in self.results]
+
+
+def result(url):
+    return {"metadata": {"source": url}}
+
+
+@pytest.mark.asyncio
+async def test_runs_concurrently_and_dedups_by_priority():
+    """하위 tool을 동시에 실행하고 같은 출처는 우선순위가 높은 결과만 남기는지 테스트"""
+    naver = FakeSearchTool(
+        name="naver",
+        description="",
+        delay=0.1,
+        results=[
+            result("https://news.example.com/a?utm_source=x"),
+            result("https://b.example.com"),
+        ],
+    )
+    google = FakeSearchTool(
+        name="google",
+        description="",
+        delay=0.1,
+        results=[result("https://NEWS.example.com/a"), result("https://c.example.com")],
+    )
+    tool = ConcatTool.from_tools([naver, google], priority=["google"])
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await tool.ainvoke({"query": "뉴스"})
+
+    assert loop.time() - started < 0.18
+    assert [(r["page_content"], r["metadata"]["source"]) for r in results] == [
+        ("google", "https://NEWS.example.com/a"),
+        ("google", "https://c.example.com"),
+        ("naver", "https://b.example.com"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_partial_results_on_deadline_and_error():
+    """느리거나 실패한 하위 tool이 있어도 나머지 결과를 반환하는지 테스트"""
+    fast = FakeSearchTool(
+        name="fast", description="", results=[result("https://a.com")]
+    )
+    slow = FakeSearchTool(
+        name="slow", description="", delay=5, results=[result("https://b.com")]
+    )
+    broken = FakeSearchTool(name="broken", description="", error=True)
+    tool = ConcatTool.from_tools([fast, slow, broken], deadlines={"slow": 0.05})
+
+    results = await tool.ainvoke({"query": "q"})
+    assert [r["metadata"]["source"] for r in results] == ["https://a.com"]
+
+    with pytest.raises(RuntimeError):
+        await ConcatTool.from_tools([broken]).ainvoke({"query": "q"})
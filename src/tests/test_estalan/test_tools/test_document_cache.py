@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from estalan.tools.document_cache import CleanedDocumentCache
+
+
+def test_cache_key_uses_canonical_url_and_content():
+    """정규화된 URL과 내용 hash로 키를 만드는지 테스트"""
+    key = CleanedDocumentCache.cache_key(
+        "https://Example.com/a?utm_source=x", "<p>a</p>"
+    )
+
+    assert key == CleanedDocumentCache.cache_key("https://example.com/a", "<p>a</p>")
+    assert key != CleanedDocumentCache.cache_key("https://example.com/a", "<p>b</p>")
+
+
+def test_memory_lru_and_ttl(monkeypatch):
+    """메모리 LRU 제거와 TTL 만료를 테스트"""
+    cache = CleanedDocumentCache(ttl=10, max_entries=2)
+    cache.put("a", "# A", "A")
+    cache.put("b", "# B", "B")
+    assert cache.get("a").markdown == "# A"
+
+    cache.put("c", "# C", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    now = time.time()
+    monkeypatch.setattr("estalan.tools.document_cache.time.time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.metrics()["memory_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    """메모리가 비어도 디스크 캐시에서 markdown, 제목, metadata를 복원하는지 테스트"""
+    path = str(tmp_path / "documents.sqlite")
+    cache = CleanedDocumentCache(path)
+    await cache.aput("key", "# 본문", "제목", {"source": "https://example.com"})
+    cache.close()
+
+    restarted = CleanedDocumentCache(path)
+    entry = await restarted.aget("key")
+
+    assert (entry.markdown, entry.title) == ("# 본문", "제목")
+    assert entry.metadata == {"source": "https://example.com"}
+    assert restarted.metrics()["disk_hits"] == 1
+    assert (await restarted.aget("key")) is entry
+    restarted.close()
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from estalan.tools import domain_scheduler
+from estalan.tools.domain_scheduler import (
+    DomainPolicy,
+    DomainScheduler,
+    DomainUnavailableError,
+)
+from estalan.tools.http_client import HostLimitedTransport, HTTPClientMetrics
+
+
+def _client(handler, policy: DomainPolicy) -> tuple[httpx.AsyncClient, DomainScheduler]:
+    scheduler = DomainScheduler(policy)
+    transport = HostLimitedTransport(
+        httpx.MockTransport(handler), 10, HTTPClientMetrics(), scheduler=scheduler
+    )
+    return httpx.AsyncClient(transport=transport), scheduler
+
+
+@pytest.mark.asyncio
+async def test_min_interval_per_domain():
+    """같은 domain 요청은 최소 간격을 두고, 다른 domain은 기다리지 않는지 테스트"""
+    started = {}
+
+    def handler(request):
+        started.setdefault(request.url.host, []).append(time.monotonic())
+        return httpx.Response(200)
+
+    client, _ = _client(handler, DomainPolicy(min_interval=0.05))
+    async with client:
+        await asyncio.gather(
+            *[client.get("https://a.example.com/") for _ in range(3)],
+            client.get("https://b.example.com/"),
+        )
+
+    a = started["a.example.com"]
+    assert a[2] - a[0] >= 0.09
+    assert started["b.example.com"][0] - a[0] < 0.04
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_recovers():
+    """연속 실패 시 breaker가 열려 요청을 바로 거절하고, 회복 후 시험 요청으로 닫히는지 테스트"""
+    calls, healthy = [], False
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200 if healthy else 503)
+
+    policy = DomainPolicy(
+        min_interval=0, failure_threshold=2, recovery_timeout=0.05, negative_ttl=0
+    )
+    client, scheduler = _client(handler, policy)
+    async with client:
+        for path in ("/1", "/2"):
+            assert (await client.get(f"https://a.example.com{path}")).status_code == 503
+
+        with pytest.raises(DomainUnavailableError):
+            await client.get("https://a.example.com/3")
+        assert calls == ["/1", "/2"]
+        assert scheduler.snapshot()["a.example.com"]["state"] == "open"
+
+        await asyncio.sleep(0.06)
+        healthy = True
+        assert (await client.get("https://a.example.com/4")).status_code == 200
+
+    report = scheduler.snapshot()["a.example.com"]
+    assert report["state"] == "closed"
+    assert report["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_for_failed_url():
+    """실패한 URL은 잠시 다시 요청하지 않고, 같은 domain의 다른 URL은 허용하는지 테스트"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(404 if request.url.path == "/missing" else 200)
+
+    client, scheduler = _client(handler, DomainPolicy(min_interval=0, negative_ttl=60))
+    async with client:
+        assert (await client.get("https://a.example.com/missing")).status_code == 404
+        with pytest.raises(DomainUnavailableError):
+            await client.get("https://a.example.com/missing")
+        assert (await client.get("https://a.example.com/ok")).status_code == 200
+
+    assert calls == ["/missing", "/ok"]
+    assert scheduler.snapshot()["a.example.com"]["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_idle_domains_are_evicted(monkeypatch):
+    """domain 상태 수가 상한을 넘으면 정상 domain만 오래된 순으로 제거하는지 테스트"""
+    monkeypatch.setattr(domain_scheduler, "DOMAIN_STATE_MAX_ENTRIES", 3)
+
+    def handler(request):
+        return httpx.Response(503 if request.url.host == "down.example.com" else 200)
+
+    client, scheduler = _client(
+        handler, DomainPolicy(min_interval=0, failure_threshold=1)
+    )
+    async with client:
+        await client.get("https://down.example.com/")
+        for i in range(5):
+            await client.get(f"https://host{i}.example.com/")
+
+    assert list(scheduler.snapshot()) == [
+        "down.example.com",
+        "host3.example.com",
+        "host4.example.com",
+    ]
+    assert scheduler.snapshot()["down.example.com"]["state"] == "open"
@@ -0,0 +1,88 @@
+import glob
+import os
+
+import pytest
+
+pytest.importorskip("lxml")
+
+from estalan.tools.html_pipeline import (  # noqa: E402
+    clean_html,
+    compare_markdown,
+    get_html_cleaner,
+)
+
+# 대표 페이지와 이전 방식(readability-lxml + markdownify)의 결과. (script/compare_html_pipelines.py로 갱신)
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "html_corpus")
+
+PAGE = """<html><head><title> 기사  제목 </title>
+<style>p { color: red; }</style><link rel="stylesheet" href="/a.css"></head>
+<body>
+<nav><a href="/">홈</a><a href="/news">뉴스</a></nav>
+<div id="content">
+<h2>소제목</h2>
+<p>첫 번째 문단입니다, 본문으로 선택될 만큼 충분히 긴 텍스트가 들어 있습니다.</p>
+<p>두 번째 문단에는 <strong>강조</strong>와 <a href="/x">링크</a>가 있습니다, 링크는 텍스트만 남습니다.</p>
+<ul><li>항목 하나</li><li>항목 둘</li></ul>
+</div>
+<div class="comments"><p>댓글 영역의 문장은 본문에 포함되면 안 되는 텍스트입니다.</p></div>
+<script>var tracking = true;</script>
+</body></html>"""
+
+
+def test_clean_html_extracts_title_and_main_content():
+    """한 번의 parse로 제목과 본문 markdown을 추출하는지 테스트"""
+    page = clean_html(PAGE)
+
+    assert page.title == "기사 제목"
+    assert "## 소제목" in page.markdown
+    assert "**강조**" in page.markdown
+    assert "링크가 있습니다" in page.markdown
+    assert "- 항목 하나\n- 항목 둘" in page.markdown
+    for removed in ("color: red", "tracking", "뉴스", "댓글"):
+        assert removed not in page.markdown
+
+
+def test_clean_html_without_extraction():
+    """이미 추출된 본문 HTML은 그대로 markdown으로 변환하는지 테스트"""
+    page = clean_html(
+        "<div><h1>제목</h1><p>짧은 글</p><pre>a\n  b</pre></div>", extract=False
+    )
+
+    assert page.markdown == "# 제목\n\n짧은 글\n\n```\na\n  b\n```"
+
+
+def test_clean_html_empty_document():
+    """빈 문서는 빈 결과를 반환하는지 테스트"""
+    assert clean_html("  ").markdown == ""
+
+
+def test_clean_html_table():
+    """셀 요소 개수로 열 수를 정하고 셀 안의 |를 escape하는지 테스트"""
+    page = clean_html(
+        "<table><tr><th>a | b</th><th>c</th><th>d</th></tr>"
+        "<tr><td>1</td><td>2</td></tr></table>",
+        extract=False,
+    )
+
+    assert page.markdown == ("| a \\| b | c | d |\n| --- | --- | --- |\n| 1 | 2 |  |")
+
+
+@pytest.mark.parametrize(
+    "html_path", sorted(glob.glob(os.path.join(CORPUS_DIR, "*.html")))
+)
+def test_clean_html_matches_golden_output(html_path):
+    """대표 페이지에서 이전 방식의 본문을 빠뜨리거나 다른 내용을 섞지 않는지 테스트"""
+    with open(html_path, encoding="utf-8") as f:
+        html_text = f.read()
+    with open(os.path.splitext(html_path)[0] + ".md", encoding="utf-8") as f:
+        expected = f.read()
+
+    scores = compare_markdown(expected, clean_html(html_text).markdown)
+
+    assert scores["recall"] >= 0.9
+    assert scores["precision"] >= 0.85
+
+
+def test_lxml_pipeline_is_default():
+    """HTML_PIPELINE을 설정하지 않으면 lxml 방식을 사용하는지 테스트"""
+    assert get_html_cleaner() is clean_html
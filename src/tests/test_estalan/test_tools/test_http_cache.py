@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from estalan.tools.http_cache import HTTPCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(str(tmp_path / "http_cache.sqlite"), default_ttl=60)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"cache-control": "public, max-age=120"}, 120),
+        ({"cache-control": "max-age=10, s-maxage=30"}, 30),
+        ({"cache-control": "no-cache"}, 0),
+        ({"cache-control": "no-store, max-age=120"}, None),
+        ({}, 60),
+    ],
+)
+def test_freshness_lifetime(cache, headers, expected):
+    """Cache-Control header에 따른 캐시 유지 시간 계산 테스트"""
+    assert cache.freshness_lifetime(headers) == expected
+
+
+def test_cache_key_normalizes_url(cache):
+    """정규화된 URL과 Accept header로 캐시 키를 만드는지 테스트"""
+    key = cache.cache_key("https://Example.com/a?b=1&utm_source=x#top")
+
+    assert key == cache.cache_key("https://example.com:443/a?b=1")
+    assert key != cache.cache_key("https://example.com/a?b=1", {"Accept": "text/*"})
+
+
+def test_put_and_get(cache):
+    """저장한 응답을 그대로 읽어오고, no-store 응답은 저장하지 않는지 테스트"""
+    cache.put("a", "https://a.com", "https://a.com/", {"ETag": '"1"'}, b"body")
+    entry = cache.get("a")
+
+    assert entry.body == b"body"
+    assert entry.is_fresh
+    assert entry.conditional_headers() == {"If-None-Match": '"1"'}
+
+    cache.put("b", "https://b.com", "https://b.com", {"Cache-Control": "no-store"}, b"")
+    assert cache.get("b") is None
+
+
+def test_lru_eviction(tmp_path):
+    """최대 크기를 넘으면 가장 오래 사용하지 않은 항목부터 제거되는지 테스트"""
+    cache = HTTPCache(str(tmp_path / "http_cache.sqlite"), max_size_bytes=10)
+    cache.put("a", "a", "a", {}, b"12345")
+    time.sleep(0.01)
+    cache.put("b", "b", "b", {}, b"12345")
+    time.sleep(0.01)
+    cache.get("a")
+    cache.put("c", "c", "c", {}, b"12345")
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.stats["evictions"] == 1
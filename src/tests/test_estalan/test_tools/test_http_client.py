@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+from estalan.tools.http_client import (
+    HostLimitedTransport,
+    HTTPClientMetrics,
+    HTTPClientRegistry,
+)
+
+
+@pytest.mark.asyncio
+async def test_registry_reuses_connections(local_server):
+    """같은 host에 대한 요청이 공유 client의 connection을 재사용하는지 테스트"""
+    registry = HTTPClientRegistry()
+    client = registry.get()
+    assert registry.get() is client
+
+    for _ in range(3):
+        response = await client.get(local_server)
+        assert response.text == "ok"
+
+    await registry.aclose()
+    assert client.is_closed
+    assert registry.metrics_report()["default"] == {
+        "requests": 3,
+        "connections": 1,
+        "reused": 2,
+        "reuse_ratio": 2 / 3,
+    }
+
+
+@pytest.mark.asyncio
+async def test_host_limited_transport():
+    """host별 동시 요청 수가 제한되는지 테스트"""
+    active, peak = 0, 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200)
+
+    transport = HostLimitedTransport(
+        httpx.MockTransport(handler),
+        max_connections_per_host=2,
+        metrics=HTTPClientMetrics(),
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        await asyncio.gather(*[client.get("http://a.test/") for _ in range(6)])
+
+    assert peak == 2
+    assert transport.metrics.requests == 6
+
+
+@pytest.mark.asyncio
+async def test_host_slots_are_dropped_when_idle():
+    """요청이 끝난 host의 동시 요청 제한 상태는 유지하지 않는지 테스트"""
+
+    async def body():
+        yield b"ok"
+
+    transport = HostLimitedTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, content=body())),
+        max_connections_per_host=2,
+        metrics=HTTPClientMetrics(),
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        await asyncio.gather(*[client.get(f"http://h{i}.test/") for i in range(20)])
+        async with client.stream("GET", "http://open.test/") as response:
+            assert list(transport._hosts) == ["open.test"]
+            await response.aread()
+
+    assert transport._hosts == {}
+
+
+@pytest.mark.asyncio
+async def test_api_profile_skips_domain_scheduler():
+    """API client는 같은 host에도 동시에 요청하고, 오류가 이어져도 breaker로 막지 않는지 테스트"""
+    active, peak = 0, 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return httpx.Response(503)
+
+    registry = HTTPClientRegistry()
+    registry.set_transport_wrapper(lambda _: httpx.MockTransport(handler))
+    client = registry.get("api")
+    responses = await asyncio.gather(
+        *[client.post("https://api.example.com/search") for _ in range(8)]
+    )
+    responses.append(await client.post("https://api.example.com/search"))
+    await registry.aclose()
+
+    assert [response.status_code for response in responses] == [503] * 9
+    assert peak == 8
+    assert "api.example.com" not in registry.domain_report()
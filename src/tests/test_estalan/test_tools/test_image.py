@@ -0,0 +1,254 @@
+import asyncio
+import struct
+
+import httpx
+import pytest
+
+from estalan.tools.domain_scheduler import DomainUnavailableError
+from estalan.tools.http_client import HTTPClientRegistry
+from estalan.tools.image import (
+    ImageInfo,
+    ImageProber,
+    IncompleteImageHeader,
+    parse_image_header,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + struct.pack(">II", 640, 417)
+GIF = b"GIF89a" + struct.pack("<HH", 300, 200)
+WEBP_VP8X = (
+    b"RIFF\x00\x00\x00\x00WEBPVP8X\x0a\x00\x00\x00\x00\x00\x00\x00"
+    + (799).to_bytes(3, "little")
+    + (599).to_bytes(3, "little")
+)
+WEBP_VP8L = (
+    b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00\x2f"
+    + (1023 | 767 << 14).to_bytes(4, "little")
+    + b"\x00" * 5
+)
+JPEG = (
+    b"\xff\xd8\xff\xe1"
+    + struct.pack(">H", 2 + 5000)
+    + b"\x00" * 5000
+    + b"\xff\xc0\x00\x11\x08"
+    + struct.pack(">HH", 1080, 1920)
+    + b"\x00" * 20
+)
+
+
+def make_client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def image_doc(url):
+    return {"page_content": url, "metadata": {"image_url": url, "type": "image"}}
+
+
+@pytest.mark.asyncio
+async def test_repeated_failures_reject_origin():
+    """실패가 반복된 origin은 제외하고, 한 번의 실패는 해당 URL만 제외하는지 테스트"""
+    requests = []
+
+    async def handler(request):
+        requests.append(str(request.url))
+        if request.url.host == "blocked.example.com":
+            return httpx.Response(403)
+        if request.url.path == "/missing.png":
+            return httpx.Response(404)
+        return httpx.Response(206, content=PNG)
+
+    async with make_client(handler) as client:
+        prober = ImageProber(client=client, concurrency=1)
+        docs = [
+            image_doc(f"https://{host}.example.com/{name}.png")
+            for host in ("ok", "blocked")
+            for name in ("missing", "a", "b")
+        ]
+        filtered = await prober.afilter(docs, min_size=400)
+        again = await prober.aprobe_all(["https://ok.example.com/missing.png"])
+
+    assert [doc["metadata"]["image_url"] for doc in filtered] == [
+        "https://ok.example.com/a.png",
+        "https://ok.example.com/b.png",
+    ]
+    assert again == {"https://ok.example.com/missing.png": None}
+    # blocked origin은 실패가 두 번 쌓인 뒤 세 번째 URL부터 요청하지 않음.
+    assert len(requests) == 5
+    assert prober.stats["origin_rejected"] == 1
+    assert prober.stats["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_connection_error_rejects_origin():
+    """연결 오류는 한 번만 발생해도 origin 전체를 제외하는지 테스트"""
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        if request.url.host == "down.example.com":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, content=PNG)
+
+    async with make_client(handler) as client:
+        prober = ImageProber(client=client, concurrency=1)
+        results = await prober.aprobe_all(
+            [
+                "https://down.example.com/a.png",
+                "https://down.example.com/b.png",
+                "https://img.example.com/a.png",
+            ]
+        )
+
+    assert results == {
+        "https://down.example.com/a.png": None,
+        "https://down.example.com/b.png": None,
+        "https://img.example.com/a.png": ImageInfo("png", 640, 417),
+    }
+    assert requests == [
+        "https://down.example.com/a.png",
+        "https://img.example.com/a.png",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cors_is_checked_on_the_same_request():
+    """cors_origin을 설정하면 크기를 읽는 요청에서 CORS 허용 여부도 확인하는지 테스트"""
+    requests = []
+
+    async def handler(request):
+        requests.append(request.headers.get("origin"))
+        headers = {}
+        if request.url.host == "cors.example.com":
+            headers["access-control-allow-origin"] = "*"
+        return httpx.Response(200, headers=headers, content=PNG)
+
+    urls = ["https://cors.example.com/a.png", "https://nocors.example.com/a.png"]
+    async with make_client(handler) as client:
+        checked = await ImageProber(
+            client=client, cors_origin="https://app.example.com"
+        ).aprobe_all(urls)
+        unchecked = await ImageProber(client=client, cors_origin=None).aprobe_all(urls)
+
+    assert checked == {
+        "https://cors.example.com/a.png": ImageInfo("png", 640, 417),
+        "https://nocors.example.com/a.png": None,
+    }
+    assert all(info is not None for info in unchecked.values())
+    assert requests == ["https://app.example.com"] * 2 + [None] * 2
+
+
+@pytest.mark.asyncio
+async def test_budget_drops_slow_images():
+    """시간 예산 안에 확인하지 못한 이미지는 제외하는지 테스트"""
+
+    async def handler(request):
+        if request.url.host == "slow.example.com":
+            await asyncio.sleep(1)
+        return httpx.Response(200, content=PNG)
+
+    async with make_client(handler) as client:
+        prober = ImageProber(client=client, budget=0.1)
+        results = await prober.aprobe_all(
+            ["https://fast.example.com/a.png", "https://slow.example.com/a.png"]
+        )
+
+    assert results == {
+        "https://fast.example.com/a.png": ImageInfo("png", 640, 417),
+        "https://slow.example.com/a.png": None,
+    }
+    assert prober.stats["timed_out"] == 1
+
+
+def test_parse_image_header():
+    """PNG/JPEG/WebP/GIF 헤더에서 형식과 크기를 읽는지 테스트"""
+    assert parse_image_header(PNG) == ImageInfo("png", 640, 417)
+    assert parse_image_header(GIF) == ImageInfo("gif", 300, 200)
+    assert parse_image_header(WEBP_VP8X) == ImageInfo("webp", 800, 600)
+    assert parse_image_header(WEBP_VP8L) == ImageInfo("webp", 1024, 768)
+    assert parse_image_header(JPEG) == ImageInfo("jpeg", 1920, 1080)
+    assert parse_image_header(b"<!DOCTYPE html><html>") is None
+    with pytest.raises(IncompleteImageHeader):
+        parse_image_header(JPEG[:4096])
+
+
+@pytest.mark.asyncio
+async def test_prober_reads_only_header_and_filters():
+    """앞부분만 받아 실제 크기로 작은/깨진 이미지를 제외하고 결과를 캐시하는지 테스트"""
+    bodies = {
+        "/big.jpg": JPEG + b"\x00" * 500_000,
+        "/small.png": PNG[:16] + struct.pack(">II", 120, 80) + b"\x00" * 100,
+        "/broken.png": b"<html>not found</html>",
+    }
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        assert request.headers["range"] == "bytes=0-65535"
+        body = bodies[request.url.path]
+
+        async def stream():
+            for i in range(0, len(body), 1024):
+                yield body[i : i + 1024]
+
+        return httpx.Response(200, content=stream())
+
+    async with make_client(handler) as client:
+        prober = ImageProber(client=client)
+        docs = [image_doc(f"https://img.example.com{path}") for path in bodies]
+        filtered = await prober.afilter(docs, min_size=400)
+        again = await prober.aprobe_all(["https://img.example.com/big.jpg"])
+
+    assert [doc["metadata"] for doc in filtered] == [
+        {
+            "image_url": "https://img.example.com/big.jpg",
+            "type": "image",
+            "imageWidth": 1920,
+            "imageHeight": 1080,
+            "format": "jpeg",
+        }
+    ]
+    assert again == {"https://img.example.com/big.jpg": ImageInfo("jpeg", 1920, 1080)}
+    assert len(requests) == 3
+    assert prober.stats["broken"] == 1
+    assert prober.stats["bytes_received"] < 10 * 1024
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rejection_is_not_cached():
+    """domain scheduler가 요청을 보내지 않은 경우는 이미지 실패로 캐시하지 않는지 테스트"""
+    rejected = True
+
+    def handler(request):
+        if rejected:
+            raise DomainUnavailableError(f"Circuit open for {request.url.host}")
+        return httpx.Response(200, content=PNG)
+
+    url = "https://cdn.example.com/a.png"
+    async with make_client(handler) as client:
+        prober = ImageProber(client=client)
+        assert await prober.aprobe(url) is None
+        rejected = False
+        assert await prober.aprobe(url) == ImageInfo("png", 640, 417)
+
+    assert prober.stats["broken"] == 0
+    assert HTTPClientRegistry().get_profile("image").domain_scheduling is False
+
+
+@pytest.mark.asyncio
+async def test_origin_state_is_bounded():
+    """origin별 실패 상태도 max_entries개까지만 유지하는지 테스트"""
+
+    def handler(request):
+        if request.url.host.startswith("down"):
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(404)
+
+    async with make_client(handler) as client:
+        prober = ImageProber(client=client, max_entries=3)
+        await prober.aprobe_all(
+            [f"https://down{i}.example.com/a.png" for i in range(5)]
+            + [f"https://missing{i}.example.com/a.png" for i in range(5)]
+        )
+
+    assert prober.metrics()["rejected_origins"] == 3
+    assert len(prober._origin_failures) == 3
+    assert prober.metrics()["cached"] == 3
@@ -0,0 +1,44 @@
+import pytest
+
+from estalan.tools.ingest import aread_html, read_html, sniff_encoding
+
+HTML = (
+    '<html><head><meta charset="euc-kr"><title>제목</title></head>'
+    f"<body>{'본문' * 3000}</BODY></html><script>trailing</script>"
+).encode("euc-kr")
+
+
+async def _chunks(content: bytes, size: int):
+    for i in range(0, len(content), size):
+        yield content[i : i + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096, len(HTML)])
+async def test_aread_html_stops_at_body_end(chunk_size):
+    """meta charset으로 decode하고, chunk 경계와 무관하게 </body>에서 멈추는지 테스트"""
+    body = await aread_html(_chunks(HTML, chunk_size))
+
+    assert body.encoding == "euc-kr"
+    assert body.text.endswith("본문</BODY>")
+    assert body.content == HTML[: HTML.index(b"</BODY>") + len(b"</BODY>")]
+    assert not body.truncated
+    assert body.text == read_html(HTML).text
+
+
+@pytest.mark.asyncio
+async def test_aread_html_budgets():
+    """byte/문자 예산에 도달하면 잘라서 반환하는지 테스트"""
+    by_bytes = await aread_html(_chunks(HTML, 1000), max_bytes=3000)
+    by_chars = await aread_html(_chunks(HTML, 1000), max_chars=100)
+
+    assert by_bytes.truncated and len(by_bytes.content) == 3000
+    assert by_chars.truncated and len(by_chars.text) == 100
+
+
+def test_sniff_encoding_priority():
+    """header charset, BOM, meta 순서로 charset을 결정하는지 테스트"""
+    assert sniff_encoding(HTML, header_charset="utf-8") == "utf-8"
+    assert sniff_encoding(HTML, header_charset="unknown-charset") == "euc-kr"
+    assert sniff_encoding(b"\xef\xbb\xbf<html>") == "utf-8-sig"
+    assert sniff_encoding(b"plain ascii") in ("ascii", "utf-8")
@@ -0,0 +1,38 @@
+import time
+
+from estalan.tools.kv_cache import KVCache
+
+
+def test_values_are_decoded_per_lookup():
+    """저장한 값을 꺼낼 때마다 새로 decode해서 호출한 쪽의 수정이 캐시에 남지 않는지 테스트"""
+    cache = KVCache("search")
+    cache.put("q", [{"video_id": "a"}])
+
+    videos = cache.get("q")
+    videos.append({"video_id": "b"})
+
+    assert cache.get("q") == [{"video_id": "a"}]
+    assert cache.get("missing") is None
+    assert cache.metrics()["memory_hits"] == 2
+
+
+def test_namespaces_share_disk_file(tmp_path, monkeypatch):
+    """같은 SQLite 파일을 쓰는 캐시끼리 namespace와 TTL이 분리되는지 테스트"""
+    path = str(tmp_path / "kv.sqlite")
+    transcripts = KVCache("transcript", path, ttl=100)
+    searches = KVCache("search", path, ttl=10)
+    transcripts.put("key", "자막")
+    searches.put("key", ["결과"])
+
+    # 새 process처럼 메모리가 빈 캐시로 다시 읽음.
+    reopened = KVCache("transcript", path)
+    assert reopened.get("key") == "자막"
+    assert reopened.metrics()["disk_hits"] == 1
+
+    now = time.time()
+    monkeypatch.setattr("estalan.tools.kv_cache.time.time", lambda: now + 11)
+    assert KVCache("search", path).get("key") is None
+    assert KVCache("transcript", path).get("key") == "자막"
+
+    for cache in (transcripts, searches, reopened):
+        cache.close()
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("langchain.schema")
+
+from estalan.tools.http_cache import HTTPCache  # noqa: E402
+from estalan.tools.mixins import HTTPXMixin  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_afetch_returns_body_and_metadata(local_server):
+    """한 번의 요청으로 본문, title, charset, 최종 URL을 가져오는지 테스트"""
+    doc = await HTTPXMixin().afetch(f"{local_server}/redirect", content_type="text")
+
+    assert "본문" in doc.page_content
+    assert doc.metadata == {
+        "source": f"{local_server}/redirect",
+        "final_url": f"{local_server}/article",
+        "charset": "utf-8",
+        "title": "테스트 & 제목",
+    }
+
+
+@pytest.mark.asyncio
+async def test_afetch_revalidates_with_http_cache(tmp_path, http_server, local_server):
+    """캐시된 응답을 ETag로 재검증하고 304이면 본문을 재사용하는지 테스트"""
+    fetcher = HTTPXMixin()
+    fetcher.http_cache = HTTPCache(str(tmp_path / "http_cache.sqlite"))
+
+    first = await fetcher.afetch(f"{local_server}/etag", content_type="text")
+    second = await fetcher.afetch(f"{local_server}/etag#top", content_type="text")
+
+    assert first.page_content == second.page_content
+    assert second.metadata["title"] == "etag"
+    assert http_server.paths == ["/etag", "/etag"]
+    assert fetcher.http_cache.metrics()["revalidated"] == 1
+    assert fetcher.http_cache.metrics()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_afetch_retries_304_without_cached_body(tmp_path, local_server):
+    """재사용할 캐시 없이 304를 받으면 조건부 header 없이 다시 요청하는지 테스트"""
+    headers = {"If-None-Match": '"v1"'}
+    doc = await HTTPXMixin().afetch(f"{local_server}/etag", headers, "text")
+    assert doc.metadata["title"] == "etag"
+
+    fetcher = HTTPXMixin()
+    fetcher.http_cache = HTTPCache(str(tmp_path / "http_cache.sqlite"))
+    doc = await fetcher.afetch(f"{local_server}/etag", headers, "text")
+    assert doc.metadata["title"] == "etag"
+
+
+@pytest.mark.asyncio
+async def test_truncated_body_is_not_cached(tmp_path, local_server):
+    """byte 예산에서 잘린 본문은 HTTP 캐시에 저장하지 않는지 테스트"""
+    fetcher = HTTPXMixin()
+    fetcher.max_html_bytes = 16
+    fetcher.http_cache = HTTPCache(str(tmp_path / "http_cache.sqlite"))
+
+    await fetcher.afetch(f"{local_server}/etag", content_type="text")
+
+    assert fetcher.http_cache.metrics()["stores"] == 0
@@ -0,0 +1,146 @@
+import os
+
+import httpx
+import pytest
+
+from estalan.tools import pdf
+from estalan.tools.pdf import (
+    PDFTooLargeError,
+    adownload_pdf,
+    aload_pdf,
+    extract_pdf_pages,
+    is_scanned,
+    select_relevant_pages,
+)
+
+
+def _make_pdf(page_texts: list[str]) -> bytes:
+    """페이지마다 한 줄의 텍스트가 있는 최소한의 PDF 생성."""
+    count = len(page_texts)
+    kids = " ".join(f"{3 + i * 2} 0 R" for i in range(count))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>",
+    ]
+    font_id = 3 + count * 2
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + i * 2} 0 R /Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    body, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n".encode()
+    return body + f"startxref\n{xref}\n%%EOF\n".encode()
+
+
+def test_extract_pdf_pages_limits_pages(tmp_path):
+    """앞에서부터 max_pages까지만 페이지별 텍스트를 추출하는지 테스트"""
+    pytest.importorskip("pypdf")
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(_make_pdf(["first page", "second page", "third page"]))
+
+    pages, total_pages = extract_pdf_pages(str(path), max_pages=2)
+
+    assert total_pages == 3
+    assert pages == ["first page", "second page"]
+
+
+def test_select_relevant_pages():
+    """예산을 넘으면 첫 페이지와 질문 관련 페이지만 범위로 묶어 반환하는지 테스트"""
+    pages = [
+        "제목과 초록",
+        "배경 설명 " * 20,
+        "실험 결과는 다음과 같다",
+        "실험 결과에 대한 분석",
+        "부록 " * 20,
+    ]
+
+    text = select_relevant_pages(pages, "실험 결과 알려줘", max_chars=60)
+
+    assert text == (
+        "[p. 1]\n제목과 초록\n\n[p. 3-4]\n실험 결과는 다음과 같다\n\n실험 결과에 대한 분석"
+    )
+    assert select_relevant_pages(["a", "b"], max_chars=10) == "[p. 1-2]\na\n\nb"
+    assert is_scanned(["", " ", "1"])
+    assert not is_scanned(["본문 " * 30])
+
+
+@pytest.mark.asyncio
+async def test_adownload_pdf_enforces_size_cap():
+    """스트리밍 중 크기 제한을 넘으면 중단하는지 테스트"""
+
+    async def body():
+        for _ in range(4):
+            yield b"x" * 512
+
+    def handler(request):
+        return httpx.Response(200, content=body())
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        path = await adownload_pdf("https://example.com/a.pdf", 4096, client=client)
+        with open(path, "rb") as f:
+            assert len(f.read()) == 2048
+        os.unlink(path)
+
+        with pytest.raises(PDFTooLargeError):
+            await adownload_pdf("https://example.com/a.pdf", 1024, client=client)
+
+
+@pytest.mark.asyncio
+async def test_missing_pypdf_warns_once(tmp_path, monkeypatch):
+    """pypdf가 없으면 media로 반환하고 경고는 한 번만 남기는지 테스트"""
+    warnings = []
+
+    async def download(url):
+        path = tmp_path / url.rsplit("/", 1)[-1]
+        path.write_bytes(b"%PDF-1.4")
+        return str(path)
+
+    monkeypatch.setattr(pdf, "pypdf", None)
+    monkeypatch.setattr(pdf, "_warned_missing_pypdf", False)
+    monkeypatch.setattr(pdf, "adownload_pdf", download)
+    monkeypatch.setattr(pdf.logger, "warning", warnings.append)
+
+    first = await aload_pdf("https://example.com/a.pdf")
+    await aload_pdf("https://example.com/b.pdf")
+
+    assert first.media is not None and first.pages == []
+    assert len(warnings) == 1
+
+
+@pytest.mark.asyncio
+async def test_file_io_runs_in_thread(tmp_path, monkeypatch):
+    """임시 파일 쓰기/읽기/삭제를 event loop가 아닌 thread에서 실행하는지 테스트"""
+    offloaded = []
+    to_thread = pdf.asyncio.to_thread
+
+    async def spy(func, *args, **kwargs):
+        offloaded.append(getattr(func, "__name__", ""))
+        return await to_thread(func, *args, **kwargs)
+
+    async def body():
+        yield b"%PDF-1.4"
+
+    def handler(request):
+        return httpx.Response(200, content=body())
+
+    monkeypatch.setattr(pdf.asyncio, "to_thread", spy)
+    monkeypatch.setattr(pdf, "pypdf", None)
+    monkeypatch.setattr(pdf, "_warned_missing_pypdf", True)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        monkeypatch.setattr(pdf, "get_http_client", lambda: client)
+        content = await aload_pdf("https://example.com/a.pdf")
+
+    assert content.media is not None
+    assert {"write", "_read_media", "unlink"} <= set(offloaded)
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain.schema")
+
+from langchain.schema import Document  # noqa: E402
+
+from estalan.tools.prefetch import PrefetchCache  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_cancelled_prefetch_is_cache_miss():
+    """기다리는 중에 prefetch가 취소되면 예외 없이 miss로 처리하는지 테스트"""
+    started = asyncio.Event()
+
+    async def loader(url):
+        started.set()
+        await asyncio.sleep(10)
+        return Document(page_content=url)
+
+    cache = PrefetchCache(loader)
+    cache.schedule(["https://a.test"])
+    waiter = asyncio.create_task(cache.get("https://a.test"))
+    await started.wait()
+    cache.cancel()
+
+    assert await waiter is None
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_turn_caches_are_independent():
+    """한 턴의 cancel이 다른 턴의 prefetch를 취소하지 않는지 테스트"""
+
+    async def loader(url):
+        await asyncio.sleep(0.01)
+        return Document(page_content=url)
+
+    first, second = PrefetchCache(loader), PrefetchCache(loader)
+    first.schedule(["https://a.test"])
+    second.schedule(["https://a.test"])
+    first.cancel()
+
+    doc = await second.get("https://a.test")
+    assert doc.page_content == "https://a.test"
+    assert await first.get("https://a.test") is None
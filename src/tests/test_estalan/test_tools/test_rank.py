@@ -0,0 +1,85 @@
+from estalan.tools.rank import bm25_scores, dedup_and_rank, tokenize
+
+STORY = "삼성전자가 3분기 영업이익 10조원을 기록했다고 31일 공시했다. 반도체 부문 실적이 개선되면서 시장 예상치를 웃돌았다."
+
+
+def doc(url, snippet, title=""):
+    return {"page_content": snippet, "metadata": {"title": title, "source": url}}
+
+
+def test_bm25_prefers_relevant_documents():
+    """query 단어가 많이 등장하는 문서의 BM25 점수가 높은지 테스트"""
+    documents = [
+        tokenize("애플이 새로운 아이폰을 공개했다."),
+        tokenize(STORY),
+        tokenize("반도체 업황 회복에 대한 전망"),
+    ]
+    scores = bm25_scores(tokenize("삼성전자 영업이익"), documents)
+
+    assert scores.argmax() == 1
+    assert scores[0] == 0
+
+
+def test_near_duplicate_snippets_are_removed():
+    """다른 사이트에 재게시된 거의 같은 snippet을 하나만 남기는지 테스트"""
+    results = [
+        doc("https://a.com/1", STORY),
+        doc("https://b.com/2", STORY.replace("예상치를", "예상을")),
+        doc("https://c.com/3", "[속보] " + STORY.replace("기록했다고", "기록")),
+        doc(
+            "https://d.com/4",
+            "삼성전자가 3분기 영업이익 9조원을 기록했다. 메모리 가격 하락으로 시장 예상치를 밑돌았다.",
+        ),
+    ]
+
+    ranked = dedup_and_rank(results, "삼성전자 실적")
+    sources = [r["metadata"]["source"] for r in ranked]
+
+    assert len(sources) == 2
+    assert "https://d.com/4" in sources
+
+
+def test_domain_diversity_and_top_k():
+    """한 domain이 상위를 독점하지 않고 최대 k개만 반환하는지 테스트"""
+    snippets = [
+        "파이썬 asyncio event loop와 asyncio task 동작 원리",
+        "파이썬 asyncio로 웹 크롤러 만들기",
+        "파이썬 asyncio gather와 semaphore로 동시성 제한하기",
+        "자바 스트림 API 입문",
+    ]
+    results = [
+        doc(f"https://www.big.com/{i}", snippet) for i, snippet in enumerate(snippets)
+    ] + [doc("https://small.com/1", "파이썬 Django 입문")]
+
+    def top3(**kwargs):
+        ranked = dedup_and_rank(results, "파이썬 asyncio", k=3, **kwargs)
+        return [r["metadata"]["source"] for r in ranked]
+
+    assert top3(diversity_decay=1.0) == [
+        "https://www.big.com/0",
+        "https://www.big.com/1",
+        "https://www.big.com/2",
+    ]
+    assert top3() == [
+        "https://www.big.com/0",
+        "https://small.com/1",
+        "https://www.big.com/1",
+    ]
+
+
+def test_dedup_only_keeps_original_order():
+    """rank=False이면 관련도와 상관없이 원래 순서를 유지하고 중복만 제거하는지 테스트"""
+    results = [
+        doc("https://a.com/1", "자바 스트림 API 입문"),
+        doc("https://a.com/2", STORY),
+        doc("https://b.com/3", STORY.replace("예상치를", "예상을")),
+        doc("https://a.com/4", "삼성전자 실적 발표와 반도체 시장 전망"),
+    ]
+
+    ranked = dedup_and_rank(results, "삼성전자 실적", k=3, rank=False)
+
+    assert [r["metadata"]["source"] for r in ranked] == [
+        "https://a.com/1",
+        "https://a.com/2",
+        "https://a.com/4",
+    ]
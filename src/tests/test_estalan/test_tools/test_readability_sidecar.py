@@ -0,0 +1,93 @@
+import asyncio
+import shutil
+
+import pytest
+
+from estalan.tools.readability_sidecar import ReadabilitySidecar, WorkerCrashedError
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node not found")
+
+# readability 대신 요청을 그대로 돌려주는 worker. "crash"를 받으면 종료하고, "hang"에는 응답하지 않음.
+ECHO_WORKER = """
+const readline = require("readline");
+const rl = readline.createInterface({ input: process.stdin });
+rl.on("line", (line) => {
+  const request = JSON.parse(line);
+  if (request.html === "crash") process.exit(1);
+  if (request.html === "hang") return;
+  const respond = () =>
+    process.stdout.write(
+      JSON.stringify({ id: request.id, title: request.url, content: request.html }) + "\\n"
+    );
+  request.html === "slow" ? setTimeout(respond, 200) : respond();
+});
+"""
+
+
+@pytest.fixture
+def echo_script(tmp_path):
+    path = tmp_path / "echo_worker.js"
+    path.write_text(ECHO_WORKER)
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_pipelined_requests(echo_script):
+    """한 worker에 여러 요청을 동시에 보내도 id로 응답을 구분하는지 테스트"""
+    sidecar = ReadabilitySidecar(size=1, script=echo_script)
+    assert sidecar.enabled
+
+    try:
+        results = await asyncio.gather(
+            sidecar.aextract("slow", "u0"),
+            *[sidecar.aextract(f"<p>{i}</p>", f"u{i}") for i in range(1, 5)],
+        )
+    finally:
+        await sidecar.aclose()
+
+    assert results[0] == {"title": "u0", "content": "slow"}
+    assert [r["content"] for r in results[1:]] == [f"<p>{i}</p>" for i in range(1, 5)]
+    assert sidecar.metrics()["requests"] == 5
+
+
+@pytest.mark.asyncio
+async def test_restart_after_crash(echo_script):
+    """worker가 종료되면 대기 중인 요청은 실패하고, 다음 요청 시 다시 띄우는지 테스트"""
+    sidecar = ReadabilitySidecar(size=1, script=echo_script)
+
+    try:
+        with pytest.raises(WorkerCrashedError):
+            await sidecar.aextract("crash")
+
+        result = await sidecar.aextract("<p>ok</p>")
+    finally:
+        await sidecar.aclose()
+
+    assert result["content"] == "<p>ok</p>"
+    assert sidecar.metrics()["restarts"] == 1
+    assert sidecar.metrics()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_restart_after_timeout(echo_script):
+    """응답하지 않는 worker는 timeout 시 종료되고, 대기 중인 요청은 실패하며 다음 요청은 새 worker가 처리하는지 테스트"""
+    sidecar = ReadabilitySidecar(size=1, script=echo_script, timeout=0.3)
+
+    try:
+        first = asyncio.create_task(sidecar.aextract("hang"))
+        await asyncio.sleep(0.1)
+        # 같은 worker에 쌓인 요청은 자신의 timeout을 기다리지 않고 함께 실패.
+        second = asyncio.create_task(sidecar.aextract("hang"))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await first
+        with pytest.raises(WorkerCrashedError):
+            await asyncio.wait_for(second, 0.1)
+
+        result = await sidecar.aextract("<p>ok</p>")
+    finally:
+        await sidecar.aclose()
+
+    assert result["content"] == "<p>ok</p>"
+    assert sidecar.metrics()["timeouts"] == 1
+    assert sidecar.metrics()["restarts"] == 1
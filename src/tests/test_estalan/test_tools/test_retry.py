@@ -0,0 +1,92 @@
+import pytest
+
+from estalan.tools.utils import ResilientExecutor, RetryBudget
+
+
+@pytest.mark.asyncio
+async def test_failed_query_does_not_fail_batch():
+    """실패한 query만 따로 보고하고 성공한 query 결과는 반환하는지 테스트"""
+    calls = []
+
+    async def fetch(query):
+        calls.append(query)
+        if query == "broken":
+            raise RuntimeError("503")
+        return [query]
+
+    executor = ResilientExecutor(attempts=3, base_delay=0.001)
+    batch = await executor.arun(["a", "broken", "b"], fetch)
+
+    assert batch.results == {"a": ["a"], "b": ["b"]}
+    assert list(batch.failures) == ["broken"]
+    assert calls.count("broken") == 3
+    assert calls.count("a") == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_error_and_empty_result():
+    """일시적 오류와 빈 결과는 해당 query만 다시 시도하는지 테스트"""
+    attempts = {"flaky": 0, "empty": 0}
+
+    async def fetch(query):
+        attempts[query] += 1
+        if query == "flaky" and attempts[query] == 1:
+            raise TimeoutError()
+        if query == "empty":
+            return []
+        return ["ok"]
+
+    executor = ResilientExecutor(attempts=3, base_delay=0.001, retry_if_empty=True)
+    batch = await executor.arun(["flaky", "empty"], fetch)
+
+    assert batch.results == {"flaky": ["ok"], "empty": []}
+    assert not batch.failures
+    assert attempts == {"flaky": 2, "empty": 3}
+
+    # 기본값은 빈 결과를 그대로 반환.
+    attempts = {"flaky": 0, "empty": 0}
+    batch = await ResilientExecutor(attempts=3, base_delay=0.001).arun(["empty"], fetch)
+    assert batch.results == {"empty": []}
+    assert attempts["empty"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_retry_storm():
+    """장애 시 공유 재시도 한도를 넘으면 더 이상 재시도하지 않는지 테스트"""
+    calls = []
+
+    async def fetch(query):
+        calls.append(query)
+        raise ConnectionError("serper down")
+
+    budget = RetryBudget(ratio=0.1, max_tokens=2)
+    executor = ResilientExecutor(attempts=5, base_delay=0.001, budget=budget)
+    queries = [f"q{i}" for i in range(20)]
+    batch = await executor.arun(queries, fetch)
+
+    assert set(batch.failures) == set(queries)
+    # 첫 시도 20번 + 한도(2 + 20 * 0.1) 안의 재시도만 실행.
+    assert len(calls) <= 20 + 4
+    assert budget.exhausted > 0
+
+
+@pytest.mark.asyncio
+async def test_search_retries_only_when_every_query_is_empty():
+    """query 하나의 빈 결과는 다시 시도하지 않고, 모든 query가 비었을 때만 한 번 더 검색하는지 테스트"""
+    pytest.importorskip("langchain.utilities")
+    from estalan.tools.search import GoogleSerperSearchResult
+
+    tool = GoogleSerperSearchResult.from_api_key("key")
+    tool.executor = ResilientExecutor(attempts=3, base_delay=0.001)
+    calls = []
+
+    async def fetch(query):
+        calls.append(query)
+        return [query] if query == "a" else []
+
+    assert await tool._afetch_all(["a", "b"], fetch) == ["a"]
+    assert calls == ["a", "b"]
+
+    calls.clear()
+    assert await tool._afetch_all(["b", "c"], fetch) == []
+    assert calls == ["b", "c", "b", "c"]
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("langchain.utilities")
+
+from estalan.tools.search import SearchCache  # noqa: E402
+from estalan.tools.singleflight import SingleFlight  # noqa: E402
+
+TTLS = {"news": (60, 600), "search": (3600, 3600), "images": (3600, 3600)}
+
+
+def test_cache_key_normalizes_query():
+    """query 정규화 후 (type, hl, gl, k)별로 key가 구분되는지 테스트"""
+    key = SearchCache.cache_key("  ＯpenAI   News ", "news", "en", "kr", 10)
+
+    assert key == SearchCache.cache_key("openai news", "news", "en", "kr", 10)
+    assert key != SearchCache.cache_key("openai news", "search", "en", "kr", 10)
+    assert key != SearchCache.cache_key("openai news", "news", "ko", "kr", 10)
+    assert key != SearchCache.cache_key("openai news", "news", "en", "kr", 5)
+
+
+@pytest.mark.asyncio
+async def test_stale_result_is_served_and_revalidated(monkeypatch):
+    """TTL이 지난 결과를 바로 반환하고 백그라운드에서 갱신하는지 테스트"""
+    cache = SearchCache(ttls=TTLS)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"news": [{"title": f"v{len(calls)}"}]}
+
+    key = cache.cache_key("q", "news", "en", "kr", 10)
+    assert (await cache.aget_or_fetch(key, "news", fetch))["news"][0]["title"] == "v1"
+    assert (await cache.aget_or_fetch(key, "news", fetch))["news"][0]["title"] == "v1"
+    assert len(calls) == 1
+
+    # news TTL(60초)은 지났지만 stale 기간 안.
+    now = time.time()
+    monkeypatch.setattr("estalan.tools.search.time.time", lambda: now + 120)
+    assert (await cache.aget_or_fetch(key, "news", fetch))["news"][0]["title"] == "v1"
+    await asyncio.gather(*cache._background)
+    assert (await cache.aget_or_fetch(key, "news", fetch))["news"][0]["title"] == "v2"
+
+    # stale 기간도 지나면 기다려서 새로 검색.
+    monkeypatch.setattr("estalan.tools.search.time.time", lambda: now + 2000)
+    assert (await cache.aget_or_fetch(key, "news", fetch))["news"][0]["title"] == "v3"
+    assert cache.stats["stale_hits"] == 1
+    assert cache.stats["revalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced_and_empty_not_cached():
+    """동시 검색을 하나로 합치고 빈 결과는 캐시하지 않는지 테스트"""
+    flight = SingleFlight(redis_uri=None)
+    cache = SearchCache(ttls=TTLS, flight=flight)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"organic": []}
+
+    key = cache.cache_key("q", "search", "en", "kr", 10)
+    cacheable = lambda results: bool(results["organic"])  # noqa: E731
+    results = await asyncio.gather(
+        *(cache.aget_or_fetch(key, "search", fetch, cacheable) for _ in range(5))
+    )
+
+    assert all(result == {"organic": []} for result in results)
+    assert len(calls) == 1
+    assert flight.metrics()["search"]["saved"] == 4
+
+    await cache.aget_or_fetch(key, "search", fetch, cacheable)
+    assert len(calls) == 2
+
+
+def test_put_purges_expired_results(monkeypatch):
+    """purge_every번 저장할 때마다 stale 기간까지 지난 결과를 지우는지 테스트"""
+    cache = SearchCache(ttls=TTLS, purge_every=2)
+    cache.put("old", "news", {"news": []})
+
+    now = time.time()
+    monkeypatch.setattr("estalan.tools.search.time.time", lambda: now + 1000)
+    cache.put("new", "news", {"news": []})
+
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+@pytest.mark.asyncio
+async def test_relative_news_dates_are_stored_as_absolute(monkeypatch):
+    """상대 날짜를 저장 시점에 절대 시각으로 바꿔서 캐시를 읽는 시각과 관계없이 같은 날짜를 반환하는지 테스트"""
+    from estalan.tools import search
+
+    cache = SearchCache(ttls=TTLS)
+    monkeypatch.setattr(search, "search_cache", cache)
+
+    async def aserper_results(wrapper, q):
+        news = {
+            "title": "t",
+            "snippet": "s",
+            "link": "https://a.test",
+            "date": "3 hours ago",
+        }
+        return {"news": [news]}
+
+    monkeypatch.setattr(search, "aserper_results", aserper_results)
+    tool = search.GoogleSerperNewsResult.from_api_key("key")
+
+    first = tool._parse_results(await tool._acached_results("q"))
+    key = cache.cache_key("q", "news", "en", "kr", tool.k)
+    stored = cache.get(key)[0]["news"][0]["date"]
+
+    await asyncio.sleep(1.1)
+    second = tool._parse_results(await tool._acached_results("q"))
+
+    assert stored == first[0]["metadata"]["date"] != "3 hours ago"
+    assert second[0]["metadata"]["date"] == stored
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from estalan.tools.singleflight import JSON_CODEC, FlightCodec, SingleFlight
+
+
+class FakeRedis:
+    """SET NX/GET/EXISTS와 lock 해제 script만 흉내 내는 in-memory Redis."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+def worker(redis):
+    flight = SingleFlight(redis_uri=None, wait_timeout=1)
+    flight._redis = lambda: redis
+    return flight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """같은 key의 동시 호출이 한 번만 실행되고 오류도 함께 전달되는지 테스트"""
+    flight = SingleFlight(redis_uri=None)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": len(calls)}
+
+    results = await asyncio.gather(*[flight.do("search:q", fetch) for _ in range(5)])
+    assert results == [{"value": 1}] * 5
+    assert flight.metrics()["search"] == {
+        "calls": 5,
+        "executions": 1,
+        "shared_local": 4,
+        "shared_remote": 0,
+        "remote_fallbacks": 0,
+        "saved": 4,
+    }
+    assert not flight.inflight("search:q")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        *[flight.do("fetch:url", fail) for _ in range(3)], return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await flight.do("fetch:url", fetch) == {"value": 2}
+
+
+@pytest.mark.asyncio
+async def test_workers_share_result_through_redis():
+    """Redis를 통해 다른 worker의 실행 결과를 받아 쓰는지 테스트"""
+    redis = FakeRedis()
+    leader, follower = worker(redis), worker(redis)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"organic": ["a"]}
+
+    results = await asyncio.gather(
+        leader.do("search:q", fetch, JSON_CODEC),
+        follower.do("search:q", fetch, JSON_CODEC),
+    )
+
+    assert results == [{"organic": ["a"]}] * 2
+    assert len(calls) == 1
+    assert follower.metrics()["search"]["shared_remote"] == 1
+    assert not any(key.endswith(":lock") for key in redis.data)
+
+
+@pytest.mark.asyncio
+async def test_unshared_result_falls_back_to_local_execution():
+    """encode가 None인 결과는 공유하지 않고 lock 해제 후 직접 실행하는지 테스트"""
+    redis = FakeRedis()
+    leader, follower = worker(redis), worker(redis)
+    codec = FlightCodec(encode=lambda result: None, decode=lambda encoded: encoded)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "error"
+
+    await asyncio.gather(
+        leader.do("fetch:url", fetch, codec),
+        follower.do("fetch:url", fetch, codec),
+    )
+
+    assert len(calls) == 2
+    assert follower.metrics()["fetch"]["remote_fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_large_result_is_not_published():
+    """max_result_bytes를 넘는 결과는 Redis에 올리지 않고 각 worker가 직접 실행하는지 테스트"""
+    redis = FakeRedis()
+    leader, follower = worker(redis), worker(redis)
+    leader.max_result_bytes = follower.max_result_bytes = 16
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"text": "x" * 100}
+
+    await asyncio.gather(
+        leader.do("fetch:pdf", fetch, JSON_CODEC),
+        follower.do("fetch:pdf", fetch, JSON_CODEC),
+    )
+
+    assert len(calls) == 2
+    assert not any(key.endswith(":result") for key in redis.data)
@@ -0,0 +1,33 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("langchain.base_language")
+os.environ.setdefault("RAPID_API_ENDPOINT", "https://rapid.test")
+
+from langchain.schema import Document  # noqa: E402
+
+from estalan.tools.url import URLSummarizeTool  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_failed_url_does_not_fail_batch(monkeypatch):
+    """한 URL이 실패해도 나머지 결과와 함께 오류 Document를 순서대로 반환하는지 테스트"""
+
+    async def fetch(self, url):
+        await asyncio.sleep(0.01)
+        if "broken" in url:
+            raise RuntimeError("parse failed")
+        return Document(page_content=url, metadata={"source": url})
+
+    monkeypatch.setattr(URLSummarizeTool, "_fetch_and_preprocess", fetch)
+    tool = URLSummarizeTool.model_construct()
+    urls = ["https://a.test", "https://broken.test", "https://b.test"]
+
+    docs = await tool._fetch_all(urls)
+
+    assert [doc.metadata["source"] for doc in docs] == urls
+    assert "error" not in docs[0].metadata
+    assert docs[1].metadata["error"] == "RuntimeError"
+    assert docs[2].page_content == "https://b.test"
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from estalan.tools.workers import CPUWorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = CPUWorkerPool(max_workers=2, max_pending=2, timeout=5)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_in_worker_process(pool):
+    """worker process에서 실행한 결과를 순서대로 받아오는지 테스트"""
+    results = await asyncio.gather(*[pool.run(pow, i, 2) for i in range(6)])
+
+    assert results == [i**2 for i in range(6)]
+    assert pool.metrics()["completed"] == 6
+    assert pool.metrics()["peak_in_flight"] <= 2
+
+
+@pytest.mark.asyncio
+async def test_run_timeout(pool):
+    """작업 시간이 timeout을 넘으면 TimeoutError가 발생하고 집계되는지 테스트"""
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.run(time.sleep, 2, timeout=0.1)
+
+    assert pool.metrics()["timeouts"] == 1
+    # 자리는 종료된 process의 작업이 정리된 뒤에 반납됨.
+    for _ in range(50):
+        if pool.metrics()["in_flight"] == 0:
+            break
+        await asyncio.sleep(0.1)
+    assert pool.metrics()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_timed_out_job_does_not_block_later_jobs():
+    """timeout된 작업의 process를 종료하고 새 pool에서 다음 작업을 바로 실행하는지 테스트"""
+    pool = CPUWorkerPool(max_workers=1, max_pending=1, timeout=5)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(time.sleep, 30, timeout=0.5)
+
+        started_at = time.perf_counter()
+        assert await pool.run(pow, 2, 10) == 1024
+        assert time.perf_counter() - started_at < 5
+        assert pool.metrics()["recycles"] == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,140 @@
+import asyncio
+
+import httpx
+import pytest
+
+from estalan.tools.kv_cache import KVCache
+from estalan.tools.singleflight import SingleFlight
+from estalan.tools.youtube import (
+    TranscriptService,
+    TranscriptUnavailableError,
+    YouTubeSearchClient,
+    parse_transcript_xml,
+)
+
+XML = '<transcript><text start="0">안녕하세요 [음악]</text><text start="1">&amp;quot;반갑습니다&amp;quot;</text></transcript>'
+
+
+@pytest.fixture
+def rapidapi(monkeypatch):
+    monkeypatch.setenv("RAPID_API_ENDPOINT", "https://yt.example.com")
+    monkeypatch.setenv("RAPID_API_KEY", "key")
+    monkeypatch.setattr("estalan.tools.youtube.YouTubeTranscriptApi", None)
+
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        await asyncio.sleep(0.01)
+        if request.url.path == "/subtitles":
+            video_id = request.url.params["id"]
+            if video_id == "missing0000":
+                return httpx.Response(200, json={"subtitles": []})
+            return httpx.Response(
+                200,
+                json={
+                    "subtitles": [
+                        {"languageCode": "en", "url": "https://yt.example.com/en"},
+                        {"languageCode": "ko", "url": "https://yt.example.com/ko"},
+                    ]
+                },
+            )
+        return httpx.Response(200, text=XML)
+
+    return httpx.MockTransport(handler), requests
+
+
+def test_parse_transcript_xml():
+    """자막 XML에서 텍스트만 추출하는지 테스트"""
+    assert parse_transcript_xml(XML) == '안녕하세요 "반갑습니다"'
+    assert parse_transcript_xml("<broken") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced_and_cached(rapidapi):
+    """같은 영상에 대한 동시 요청을 한 번만 가져오고 이후에는 캐시를 사용하는지 테스트"""
+    transport, requests = rapidapi
+    async with httpx.AsyncClient(transport=transport) as client:
+        service = TranscriptService(
+            cache=KVCache("transcript"),
+            languages=["ko", "en"],
+            client=client,
+            flight=SingleFlight(redis_uri=None),
+        )
+
+        transcripts = await asyncio.gather(
+            *[service.aget_transcript("abcdefghijk") for _ in range(5)]
+        )
+        again = await service.aget_transcript("abcdefghijk")
+
+    assert {t.text for t in [*transcripts, again]} == {'안녕하세요 "반갑습니다"'}
+    assert again.language == "ko"
+    assert requests == ["/subtitles", "/ko"]
+    assert service.metrics()["singleflight"]["saved"] == 4
+    assert service.stats["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_subtitle_list_is_cached(rapidapi):
+    """자막이 없는 영상도 자막 목록 응답은 캐시하는지 테스트"""
+    transport, requests = rapidapi
+    async with httpx.AsyncClient(transport=transport) as client:
+        service = TranscriptService(
+            cache=KVCache("transcript"),
+            client=client,
+            subtitle_cache=KVCache("subtitles"),
+        )
+
+        for _ in range(2):
+            with pytest.raises(TranscriptUnavailableError):
+                await service.aget_transcript("missing0000")
+
+    assert requests == ["/subtitles"]
+    assert service.subtitle_cache.get("missing0000") == []
+
+
+@pytest.mark.asyncio
+async def test_search_keywords_concurrently_with_dedup():
+    """keyword를 동시에 검색해 video_id로 합치고 keyword별로 캐시하는지 테스트"""
+    results = {
+        "python": ["aaaaaaaaaaa", "bbbbbbbbbbb"],
+        "asyncio": ["bbbbbbbbbbb", "ccccccccccc"],
+    }
+    requests = []
+
+    async def handler(request):
+        keyword = request.url.params["query"]
+        requests.append(keyword)
+        # 먼저 요청한 keyword가 늦게 끝나도 결과는 keyword 순서를 유지.
+        await asyncio.sleep(0.1 if keyword == "python" else 0.01)
+        if keyword == "broken":
+            return httpx.Response(500)
+        data = [
+            {"type": "video", "videoId": video_id, "title": video_id[:3]}
+            for video_id in results[keyword]
+        ]
+        return httpx.Response(200, json={"data": [{"type": "channel"}, *data]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        search = YouTubeSearchClient(
+            "https://yt.example.com",
+            "key",
+            cache=KVCache("search"),
+            client=client,
+            flight=SingleFlight(redis_uri=None),
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        videos = await search.asearch_all(["python", "asyncio", "broken"])
+        elapsed = loop.time() - started
+        again = await search.asearch_all(["Python "], k=1)
+
+    assert [video["video_id"] for video in videos] == [
+        "aaaaaaaaaaa",
+        "bbbbbbbbbbb",
+        "ccccccccccc",
+    ]
+    assert videos[0]["url"] == "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+    assert elapsed < 0.2
+    assert [video["video_id"] for video in again] == ["aaaaaaaaaaa"]
+    assert sorted(requests) == ["asyncio", "broken", "python"]